@@ -0,0 +1,25 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Union
+
+_CALLBACKS = "after_commit_callbacks"
+
+
+def after_commit(db: Union[Session, AsyncSession], callback: Callable[[], None]):
+    """Run callback once the session's current transaction commits; dropped if it rolls back"""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session):
+    for callback in session.info.pop(_CALLBACKS, []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_callbacks(session: Session, transaction):
+    # Rolled back or closed without commit (after_commit has already emptied the list on commit)
+    if transaction.parent is None:
+        session.info.pop(_CALLBACKS, None)
@@ -0,0 +1,64 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+_DIALECT_INSERTS = {
+    "mysql": mysql_insert,
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def upsert_statement(
+    dialect: str,
+    table: Table,
+    values: Union[Dict[str, Any], List[Dict[str, Any]]],
+    conflict_columns: Sequence[str],
+    update: Optional[Dict[str, Any]] = None
+):
+    """Build INSERT ... ON CONFLICT for a dialect (see upsert)"""
+    dialect_insert = _DIALECT_INSERTS.get(dialect)
+    if dialect_insert is None:
+        raise NotImplementedError(f"upsert is not supported on {dialect}")
+
+    stmt = dialect_insert(table).values(values)
+    incoming = stmt.inserted if dialect == "mysql" else stmt.excluded
+    if update:
+        set_ = {k: _update_value(v, k, incoming) for k, v in update.items()}
+        if dialect == "mysql":
+            return stmt.on_duplicate_key_update(set_)
+        return stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+
+    if dialect == "mysql":
+        return stmt.prefix_with("IGNORE")
+    return stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+
+def _update_value(value: Any, column: str, incoming):
+    if isinstance(value, str) and value == "excluded":
+        return incoming[column]
+    if callable(value):
+        return value(incoming)
+    return value
+
+
+def upsert(
+    db: Session,
+    table: Table,
+    values: Union[Dict[str, Any], List[Dict[str, Any]]],
+    conflict_columns: Sequence[str],
+    update: Optional[Dict[str, Any]] = None
+):
+    """INSERT ... ON CONFLICT for the session's dialect
+
+    `update` maps column names to new values; pass `None` to leave existing
+    rows untouched (insert-or-ignore). A value of the string "excluded"
+    takes the incoming row's value for that column; a callable gets the
+    incoming row and returns an expression (e.g. for counter increments).
+    `conflict_columns` must match a unique index (MySQL uses any unique key).
+    """
+    stmt = upsert_statement(db.get_bind().dialect.name, table, values, conflict_columns, update)
+    return db.execute(stmt)
@@ -1,35 +1,69 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, Any
+from decouple import config
+import hashlib
+from ..services.cache import LRUCache
 from ..services.clerk_service import clerk_service
-from ..services.user_service import UserService
-from ..database.config import get_db
+from ..services.user_service import AsyncUserService
+from ..database.config import get_async_db
 from ..models.models import User
 
 security = HTTPBearer(auto_error=False)
 
+# Resolved auth contexts keyed by token hash, kept until the token's exp
+auth_cache = LRUCache(
+    max_entries=config('AUTH_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    max_bytes=config('AUTH_CACHE_MAX_BYTES', default=8 * 1024 * 1024, cast=int),
+    default_ttl=config('AUTH_CACHE_TTL', default=300, cast=int)  # Only for tokens without exp
+)
+
+# Short-lived negative cache so a bad token isn't re-verified on every call
+rejected_tokens = LRUCache(
+    max_entries=config('AUTH_NEGATIVE_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    default_ttl=config('AUTH_NEGATIVE_CACHE_TTL', default=30, cast=int)
+)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[Dict[str, Any]]:
     """Get current user from Clerk token"""
     if not credentials:
         print("⚠️ No credentials provided")
         return None
     
+    token_key = _token_key(credentials.credentials)
+    cached = auth_cache.get(token_key)
+    if cached is not None:
+        return dict(cached)
+    if rejected_tokens.get(token_key):
+        return None
+    
     try:
         print(f"🔍 Verifying token: {credentials.credentials[:20]}...")
         
+        user_service = AsyncUserService(db)
+        
+        async def local_profile(clerk_user_id: str) -> Optional[Dict[str, Any]]:
+            # Already synced users are resolved from the database, not the Clerk API
+            user = await user_service.get_user_by_clerk_id(clerk_user_id)
+            if not user:
+                return None
+            return {'email': user.email, 'name': user.display_name, 'image_url': user.avatar_url}
+        
         # Verify the token with Clerk
-        user_data = await clerk_service.verify_jwt_token(credentials.credentials)
+        user_data = await clerk_service.verify_jwt_token(credentials.credentials, local_profile)
         
         if not user_data:
             print("❌ Token verification failed")
+            rejected_tokens.set(token_key, True)
             return None
         
-        print(f"✅ Token verified. User data: {user_data}")
-        
         # Extract user info from Clerk data
         clerk_user_id = user_data.get('sub')  # Clerk user ID
         email = user_data.get('email')
@@ -37,15 +71,13 @@ async def get_current_user(
         
         if not clerk_user_id:
             print("❌ No user ID in token")
+            rejected_tokens.set(token_key, True)
             return None
         
         print(f"👤 Processing user: {clerk_user_id}, {email}, {name}")
         
-        # Create user service instance with database session
-        user_service = UserService(db)
-        
-        # Sync user with local database (synchronous call)
-        local_user = user_service.sync_clerk_user(
+        # Sync user with local database
+        local_user = await user_service.sync_clerk_user(
             clerk_user_id=clerk_user_id,
             email=email,
             name=name,
@@ -54,14 +86,15 @@ async def get_current_user(
         
         result = {
             'clerk_id': clerk_user_id,
-            'local_user': local_user,
+            'user_id': local_user.id,
             'email': email,
             'name': name,
             'avatar_url': user_data.get('image_url', '')
         }
+        auth_cache.set(token_key, result, expires_at=user_data.get('exp'))
         
         print(f"✅ User sync successful: {local_user.id}")
-        return result
+        return dict(result)
     
     except Exception as e:
         print(f"💥 Error getting current user: {e}")
@@ -79,7 +112,7 @@ async def require_auth(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
-    print(f"✅ Authentication successful for user: {current_user['local_user'].id}")
+    print(f"✅ Authentication successful for user: {current_user['user_id']}")
     return current_user
 
 async def optional_auth(
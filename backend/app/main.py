@@ -1,22 +1,116 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from contextlib import asynccontextmanager
+from decouple import config
 import os
 
 from app.database.config import engine
 from app.models.models import Base
-from app.routers import users, questions, answers, votes, tags, search, stats
+from app.routers import users, questions, answers, votes, tags, search, stats, webhooks, debug
+from app.services.clerk_service import clerk_service
+from app.services.scheduler import scheduler, run_with_session
+from app.services.user_service import last_login_buffer, LAST_LOGIN_FLUSH_INTERVAL
+from app.services.search_service import search_engine
+from app.services.question_service import view_counter, VIEW_FLUSH_INTERVAL
+from app.services.leaderboard_service import leaderboard, LEADERBOARD_REBUILD_INTERVAL
+from app.services.site_stats_service import (
+    SiteStatsService, site_counter_buffer, SITE_COUNTERS_FLUSH_INTERVAL, SITE_COUNTERS_RECONCILE_INTERVAL
+)
+from app.services.activity_service import ActivityService, activity_buffer, ACTIVITY_FLUSH_INTERVAL, ACTIVITY_ROLLUP_INTERVAL
+from app.services.hot_service import hot_scores, HOT_REFRESH_INTERVAL
+from app.services.autocomplete_service import tag_autocomplete, TAG_AUTOCOMPLETE_REBUILD_INTERVAL
+from app.services.related_tags_service import related_tags, RELATED_TAGS_REBUILD_INTERVAL
+from app.services.bitmap_index_service import question_bitmaps, QUESTION_BITMAPS_REBUILD_INTERVAL
+import asyncio
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Background jobs
+scheduler.add_job(
+    "last_login_flush",
+    LAST_LOGIN_FLUSH_INTERVAL,
+    lambda: run_with_session(last_login_buffer.flush),
+    run_on_shutdown=True
+)
+scheduler.add_job(
+    "view_count_flush",
+    VIEW_FLUSH_INTERVAL,
+    lambda: run_with_session(view_counter.flush),
+    run_on_shutdown=True
+)
+scheduler.add_job(
+    "leaderboard_rebuild",
+    LEADERBOARD_REBUILD_INTERVAL,
+    lambda: run_with_session(leaderboard.rebuild)
+)
+scheduler.add_job(
+    "site_counters_flush",
+    SITE_COUNTERS_FLUSH_INTERVAL,
+    lambda: run_with_session(site_counter_buffer.flush),
+    run_on_shutdown=True
+)
+scheduler.add_job(
+    "site_counters_reconcile",
+    SITE_COUNTERS_RECONCILE_INTERVAL,
+    lambda: run_with_session(lambda db: SiteStatsService(db).reconcile())
+)
+scheduler.add_job(
+    "activity_flush",
+    ACTIVITY_FLUSH_INTERVAL,
+    lambda: run_with_session(activity_buffer.flush),
+    run_on_shutdown=True
+)
+scheduler.add_job(
+    "activity_rollup_catch_up",
+    ACTIVITY_ROLLUP_INTERVAL,
+    lambda: run_with_session(lambda db: ActivityService(db).catch_up())
+)
+scheduler.add_job(
+    "hot_score_refresh",
+    HOT_REFRESH_INTERVAL,
+    lambda: run_with_session(hot_scores.flush),
+    run_on_shutdown=True
+)
+scheduler.add_job(
+    "tag_autocomplete_rebuild",
+    TAG_AUTOCOMPLETE_REBUILD_INTERVAL,
+    lambda: run_with_session(tag_autocomplete.rebuild)
+)
+scheduler.add_job(
+    "related_tags_rebuild",
+    RELATED_TAGS_REBUILD_INTERVAL,
+    lambda: run_with_session(related_tags.rebuild)
+)
+scheduler.add_job(
+    "question_bitmaps_rebuild",
+    QUESTION_BITMAPS_REBUILD_INTERVAL,
+    lambda: run_with_session(question_bitmaps.rebuild)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks"""
+    await clerk_service.startup()
+    await asyncio.to_thread(run_with_session, search_engine.load)
+    await asyncio.to_thread(run_with_session, leaderboard.rebuild)
+    await asyncio.to_thread(run_with_session, tag_autocomplete.rebuild)
+    await asyncio.to_thread(run_with_session, related_tags.rebuild)
+    await asyncio.to_thread(run_with_session, question_bitmaps.rebuild)
+    await scheduler.start()
+    yield
+    await scheduler.stop()
+    await clerk_service.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="StackIt API",
     description="A minimal Q&A Forum Platform API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add trusted host middleware for Railway
@@ -48,6 +142,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Health check endpoint
@@ -62,4 +157,9 @@ app.include_router(answers.router)
 app.include_router(votes.router)
 app.include_router(tags.router)
 app.include_router(search.router)
-app.include_router(stats.router) 
\ No newline at end of file
+app.include_router(stats.router)
+app.include_router(webhooks.router)
+
+# Auth tests, user listing and cache/Clerk metrics; off unless DEBUG_ROUTES is set
+if config('DEBUG_ROUTES', default=False, cast=bool):
+    app.include_router(debug.router)
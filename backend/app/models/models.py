@@ -1,15 +1,26 @@
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, Table, Index
+from sqlalchemy import Column, String, Integer, Float, Text, Boolean, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from sqlalchemy.sql import func
 from app.database.config import Base
 import uuid
 
+# Type for server-stamped created_at/updated_at columns. SQLite keeps DATETIME as
+# text and CURRENT_TIMESTAMP writes whole seconds, so bound values (e.g. keyset
+# cursors) are stored and compared in that same format there; MySQL DATETIME
+# has whole seconds anyway.
+Timestamp = DateTime().with_variant(
+    SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
 # Association table for many-to-many relationship between questions and tags
 question_tags = Table(
     'question_tags',
     Base.metadata,
     Column('question_id', String(36), ForeignKey('questions.id'), primary_key=True),
-    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
+    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True),
+    Index('idx_question_tags_tag_id', 'tag_id')
 )
 
 class User(Base):
@@ -26,8 +37,8 @@ class User(Base):
     avatar_url = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
     last_login = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     questions = relationship("Question", back_populates="author", cascade="all, delete-orphan")
@@ -39,6 +50,7 @@ class User(Base):
         Index('idx_users_username', 'username'),
         Index('idx_users_email', 'email'),
         Index('idx_users_clerk_id', 'clerk_id'),
+        Index('idx_users_created_at', 'created_at'),
     )
 
 class Tag(Base):
@@ -49,7 +61,7 @@ class Tag(Base):
     description = Column(Text, nullable=True)
     color = Column(String(7), default='#3B82F6')
     usage_count = Column(Integer, default=0)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     
     # Relationships
     questions = relationship("Question", secondary=question_tags, back_populates="tags")
@@ -67,12 +79,16 @@ class Question(Base):
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
+    excerpt = Column(String(255), nullable=True)  # Plain-text start of content for list views
     views = Column(Integer, default=0)
     vote_count = Column(Integer, default=0)
+    upvotes = Column(Integer, default=0)
+    downvotes = Column(Integer, default=0)
     answer_count = Column(Integer, default=0)
+    hot_score = Column(Float(precision=53), default=0)  # Hot order sort key, see hot_service
     is_solved = Column(Boolean, default=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     author = relationship("User", back_populates="questions")
@@ -82,10 +98,13 @@ class Question(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_questions_user_id', 'user_id'),
-        Index('idx_questions_created_at', 'created_at'),
-        Index('idx_questions_vote_count', 'vote_count'),
-        Index('idx_questions_title_content', 'title', 'content', mysql_length={'title': 100, 'content': 255}),
+        # Keyset pagination orders: (created_at, id), (vote_count, id) and (hot_score, id)
+        Index('idx_questions_user_created_at', 'user_id', 'created_at', 'id'),
+        Index('idx_questions_created_at_id', 'created_at', 'id'),
+        Index('idx_questions_vote_count_id', 'vote_count', 'id'),
+        Index('idx_questions_hot_score_id', 'hot_score', 'id'),
+        Index('idx_questions_fulltext', 'title', 'content', mysql_prefix='FULLTEXT'),
+        Index('idx_questions_title_fulltext', 'title', mysql_prefix='FULLTEXT'),  # Title weighting in search
     )
 
 class Answer(Base):
@@ -96,9 +115,11 @@ class Answer(Base):
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     content = Column(Text, nullable=False)
     vote_count = Column(Integer, default=0)
+    upvotes = Column(Integer, default=0)
+    downvotes = Column(Integer, default=0)
     is_accepted = Column(Boolean, default=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     question = relationship("Question", back_populates="answers")
@@ -121,7 +142,7 @@ class Vote(Base):
     question_id = Column(String(36), ForeignKey('questions.id'), nullable=True)
     answer_id = Column(String(36), ForeignKey('answers.id'), nullable=True)
     vote_type = Column(Integer, nullable=False)  # 1 for upvote, -1 for downvote
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="votes")
@@ -130,8 +151,61 @@ class Vote(Base):
     
     # Indexes and constraints
     __table_args__ = (
-        Index('idx_votes_user_question', 'user_id', 'question_id'),
-        Index('idx_votes_user_answer', 'user_id', 'answer_id'),
+        # One vote per user per target; also the conflict keys for vote upserts
+        Index('idx_votes_user_question', 'user_id', 'question_id', unique=True),
+        Index('idx_votes_user_answer', 'user_id', 'answer_id', unique=True),
         Index('idx_votes_question_id', 'question_id'),
         Index('idx_votes_answer_id', 'answer_id'),
-    ) 
\ No newline at end of file
+        Index('idx_votes_created_at', 'created_at'),
+    )
+
+class SiteCounter(Base):
+    __tablename__ = "site_counters"
+    
+    # One row per site-wide total, bumped in the same transaction as the write it counts
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class ActivityRollup(Base):
+    __tablename__ = "activity_rollups"
+    
+    # Totals per hour and per day; bucket is the (UTC) start of the hour/day
+    period = Column(String(4), primary_key=True)  # hour or day
+    bucket = Column(DateTime, primary_key=True)
+    questions = Column(Integer, nullable=False, default=0)
+    answers = Column(Integer, nullable=False, default=0)
+    votes = Column(Integer, nullable=False, default=0)
+    users = Column(Integer, nullable=False, default=0)
+
+class TagDailyRollup(Base):
+    __tablename__ = "tag_daily_rollups"
+    
+    # Questions asked per tag per day (keyed by the question's creation day).
+    # tag_id is not a foreign key so unused tags can still be deleted.
+    day = Column(DateTime, primary_key=True)
+    tag_id = Column(String(36), primary_key=True)
+    questions = Column(Integer, nullable=False, default=0)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_tag_daily_rollups_tag_day', 'tag_id', 'day'),
+    )
+
+class ReputationEvent(Base):
+    __tablename__ = "reputation_events"
+    
+    # Append-only ledger: a user's reputation is the sum of their event deltas
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False)  # vote, accept, unaccept, delete, recompute
+    # No foreign keys: events outlive the content and actors they refer to
+    actor_id = Column(String(36), nullable=True)
+    question_id = Column(String(36), nullable=True)
+    answer_id = Column(String(36), nullable=True)
+    created_at = Column(Timestamp, server_default=func.now())
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_reputation_events_user_created', 'user_id', 'created_at'),
+    )
\ No newline at end of file
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
 
 from app.database.config import get_db
 from app.schemas.schemas import AnswerCreate, AnswerUpdate, AnswerResponse, MessageResponse
 from app.services.answer_service import AnswerService
+from app.services.normalize import RESPONSE_FORMAT_PATTERN, normalized_answers
 from app.dependencies.auth import require_auth
 
 router = APIRouter(prefix="/api/answers", tags=["answers"])
 
+def _formatted(answers, response_format: str):
+    """Answers as-is, or the normalized body (skips the response model)"""
+    if response_format == 'normalized':
+        return normalized_answers(answers)
+    return answers
+
 @router.post("/", response_model=AnswerResponse)
 def create_answer(
     answer_data: AnswerCreate, 
@@ -16,7 +23,7 @@ def create_answer(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Create a new answer"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     answer_service = AnswerService(db)
     
     answer = answer_service.create_answer(answer_data, user_id)
@@ -27,26 +34,35 @@ def create_answer(
     return answer
 
 @router.get("/question/{question_id}", response_model=List[AnswerResponse])
-def get_question_answers(question_id: str, db: Session = Depends(get_db)):
+def get_question_answers(
+    question_id: str,
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
     """Get all answers for a question"""
     answer_service = AnswerService(db)
-    return answer_service.get_answers_by_question(question_id)
+    return _formatted(answer_service.get_answers_by_question(question_id), response_format)
 
 @router.get("/me", response_model=List[AnswerResponse])
 def get_my_answers(
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
     db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Get all answers by the current user"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     answer_service = AnswerService(db)
-    return answer_service.get_user_answers(user_id, skip=0, limit=100)
+    return _formatted(answer_service.get_user_answers(user_id, skip=0, limit=100), response_format)
 
 @router.get("/user/{user_id}", response_model=List[AnswerResponse])
-def get_user_answers(user_id: str, db: Session = Depends(get_db)):
+def get_user_answers(
+    user_id: str,
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
     """Get all answers by a specific user"""
     answer_service = AnswerService(db)
-    return answer_service.get_user_answers(user_id, skip=0, limit=100)
+    return _formatted(answer_service.get_user_answers(user_id, skip=0, limit=100), response_format)
 
 @router.put("/{answer_id}", response_model=AnswerResponse)
 def update_answer(
@@ -56,7 +72,7 @@ def update_answer(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Update an answer"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     answer_service = AnswerService(db)
     
     answer = answer_service.update_answer(answer_id, answer_data, user_id)
@@ -73,7 +89,7 @@ def delete_answer(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Delete an answer"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     answer_service = AnswerService(db)
     
     if not answer_service.delete_answer(answer_id, user_id):
@@ -88,7 +104,7 @@ def accept_answer(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Accept an answer as the solution"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     answer_service = AnswerService(db)
     
     if not answer_service.accept_answer(answer_id, user_id):
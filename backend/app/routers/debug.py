@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from typing import Dict, Any, Optional
-from app.database.config import get_db
-from app.dependencies.auth import get_current_user, require_auth
-from app.services.user_service import UserService
+from app.database.config import get_async_db
+from app.dependencies.auth import get_current_user, require_auth, auth_cache, rejected_tokens
+from app.services.clerk_service import clerk_service
+from app.services.question_service import question_cache
 from app.models.models import User
 
 router = APIRouter(prefix="/api/debug", tags=["debug"])
@@ -11,13 +13,13 @@ router = APIRouter(prefix="/api/debug", tags=["debug"])
 @router.get("/auth-test")
 async def test_auth(
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test authentication endpoint"""
     return {
         "authenticated": current_user is not None,
         "user_data": current_user,
-        "total_users_in_db": db.query(User).count()
+        "total_users_in_db": await db.scalar(select(func.count(User.id)))
     }
 
 @router.get("/auth-required-test")
@@ -31,9 +33,9 @@ async def test_auth_required(
     }
 
 @router.get("/users")
-async def list_users(db: Session = Depends(get_db)):
+async def list_users(db: AsyncSession = Depends(get_async_db)):
     """List all users in database"""
-    users = db.query(User).all()
+    users = (await db.execute(select(User))).scalars().all()
     return {
         "total_users": len(users),
         "users": [
@@ -47,4 +49,22 @@ async def list_users(db: Session = Depends(get_db)):
             }
             for user in users
         ]
-    } 
\ No newline at end of file
+    }
+
+@router.get("/auth-cache")
+async def auth_cache_stats():
+    """Auth context cache counters"""
+    return {
+        "auth_cache": auth_cache.stats(),
+        "rejected_tokens": rejected_tokens.stats()
+    }
+
+@router.get("/clerk-metrics")
+async def clerk_metrics():
+    """Outbound Clerk API latency and pool saturation"""
+    return clerk_service.metrics()
+
+@router.get("/question-cache")
+async def question_cache_stats():
+    """Question detail cache hit ratio and size"""
+    return question_cache.stats()
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, BackgroundTasks
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 
-from app.database.config import get_db
+from app.database.config import get_db, get_async_db
 from app.schemas.schemas import (
-    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionWithAnswers,
+    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionListResponse, QuestionWithAnswers,
     MessageResponse
 )
-from app.services.question_service import QuestionService
+from app.services.question_service import QuestionService, AsyncQuestionService, view_counter, question_cache
+from app.services.scheduler import run_with_session
+from app.services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.services.normalize import RESPONSE_FORMAT_PATTERN, normalized_questions, normalize_question_payload
 from app.dependencies.auth import require_auth, optional_auth
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
@@ -19,27 +24,40 @@ def create_question(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Create a new question"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     question_service = QuestionService(db)
     return question_service.create_question(question, user_id)
 
 @router.get("/{question_id}", response_model=QuestionWithAnswers)
-def get_question(
+async def get_question(
     question_id: str, 
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[Dict[str, Any]] = Depends(optional_auth)
 ):
     """Get question by ID with answers"""
-    question_service = QuestionService(db)
-    question = question_service.get_question_by_id(question_id)
-    
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
+    payload = question_cache.get(question_id)
+    if payload is None:
+        version = question_cache.version(question_id)
+        question_service = AsyncQuestionService(db)
+        question = await question_service.get_question_by_id(question_id)
+        
+        if not question:
+            raise HTTPException(status_code=404, detail="Question not found")
+        
+        payload = QuestionWithAnswers.model_validate(question).model_dump(mode="json")
+        question_cache.set(question_id, payload, version)
     
-    # Increment view count
-    question_service.increment_views(question_id)
+    # Count the view in memory; the periodic flush writes it
+    if view_counter.record(question_id):
+        background_tasks.add_task(run_with_session, view_counter.flush)
     
-    return question
+    payload = {**payload, "views": payload["views"] + view_counter.pending(question_id)}
+    if response_format == 'normalized':
+        payload = normalize_question_payload(payload)
+    # Payload is already validated; skip re-serializing through the response model
+    return JSONResponse(payload)
 
 @router.put("/{question_id}", response_model=QuestionResponse)
 def update_question(
@@ -49,7 +67,7 @@ def update_question(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Update a question"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     question_service = QuestionService(db)
     question = question_service.update_question(question_id, question_update, user_id)
     
@@ -65,7 +83,7 @@ def delete_question(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Delete a question"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     question_service = QuestionService(db)
     
     if not question_service.delete_question(question_id, user_id):
@@ -73,28 +91,50 @@ def delete_question(
     
     return MessageResponse(message="Question deleted successfully")
 
-@router.get("/", response_model=List[QuestionResponse])
+def _paged(response: Response, page, response_format: str = 'nested'):
+    """Unpack (items, next_cursor), moving the cursor into the response header"""
+    items, next_cursor = page
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if response_format == 'normalized':
+        # Returned as-is, so the cursor header has to be carried over
+        return normalized_questions(items, dict(response.headers))
+    return items
+
+@router.get("/", response_model=List[QuestionListResponse])
 def get_questions(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: str = Query('newest', pattern='^(newest|votes|hot)$'),
     limit: int = Query(10, ge=1, le=50),
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(optional_auth)
 ):
-    """Get questions with pagination"""
+    """Get questions with cursor pagination (next cursor in the X-Next-Cursor header)"""
     question_service = QuestionService(db)
-    return question_service.get_recent_questions(limit)
+    try:
+        return _paged(response, question_service.get_questions_page(sort, cursor, limit), response_format)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/user/{user_id}", response_model=List[QuestionResponse])
+@router.get("/user/{user_id}", response_model=List[QuestionListResponse])
 def get_user_questions(
     user_id: str, 
-    skip: int = 0, 
-    limit: int = 10, 
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: str = Query('newest', pattern='^(newest|votes|hot)$'),
+    limit: int = Query(10, ge=1, le=50),
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(optional_auth)
 ):
     """Get questions by a specific user"""
     question_service = QuestionService(db)
-    return question_service.get_user_questions(user_id, skip, limit)
+    try:
+        return _paged(response, question_service.get_user_questions(user_id, cursor, limit, sort), response_format)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{question_id}/solve", response_model=MessageResponse)
 def mark_question_solved(
@@ -103,7 +143,7 @@ def mark_question_solved(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Mark question as solved"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     question_service = QuestionService(db)
     
     if not question_service.mark_as_solved(question_id, user_id):
@@ -111,14 +151,20 @@ def mark_question_solved(
     
     return MessageResponse(message="Question marked as solved")
 
-@router.get("/me/questions", response_model=List[QuestionResponse])
+@router.get("/me/questions", response_model=List[QuestionListResponse])
 def get_my_questions(
-    skip: int = 0, 
-    limit: int = 10, 
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: str = Query('newest', pattern='^(newest|votes|hot)$'),
+    limit: int = Query(10, ge=1, le=50),
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
     db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Get current user's questions"""
-    user_id = current_user['local_user'].id
+    user_id = current_user['user_id']
     question_service = QuestionService(db)
-    return question_service.get_user_questions(user_id, skip, limit) 
\ No newline at end of file
+    try:
+        return _paged(response, question_service.get_user_questions(user_id, cursor, limit, sort), response_format)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
@@ -1,15 +1,56 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
+import math
 
 from app.database.config import get_db
-from app.schemas.schemas import QuestionResponse
+from app.schemas.schemas import QuestionListResponse, TagResponse, SearchRequest, QuestionSearchResponse
 from app.services.question_service import QuestionService
+from app.services.tag_service import TagService
+from app.services.normalize import RESPONSE_FORMAT_PATTERN, normalized_questions
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
-@router.get("/questions", response_model=List[QuestionResponse])
-def search_questions(q: str, limit: int = 10, db: Session = Depends(get_db)):
-    """Search questions"""
+@router.get("/questions", response_model=List[QuestionListResponse])
+def search_questions(
+    q: str,
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """Search questions (ranked by relevance)"""
     question_service = QuestionService(db)
-    return question_service.search_questions(q, limit) 
\ No newline at end of file
+    questions = question_service.search_questions(q, limit, offset)
+    if response_format == 'normalized':
+        return normalized_questions(questions)
+    return questions
+
+@router.post("/questions", response_model=QuestionSearchResponse)
+def filter_questions(
+    search: SearchRequest,
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """Search and filter questions by tags (any/all/none), solved and unanswered, with facet counts"""
+    question_service = QuestionService(db)
+    results = question_service.get_questions(search)
+    results = {
+        **results,
+        "page": search.page,
+        "limit": search.limit,
+        "total_pages": math.ceil(results["total"] / search.limit)
+    }
+    if response_format == 'normalized':
+        return normalized_questions(results.pop("items"), key="items", **results)
+    return results
+
+@router.get("/tags", response_model=List[TagResponse])
+def search_tags(
+    q: str,
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """Autocomplete tags by name prefix, most used first"""
+    tag_service = TagService(db)
+    return tag_service.search_tags(q, limit)
\ No newline at end of file
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from app.database.config import get_db
-from app.models.models import User, Question, Answer, Vote, Tag
+from app.models.models import User, Question
 from app.dependencies.auth import optional_auth
+from app.schemas.schemas import UserResponse, LeaderboardEntry, UserRankResponse
+from app.services.leaderboard_service import leaderboard
+from app.services.user_service import UserService
+from app.services.site_stats_service import SiteStatsService
+from app.services.activity_service import ActivityService
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
@@ -15,35 +19,70 @@ def get_stats(
     current_user: Dict[str, Any] = Depends(optional_auth)
 ):
     """Get general statistics"""
-    
-    # Count totals
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    total_questions = db.query(func.count(Question.id)).scalar() or 0
-    total_answers = db.query(func.count(Answer.id)).scalar() or 0
-    total_votes = db.query(func.count(Vote.id)).scalar() or 0
-    total_tags = db.query(func.count(Tag.id)).scalar() or 0
-    
-    # Count solved questions
-    solved_questions = db.query(func.count(Question.id)).filter(Question.is_solved == True).scalar() or 0
-    
-    return {
-        "total_users": total_users,
-        "total_questions": total_questions,
-        "total_answers": total_answers,
-        "total_votes": total_votes,
-        "total_tags": total_tags,
-        "solved_questions": solved_questions
-    }
-
-@router.get("/users/top")
+    stats_service = SiteStatsService(db)
+    return stats_service.get_stats()
+
+@router.get("/activity")
+def get_activity(
+    period: str = Query("day", pattern="^(hour|day)$"),
+    buckets: int = Query(30, ge=1, le=400),
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(optional_auth)
+):
+    """Get new questions, answers, votes and users per hour or day"""
+    activity_service = ActivityService(db)
+    return {"period": period, "buckets": activity_service.get_activity(period, buckets)}
+
+@router.get("/tags")
+def get_tag_stats(
+    days: int = Query(30, ge=1, le=366),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(optional_auth)
+):
+    """Get the tags with the most new questions over recent days"""
+    activity_service = ActivityService(db)
+    return {"days": days, "tags": activity_service.get_tag_activity(days, limit)}
+
+@router.get("/users/top", response_model=List[LeaderboardEntry])
 def get_top_users(
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(optional_auth)
 ):
     """Get top users by reputation"""
-    users = db.query(User).order_by(User.reputation.desc()).limit(limit).all()
-    return users
+    top = leaderboard.top(limit)
+    users = {user.id: user for user in db.query(User).filter(User.id.in_([user_id for user_id, _ in top]))}
+    return [
+        LeaderboardEntry(**{
+            **UserResponse.model_validate(users[user_id]).model_dump(),
+            "reputation": reputation,
+            "rank": leaderboard.rank(user_id)
+        })
+        for user_id, reputation in top if user_id in users
+    ]
+
+@router.get("/users/{user_id}", response_model=UserRankResponse)
+def get_user_rank(
+    user_id: str,
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(optional_auth)
+):
+    """Get a user's reputation rank and activity counts"""
+    if leaderboard.rank(user_id) is None:
+        # Not seen since the last rebuild (e.g. a new user)
+        reputation = db.query(User.reputation).filter(User.id == user_id).scalar()
+        if reputation is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        leaderboard.set(user_id, reputation)
+    
+    return UserRankResponse(
+        user_id=user_id,
+        reputation=leaderboard.reputation(user_id),
+        rank=leaderboard.rank(user_id),
+        total_users=len(leaderboard),
+        **UserService(db).get_user_stats(user_id)
+    )
 
 @router.get("/questions/top")
 def get_top_questions(
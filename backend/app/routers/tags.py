@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.config import get_db
-from app.schemas.schemas import TagResponse, QuestionResponse
+from app.schemas.schemas import TagResponse, RelatedTagResponse, QuestionListResponse
 from app.services.tag_service import TagService
+from app.services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.services.normalize import RESPONSE_FORMAT_PATTERN, normalized_questions
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
@@ -21,13 +23,43 @@ def get_popular_tags(limit: int = 20, db: Session = Depends(get_db)):
     return tag_service.get_popular_tags(limit)
 
 @router.get("/search", response_model=List[TagResponse])
-def search_tags(q: str, limit: int = 10, db: Session = Depends(get_db)):
-    """Search tags"""
+def search_tags(q: str, limit: int = Query(10, ge=1, le=20), db: Session = Depends(get_db)):
+    """Autocomplete tags by name prefix, most used first"""
     tag_service = TagService(db)
     return tag_service.search_tags(q, limit)
 
-@router.get("/{tag_name}/questions", response_model=List[QuestionResponse])
-def get_questions_by_tag(tag_name: str, skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    """Get questions by tag"""
+@router.get("/{tag_name}/questions", response_model=List[QuestionListResponse])
+def get_questions_by_tag(
+    tag_name: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    sort: str = Query('newest', pattern='^(newest|votes|hot)$'),
+    limit: int = Query(10, ge=1, le=50),
+    response_format: str = Query('nested', alias='format', pattern=RESPONSE_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """Get questions by tag (next cursor in the X-Next-Cursor header)"""
     tag_service = TagService(db)
-    return tag_service.get_questions_by_tag(tag_name, skip, limit) 
\ No newline at end of file
+    try:
+        questions, next_cursor = tag_service.get_questions_by_tag(tag_name, cursor, limit, sort)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if response_format == 'normalized':
+        return normalized_questions(questions, dict(response.headers))
+    return questions
+
+@router.get("/{tag_name}/related", response_model=List[RelatedTagResponse])
+def get_related_tags(
+    tag_name: str,
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Tags most often used together with this one, ranked by lift"""
+    tag_service = TagService(db)
+    related = tag_service.get_related_tags(tag_name, limit)
+    if related is None:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    return related
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database.config import get_db
-from app.schemas.schemas import UserCreate, UserUpdate, UserResponse, UserWithStats
-from app.services.user_service import UserService
+from app.database.config import get_db, get_async_db
+from app.schemas.schemas import UserCreate, UserUpdate, UserResponse, UserWithStats, ReputationEventResponse
+from app.services.user_service import UserService, AsyncUserService
+from app.services.reputation_service import ReputationService
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -27,17 +29,23 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     return user_service.create_user(user)
 
 @router.get("/{user_id}", response_model=UserWithStats)
-def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get user by ID with statistics"""
-    user_service = UserService(db)
-    user = user_service.get_user_by_id(user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_id(user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    stats = user_service.get_user_stats(user_id)
+    stats = await user_service.get_user_stats(user_id)
     return UserWithStats(**user.__dict__, **stats)
 
+@router.get("/{user_id}/reputation", response_model=List[ReputationEventResponse])
+def get_user_reputation_history(user_id: str, skip: int = 0, limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    """Get the reputation events behind a user's reputation, newest first"""
+    reputation_service = ReputationService(db)
+    return reputation_service.get_user_events(user_id, skip, limit)
+
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(user_id: str, user_update: UserUpdate, db: Session = Depends(get_db)):
     """Update user information"""
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from app.database.config import get_db
-from app.schemas.schemas import VoteCreate, MessageResponse
+from app.schemas.schemas import VoteCreate, VoteStateRequest, VoteStateResponse, MessageResponse
 from app.services.vote_service import VoteService
 from app.dependencies.auth import require_auth
 
@@ -16,7 +16,7 @@ def create_vote(
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """Create or update a vote"""
-    user_id = current_user['local_user'].id  # Use authenticated user
+    user_id = current_user['user_id']  # Use authenticated user
     vote_service = VoteService(db)
     result = vote_service.vote(vote, user_id)
     
@@ -26,6 +26,16 @@ def create_vote(
     # Return the full result instead of just MessageResponse
     return result
 
+@router.post("/state", response_model=VoteStateResponse)
+def get_vote_state(
+    request: VoteStateRequest,
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(require_auth)
+):
+    """Get the current user's votes for lists of questions and answers"""
+    vote_service = VoteService(db)
+    return vote_service.get_vote_state(current_user['user_id'], request.question_ids, request.answer_ids)
+
 @router.get("/question/{question_id}")
 def get_question_votes(question_id: str, db: Session = Depends(get_db)):
     """Get vote statistics for a question"""
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List
+
+from app.database.config import get_db
+from app.services.clerk_service import clerk_service
+from app.services.user_service import UserService
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+def apply_clerk_events(db: Session, events: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Apply a batch of Clerk user events: one upsert and one deactivation"""
+    upserts = []
+    deleted = []
+    for event in events:
+        event_type = event.get('type')
+        data = event.get('data') or {}
+        if event_type in ('user.created', 'user.updated'):
+            upserts.append(clerk_service.profile_from_user_data(data))
+        elif event_type == 'user.deleted' and data.get('id'):
+            deleted.append(data['id'])
+
+    user_service = UserService(db)
+    upserted = user_service.upsert_clerk_users(upserts)
+    deactivated = user_service.deactivate_clerk_users(deleted)
+    return {"upserted": len(upserted), "deactivated": deactivated}
+
+@router.post("/clerk")
+async def clerk_webhook(request: Request, db: Session = Depends(get_db)):
+    """Provision users from signed Clerk user.created/updated/deleted events"""
+    payload = await request.body()
+    body = clerk_service.verify_webhook(payload, request.headers)
+    if body is None:
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+
+    # Clerk sends one event per delivery; replays may post a list
+    events = body if isinstance(body, list) else [body]
+    result = await run_in_threadpool(apply_clerk_events, db, events)
+    return {"success": True, **result}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Dict
 from datetime import datetime
 
 # Base schemas
@@ -31,6 +31,17 @@ class UserWithStats(UserResponse):
     question_count: int = 0
     answer_count: int = 0
 
+class LeaderboardEntry(UserResponse):
+    rank: int
+
+class UserRankResponse(BaseModel):
+    user_id: str
+    reputation: int
+    rank: int
+    total_users: int
+    question_count: int = 0
+    answer_count: int = 0
+
 # Tag schemas
 class TagBase(BaseModel):
     name: str = Field(..., max_length=50)
@@ -48,6 +59,11 @@ class TagResponse(TagBase):
     class Config:
         from_attributes = True
 
+class RelatedTagResponse(TagResponse):
+    questions: int  # Questions carrying both tags
+    lift: float
+    pmi: float
+
 # Question schemas
 class QuestionBase(BaseModel):
     title: str = Field(..., max_length=255)
@@ -61,7 +77,9 @@ class QuestionUpdate(BaseModel):
     content: Optional[str] = Field(None, min_length=10)
     tag_names: Optional[List[str]] = Field(None, max_items=5)
 
-class QuestionResponse(QuestionBase):
+# *Fields schemas hold a question's or answer's own columns; normalized
+# responses (?format=normalized) use them with user/tag references only
+class QuestionFields(QuestionBase):
     id: str
     user_id: str
     views: int
@@ -70,27 +88,52 @@ class QuestionResponse(QuestionBase):
     is_solved: bool
     created_at: datetime
     updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class QuestionResponse(QuestionFields):
     author: UserResponse
     tags: List[TagResponse]
+
+# Trimmed author and tag shapes for question lists
+class AuthorSummary(BaseModel):
+    id: str
+    username: str
+    display_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    reputation: int
     
     class Config:
         from_attributes = True
 
-class QuestionListResponse(BaseModel):
+class TagSummary(BaseModel):
     id: str
+    name: str
+    color: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class QuestionListFields(BaseModel):
+    id: str
+    user_id: str
     title: str
-    content: str
+    excerpt: Optional[str] = None  # Plain text, the full content is on the detail endpoint
     views: int
     vote_count: int
     answer_count: int
     is_solved: bool
     created_at: datetime
-    author: UserResponse
-    tags: List[TagResponse]
+    updated_at: Optional[datetime] = None  # Last edit, for the "active" sort
     
     class Config:
         from_attributes = True
 
+class QuestionListResponse(QuestionListFields):
+    author: AuthorSummary
+    tags: List[TagSummary]
+
 # Answer schemas
 class AnswerBase(BaseModel):
     content: str = Field(..., min_length=10)
@@ -101,7 +144,7 @@ class AnswerCreate(AnswerBase):
 class AnswerUpdate(BaseModel):
     content: Optional[str] = Field(None, min_length=10)
 
-class AnswerResponse(AnswerBase):
+class AnswerFields(AnswerBase):
     id: str
     question_id: str
     user_id: str
@@ -109,17 +152,28 @@ class AnswerResponse(AnswerBase):
     is_accepted: bool
     created_at: datetime
     updated_at: datetime
-    author: UserResponse
     
     class Config:
         from_attributes = True
 
+class AnswerResponse(AnswerFields):
+    author: UserResponse
+
 # Vote schemas
 class VoteCreate(BaseModel):
     question_id: Optional[str] = None
     answer_id: Optional[str] = None
     vote_type: int = Field(..., ge=-1, le=1)  # -1, 0, or 1
 
+class VoteStateRequest(BaseModel):
+    question_ids: List[str] = Field(default_factory=list, max_length=100)
+    answer_ids: List[str] = Field(default_factory=list, max_length=200)
+
+class VoteStateResponse(BaseModel):
+    # Only targets the user voted on appear; missing ids mean no vote
+    questions: Dict[str, int]
+    answers: Dict[str, int]
+
 class VoteResponse(BaseModel):
     id: str
     user_id: str
@@ -131,12 +185,28 @@ class VoteResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ReputationEventResponse(BaseModel):
+    id: str
+    delta: int
+    reason: str
+    actor_id: Optional[str]
+    question_id: Optional[str]
+    answer_id: Optional[str]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 # Search and filter schemas
 class SearchRequest(BaseModel):
     query: Optional[str] = None
-    tags: Optional[List[str]] = None
-    sort_by: Optional[str] = Field('created_at')
-    sort_order: Optional[str] = Field('desc')
+    tags: Optional[List[str]] = Field(None, max_items=20)  # Any of these
+    all_tags: Optional[List[str]] = Field(None, max_items=20)  # Every one of these
+    exclude_tags: Optional[List[str]] = Field(None, max_items=20)  # None of these
+    is_solved: Optional[bool] = None
+    unanswered: Optional[bool] = None
+    sort_by: Optional[str] = Field('created_at', pattern='^(created_at|updated_at|vote_count|answer_count|views|hot_score)$')
+    sort_order: Optional[str] = Field('desc', pattern='^(asc|desc)$')
     page: Optional[int] = Field(1, ge=1)
     limit: Optional[int] = Field(10, ge=1, le=50)
 
@@ -148,6 +218,24 @@ class PaginatedResponse(BaseModel):
     limit: int
     total_pages: int
 
+class TagFacet(BaseModel):
+    name: str
+    count: int
+
+class SearchFacets(BaseModel):
+    tags: List[TagFacet]
+    solved: int
+    unsolved: int
+
+class QuestionSearchResponse(BaseModel):
+    items: List[QuestionListResponse]
+    total: int
+    total_capped: bool = False  # Matches beyond SEARCH_MATCH_LIMIT (or the sort candidate limit) were left out
+    page: int
+    limit: int
+    total_pages: int
+    facets: SearchFacets
+
 class MessageResponse(BaseModel):
     message: str
     success: bool = True
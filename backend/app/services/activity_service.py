@@ -0,0 +1,208 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
+from decouple import config
+from app.models.models import ActivityRollup, TagDailyRollup, Question, Answer, Vote, User, Tag, question_tags, Timestamp
+from app.database.upsert import upsert
+from app.database.after_commit import after_commit
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from collections import Counter
+from datetime import datetime, timedelta
+import threading
+
+# Buffered activity is written to the rollups this often
+ACTIVITY_FLUSH_INTERVAL = config('ACTIVITY_FLUSH_INTERVAL', default=10, cast=int)
+# The catch-up job recounts this much recent history from the source tables
+ACTIVITY_ROLLUP_INTERVAL = config('ACTIVITY_ROLLUP_INTERVAL', default=300, cast=int)
+ACTIVITY_CATCHUP_HOURS = config('ACTIVITY_CATCHUP_HOURS', default=48, cast=int)
+
+ACTIVITY_METRICS = ("questions", "answers", "votes", "users")
+PERIODS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Metric -> creation timestamp column it counts
+_SOURCES = {
+    "questions": Question.created_at,
+    "answers": Answer.created_at,
+    "votes": Vote.created_at,
+    "users": User.created_at,
+}
+
+
+def truncate(moment: datetime, period: str) -> datetime:
+    """Start of the hour or day containing moment"""
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def database_now(db: Session) -> datetime:
+    """The database's clock, which stamps every created_at the rollups count"""
+    return db.execute(select(func.now(type_=Timestamp))).scalar()
+
+
+# Add the incoming counts to an existing bucket row
+_ADD_METRICS = {m: (lambda incoming, m=m: getattr(ActivityRollup.__table__.c, m) + incoming[m]) for m in ACTIVITY_METRICS}
+_ADD_TAG_QUESTIONS = {"questions": lambda incoming: TagDailyRollup.__table__.c.questions + incoming["questions"]}
+
+
+class ActivityBuffer:
+    """Counts committed activity in memory and adds it to the rollup rows in batches
+
+    Writers never touch the current hour/day rows, so they don't queue
+    behind each other (or deadlock with other row locks) on those hot rows.
+    Activity is stamped with this process's clock and shifted onto the
+    database's clock at flush, so it lands in the same buckets catch_up()
+    derives from created_at.
+    """
+
+    def __init__(self):
+        self._counts: Dict[datetime, Counter] = {}  # second -> metric counts
+        self._tag_counts: Counter = Counter()  # (second, tag_id) -> new questions
+        self._lock = threading.Lock()
+
+    def add(self, counts: Dict[str, int], tag_ids: Iterable[str] = ()):
+        second = datetime.utcnow().replace(microsecond=0)
+        with self._lock:
+            self._counts.setdefault(second, Counter()).update(counts)
+            self._tag_counts.update((second, tag_id) for tag_id in set(tag_ids))
+
+    def flush(self, db: Session) -> int:
+        """Upsert pending activity into its hour/day buckets, one statement per table"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            tag_counts, self._tag_counts = self._tag_counts, Counter()
+        if not counts and not tag_counts:
+            return 0
+
+        try:
+            offset = timedelta(seconds=round((database_now(db) - datetime.utcnow()).total_seconds()))
+            buckets: Dict[Tuple[str, datetime], Counter] = {}
+            for second, metrics in counts.items():
+                for period in PERIODS:
+                    buckets.setdefault((period, truncate(second + offset, period)), Counter()).update(metrics)
+            tag_days: Counter = Counter()
+            for (second, tag_id), n in tag_counts.items():
+                tag_days[(truncate(second + offset, "day"), tag_id)] += n
+
+            rows = [
+                {"period": period, "bucket": bucket, **{m: metrics[m] for m in ACTIVITY_METRICS}}
+                for (period, bucket), metrics in buckets.items() if any(metrics.values())
+            ]
+            tag_rows = [{"day": day, "tag_id": tag_id, "questions": n} for (day, tag_id), n in tag_days.items()]
+            if rows:
+                upsert(db, ActivityRollup.__table__, rows, ["period", "bucket"], update=_ADD_METRICS)
+            if tag_rows:
+                upsert(db, TagDailyRollup.__table__, tag_rows, ["day", "tag_id"], update=_ADD_TAG_QUESTIONS)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for second, metrics in counts.items():
+                    self._counts.setdefault(second, Counter()).update(metrics)
+                self._tag_counts.update(tag_counts)
+            raise
+        return len(rows) + len(tag_rows)
+
+# Create a global instance
+activity_buffer = ActivityBuffer()
+
+
+def record_activity(db: Union[Session, AsyncSession], tag_ids: Iterable[str] = (), **counts: int):
+    """Count new activity toward the current hour/day buckets once the caller's transaction commits"""
+    counts = {m: n for m, n in counts.items() if n}
+    tag_ids = list(tag_ids)
+    if counts or tag_ids:
+        after_commit(db, lambda: activity_buffer.add(counts, tag_ids))
+
+
+class ActivityService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def catch_up(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """Recount rollups from the source tables for everything since `since`
+
+        Live writes keep buckets current; this repairs anything they missed
+        (crashes, bulk imports, deletions) by rewriting whole buckets from
+        the day containing `since` (default: ACTIVITY_CATCHUP_HOURS ago;
+        pass datetime.min to backfill all history). This process's buffered
+        activity is flushed first; activity still buffered in other workers
+        is counted again when they flush, until the next catch-up.
+        """
+        activity_buffer.flush(self.db)
+        since = since or database_now(self.db) - timedelta(hours=ACTIVITY_CATCHUP_HOURS)
+        start = truncate(since, "day")
+
+        buckets: Dict[Tuple[str, datetime], Counter] = {}
+        for metric, created_at in _SOURCES.items():
+            for (moment,) in self.db.query(created_at).filter(created_at >= start).yield_per(10000):
+                if moment is None:
+                    continue
+                for period in PERIODS:
+                    buckets.setdefault((period, truncate(moment, period)), Counter())[metric] += 1
+
+        tag_days: Counter = Counter()
+        tagged = self.db.query(question_tags.c.tag_id, Question.created_at).join(
+            Question, Question.id == question_tags.c.question_id
+        ).filter(Question.created_at >= start)
+        for tag_id, moment in tagged.yield_per(10000):
+            if moment is not None:
+                tag_days[(truncate(moment, "day"), tag_id)] += 1
+
+        # Buckets that no longer have any rows behind them drop to zero
+        for period, bucket in self.db.query(ActivityRollup.period, ActivityRollup.bucket).filter(ActivityRollup.bucket >= start):
+            buckets.setdefault((period, bucket), Counter())
+        for day, tag_id in self.db.query(TagDailyRollup.day, TagDailyRollup.tag_id).filter(TagDailyRollup.day >= start):
+            tag_days.setdefault((day, tag_id), 0)
+
+        rows = [
+            {"period": period, "bucket": bucket, **{m: counts[m] for m in ACTIVITY_METRICS}}
+            for (period, bucket), counts in buckets.items()
+        ]
+        tag_rows = [{"day": day, "tag_id": tag_id, "questions": n} for (day, tag_id), n in tag_days.items()]
+        try:
+            for start_index in range(0, len(rows), 1000):
+                upsert(self.db, ActivityRollup.__table__, rows[start_index:start_index + 1000], ["period", "bucket"],
+                       update={m: "excluded" for m in ACTIVITY_METRICS})
+            for start_index in range(0, len(tag_rows), 1000):
+                upsert(self.db, TagDailyRollup.__table__, tag_rows[start_index:start_index + 1000], ["day", "tag_id"],
+                       update={"questions": "excluded"})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return {"buckets": len(rows), "tag_days": len(tag_rows)}
+
+    def get_activity(self, period: str = "day", buckets: int = 30) -> List[dict]:
+        """Activity per hour/day for the most recent buckets, oldest first, with empty buckets filled in"""
+        step = PERIODS[period]
+        end = truncate(database_now(self.db), period)
+        start = end - step * (buckets - 1)
+        stored = {
+            row.bucket: row
+            for row in self.db.query(ActivityRollup).filter(
+                ActivityRollup.period == period,
+                ActivityRollup.bucket >= start
+            )
+        }
+
+        series = []
+        for i in range(buckets):
+            bucket = start + step * i
+            row = stored.get(bucket)
+            series.append({"bucket": bucket, **{m: getattr(row, m) if row else 0 for m in ACTIVITY_METRICS}})
+        return series
+
+    def get_tag_activity(self, days: int = 30, limit: int = 10) -> List[dict]:
+        """Tags with the most new questions over the last `days` days"""
+        start = truncate(database_now(self.db), "day") - timedelta(days=days - 1)
+        total = func.sum(TagDailyRollup.questions).label("questions")
+        top = self.db.query(TagDailyRollup.tag_id, total).filter(
+            TagDailyRollup.day >= start
+        ).group_by(TagDailyRollup.tag_id).having(total > 0).order_by(desc(total)).limit(limit).all()
+
+        tags = {tag.id: tag for tag in self.db.query(Tag).filter(Tag.id.in_([tag_id for tag_id, _ in top]))}
+        return [
+            {"name": tags[tag_id].name, "color": tags[tag_id].color, "questions": int(questions)}
+            for tag_id, questions in top if tag_id in tags
+        ]
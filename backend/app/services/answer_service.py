@@ -1,7 +1,13 @@
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc
-from app.models.models import Answer, Question, User
+from app.models.models import Answer, Question, User, Vote
 from app.schemas.schemas import AnswerCreate, AnswerUpdate
+from app.services.question_service import question_cache
+from app.services.reputation_service import ReputationService, ACCEPT_REPUTATION
+from app.services.site_stats_service import bump_site_counters
+from app.services.activity_service import record_activity
+from app.services.hot_service import hot_scores
+from app.services.bitmap_index_service import question_bitmaps
 from typing import Optional, List
 
 class AnswerService:
@@ -18,8 +24,13 @@ class AnswerService:
         question = self.db.query(Question).filter(Question.id == answer_data.question_id).first()
         if question:
             question.answer_count += 1
+        bump_site_counters(self.db, total_answers=1)
+        record_activity(self.db, answers=1)
         
         self.db.commit()
+        question_cache.invalidate(answer_data.question_id)
+        hot_scores.touch(answer_data.question_id)
+        question_bitmaps.refresh(self.db, [answer_data.question_id])
         self.db.refresh(db_answer)
         return db_answer
 
@@ -45,6 +56,7 @@ class AnswerService:
             setattr(answer, field, value)
         
         self.db.commit()
+        question_cache.invalidate(answer.question_id)
         self.db.refresh(answer)
         return answer
 
@@ -60,11 +72,22 @@ class AnswerService:
         
         # Update question answer count
         question = self.db.query(Question).filter(Question.id == answer.question_id).first()
+        reputation_service = ReputationService(self.db)
         if question:
             question.answer_count -= 1
+            reputation_service.record_answer_removal(answer, question.user_id, actor_id=user_id)
         
+        # The answer's votes go with it (ORM cascade)
+        votes = self.db.query(func.count(Vote.id)).filter(Vote.answer_id == answer.id).scalar()
+        bump_site_counters(self.db, total_answers=-1, total_votes=-(votes or 0))
+        
+        question_id = answer.question_id
         self.db.delete(answer)
         self.db.commit()
+        reputation_service.publish()
+        question_cache.invalidate(question_id)
+        hot_scores.touch(question_id)
+        question_bitmaps.refresh(self.db, [question_id])
         return True
 
     def get_answers_by_question(self, question_id: str) -> List[Answer]:
@@ -102,16 +125,36 @@ class AnswerService:
             return False
         
         # Un-accept any previously accepted answer for this question
+        previously_accepted = self.db.query(Answer.id, Answer.user_id).filter(
+            Answer.question_id == answer.question_id,
+            Answer.is_accepted == True
+        ).all()
         self.db.query(Answer).filter(
             Answer.question_id == answer.question_id,
             Answer.is_accepted == True
         ).update({Answer.is_accepted: False})
         
         # Accept this answer
+        if not question.is_solved:
+            bump_site_counters(self.db, solved_questions=1)
         answer.is_accepted = True
         question.is_solved = True
         
+        # Move the acceptance reputation; accepting your own answer earns nothing
+        reputation_service = ReputationService(self.db)
+        for previous in previously_accepted:
+            if previous.id != answer.id and previous.user_id != question.user_id:
+                reputation_service.record(previous.user_id, -ACCEPT_REPUTATION, "unaccept", actor_id=question_owner_id,
+                                          question_id=question.id, answer_id=previous.id)
+        if answer.id not in {previous.id for previous in previously_accepted} and answer.user_id != question.user_id:
+            reputation_service.record(answer.user_id, ACCEPT_REPUTATION, "accept", actor_id=question_owner_id,
+                                      question_id=question.id, answer_id=answer.id)
+        
+        question_id = question.id
         self.db.commit()
+        reputation_service.publish()
+        question_cache.invalidate(question_id)
+        question_bitmaps.refresh(self.db, [question_id])
         return True
 
     def unaccept_answer(self, answer_id: str, question_owner_id: str) -> bool:
@@ -130,6 +173,10 @@ class AnswerService:
             return False
         
         # Unaccept the answer
+        reputation_service = ReputationService(self.db)
+        if answer.is_accepted and answer.user_id != question.user_id:
+            reputation_service.record(answer.user_id, -ACCEPT_REPUTATION, "unaccept", actor_id=question_owner_id,
+                                      question_id=question.id, answer_id=answer.id)
         answer.is_accepted = False
         
         # Check if there are any other accepted answers
@@ -139,9 +186,15 @@ class AnswerService:
         ).first()
         
         if not other_accepted:
+            if question.is_solved:
+                bump_site_counters(self.db, solved_questions=-1)
             question.is_solved = False
         
+        question_id = question.id
         self.db.commit()
+        reputation_service.publish()
+        question_cache.invalidate(question_id)
+        question_bitmaps.refresh(self.db, [question_id])
         return True
 
     def get_popular_answers(self, limit: int = 10) -> List[Answer]:
@@ -0,0 +1,203 @@
+from sqlalchemy.orm import Session
+from decouple import config
+from app.models.models import Tag
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_left, insort
+import heapq
+import threading
+
+# Full reload from the tags table; live changes are applied in between
+TAG_AUTOCOMPLETE_REBUILD_INTERVAL = config('TAG_AUTOCOMPLETE_REBUILD_INTERVAL', default=600, cast=int)
+# Prefixes up to this length keep a precomputed top list; longer ones scan their (small) range
+TAG_PREFIX_LENGTH = 2
+TAG_SUGGESTION_LIMIT = 20
+
+_RANGE_END = "\uffff"
+
+Key = Tuple[int, str]  # (-usage_count, name): most used first, ties by name
+
+
+def _tag_entry(tag) -> dict:
+    """TagResponse fields for a Tag row"""
+    return {
+        "id": tag.id,
+        "name": tag.name,
+        "description": tag.description,
+        "color": tag.color,
+        "usage_count": tag.usage_count or 0,
+        "created_at": tag.created_at,
+    }
+
+
+def _key(entry: dict) -> Key:
+    return (-entry["usage_count"], entry["name"])
+
+
+def _prefixes(name: str) -> List[str]:
+    return [name[:i] for i in range(min(len(name), TAG_PREFIX_LENGTH) + 1)]
+
+
+class TagAutocomplete:
+    """In-memory tag name index: sorted names plus the most used tags per short prefix"""
+
+    def __init__(self):
+        self._names: List[str] = []  # Sorted, for prefix ranges
+        self._tags: Dict[str, dict] = {}  # name -> TagResponse fields
+        self._names_by_id: Dict[str, str] = {}
+        self._top: Dict[str, List[Key]] = {}  # Short prefix -> best TAG_SUGGESTION_LIMIT keys
+        self._stale: Set[str] = set()  # Top lists that lost an entry and need a rescan
+        self._lock = threading.Lock()
+        # Changes made while a rebuild is reading the table, re-applied on swap (None = removed)
+        self._changed_during_rebuild: Optional[Dict[str, Optional[dict]]] = None
+
+    def rebuild(self, db: Session) -> int:
+        """Reload every tag from the database"""
+        with self._lock:
+            self._changed_during_rebuild = {}
+
+        try:
+            entries = [
+                _tag_entry(tag)
+                for tag in db.query(
+                    Tag.id, Tag.name, Tag.description, Tag.color, Tag.usage_count, Tag.created_at
+                ).yield_per(10000)
+            ]
+        except Exception:
+            with self._lock:
+                self._changed_during_rebuild = None
+            raise
+
+        self.replace(entries)
+        print(f"🏷️ Tag autocomplete rebuilt with {len(self._tags)} tags")
+        return len(self._tags)
+
+    def replace(self, entries: Iterable[dict]):
+        """Swap in a complete set of tag entries"""
+        tags = {entry["name"]: entry for entry in entries}
+        names = sorted(tags)
+        top: Dict[str, List[Key]] = {}
+        for key in sorted(_key(entry) for entry in tags.values()):
+            for prefix in _prefixes(key[1]):
+                best = top.setdefault(prefix, [])
+                if len(best) < TAG_SUGGESTION_LIMIT:
+                    best.append(key)
+
+        with self._lock:
+            self._names, self._tags, self._top, self._stale = names, tags, top, set()
+            self._names_by_id = {entry["id"]: name for name, entry in tags.items()}
+            changed, self._changed_during_rebuild = self._changed_during_rebuild, None
+            # The snapshot may predate these; the live values win
+            for name, entry in (changed or {}).items():
+                if entry is None:
+                    self._remove(name)
+                else:
+                    self._set(entry)
+
+    def set(self, tag):
+        """Add a tag or record its new name/usage count"""
+        entry = _tag_entry(tag)
+        with self._lock:
+            old_name = self._names_by_id.get(entry["id"])
+            if old_name is not None and old_name != entry["name"]:
+                self._remove(old_name)
+            self._set(entry)
+
+    def remove(self, name: str):
+        """Drop a deleted tag"""
+        with self._lock:
+            self._remove(name)
+
+    def refresh(self, db: Session, tag_ids: Iterable[str]):
+        """Re-read tags whose usage counts changed in SQL"""
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return
+        tags = db.query(
+            Tag.id, Tag.name, Tag.description, Tag.color, Tag.usage_count, Tag.created_at
+        ).filter(Tag.id.in_(tag_ids)).all()
+        for tag in tags:
+            self.set(tag)
+        for tag_id in tag_ids - {tag.id for tag in tags}:
+            name = self._names_by_id.get(tag_id)
+            if name is not None:
+                self.remove(name)
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        """Most used tags whose name starts with query"""
+        prefix = query.strip().lower()
+        limit = min(limit, TAG_SUGGESTION_LIMIT)
+        with self._lock:
+            if len(prefix) <= TAG_PREFIX_LENGTH:
+                if prefix in self._stale:
+                    self._top[prefix] = self._scan(prefix, TAG_SUGGESTION_LIMIT)
+                    self._stale.discard(prefix)
+                keys = self._top.get(prefix, [])[:limit]
+            else:
+                keys = self._scan(prefix, limit)
+            return [dict(self._tags[name]) for _, name in keys]
+
+    def get(self, name: str) -> Optional[dict]:
+        """TagResponse fields for a tag name"""
+        return self._tags.get(name.lower())
+
+    def get_by_id(self, tag_id: str) -> Optional[dict]:
+        name = self._names_by_id.get(tag_id)
+        return self._tags.get(name) if name is not None else None
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def _scan(self, prefix: str, limit: int) -> List[Key]:
+        start = bisect_left(self._names, prefix)
+        end = bisect_left(self._names, prefix + _RANGE_END, start)
+        return heapq.nsmallest(limit, (_key(self._tags[self._names[i]]) for i in range(start, end)))
+
+    def _set(self, entry: dict):
+        name = entry["name"]
+        old = self._tags.get(name)
+        if old is None:
+            insort(self._names, name)
+            old_key = None
+        else:
+            old_key = _key(old)
+            self._names_by_id.pop(old["id"], None)
+        self._tags[name] = entry
+        self._names_by_id[entry["id"]] = name
+        if self._changed_during_rebuild is not None:
+            self._changed_during_rebuild[name] = entry
+        for prefix in _prefixes(name):
+            self._place(prefix, old_key, _key(entry))
+
+    def _remove(self, name: str):
+        old = self._tags.pop(name, None)
+        if old is None:
+            return
+        del self._names[bisect_left(self._names, name)]
+        self._names_by_id.pop(old["id"], None)
+        if self._changed_during_rebuild is not None:
+            self._changed_during_rebuild[name] = None
+        for prefix in _prefixes(name):
+            self._place(prefix, _key(old), None)
+
+    def _place(self, prefix: str, old_key: Optional[Key], key: Optional[Key]):
+        """Move one tag within a prefix's top list"""
+        best = self._top.setdefault(prefix, [])
+        # A list shorter than the limit holds every tag with the prefix
+        complete = len(best) < TAG_SUGGESTION_LIMIT
+        removed = False
+        if old_key is not None:
+            i = bisect_left(best, old_key)
+            if i < len(best) and best[i] == old_key:
+                del best[i]
+                removed = True
+
+        if key is not None and (complete or (best and key < best[-1])):
+            insort(best, key)
+            del best[TAG_SUGGESTION_LIMIT:]
+        elif removed and not complete:
+            # Tags outside the list may now outrank what is left in it
+            self._stale.add(prefix)
+
+
+# Create a global instance
+tag_autocomplete = TagAutocomplete()
@@ -0,0 +1,261 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from pyroaring import BitMap
+from decouple import config
+from app.models.models import Question, question_tags
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import threading
+import time
+
+# Full rebuild (which also compacts ordinals of deleted questions); live changes are applied in between
+QUESTION_BITMAPS_REBUILD_INTERVAL = config('QUESTION_BITMAPS_REBUILD_INTERVAL', default=3600, cast=int)
+
+FACETS = ("solved", "answered")
+# Largest tags checked when counting tags within a big result set
+FACET_CANDIDATE_TAGS = 500
+# How stale that size order may get while tags only grow or shrink
+FACET_RESORT_INTERVAL = 60
+
+
+class Matches:
+    """A bitmap of question ordinals and the ordinal -> question id list it was computed against
+
+    A rebuild renumbers ordinals, so results are resolved against the list
+    they came from; rebuilds swap in a new list rather than changing it.
+    """
+
+    __slots__ = ("bitmap", "ids", "generation")
+
+    def __init__(self, bitmap: BitMap, ids: List[Optional[str]], generation: int):
+        self.bitmap = bitmap
+        self.ids = ids
+        self.generation = generation
+
+    def __len__(self) -> int:
+        return len(self.bitmap)
+
+
+class QuestionBitmaps:
+    """Compressed (roaring) bitmaps of questions per tag and per boolean facet
+
+    Questions are numbered with dense ordinals in creation order, so tag
+    AND/OR/NOT filters are bitmap operations and the newest matches are
+    the highest set bits.
+    """
+
+    def __init__(self):
+        self._ids: List[Optional[str]] = []  # ordinal -> question id (None once deleted)
+        self._ordinals: Dict[str, int] = {}
+        self._all = BitMap()  # Live questions
+        self._tags: Dict[str, BitMap] = {}  # tag_id -> questions
+        self._facets: Dict[str, BitMap] = {facet: BitMap() for facet in FACETS}
+        self._by_size: List[str] = []  # Tag ids, most questions first (re-sorted lazily)
+        self._sorted_at = 0.0
+        self._new_tags = False  # A tag bitmap was created since the last sort
+        self._generation = 0  # Bumped by every rebuild, which renumbers ordinals
+        self._lock = threading.Lock()
+        # Changes made while a rebuild is reading the tables, replayed on swap
+        self._changed_during_rebuild: Optional[List[tuple]] = None
+
+    def rebuild(self, db: Session) -> int:
+        """Reload every question and its tags from the database"""
+        with self._lock:
+            self._changed_during_rebuild = []
+
+        try:
+            connection = db.connection()
+            questions = connection.execute(
+                select(Question.id, Question.is_solved, Question.answer_count)
+                .order_by(Question.created_at, Question.id)
+            ).all()
+            tagged = connection.execute(select(question_tags.c.tag_id, question_tags.c.question_id)).all()
+        except Exception:
+            with self._lock:
+                self._changed_during_rebuild = None
+            raise
+
+        ids = [row.id for row in questions]
+        ordinals = {question_id: ordinal for ordinal, question_id in enumerate(ids)}
+        facets = {
+            "solved": BitMap(ordinal for ordinal, row in enumerate(questions) if row.is_solved),
+            "answered": BitMap(ordinal for ordinal, row in enumerate(questions) if row.answer_count),
+        }
+        members: Dict[str, List[int]] = {}
+        for tag_id, question_id in tagged:
+            ordinal = ordinals.get(question_id)
+            if ordinal is not None:
+                members.setdefault(tag_id, []).append(ordinal)
+        tags = {tag_id: BitMap(ordinal_list) for tag_id, ordinal_list in members.items()}
+
+        with self._lock:
+            self._ids, self._ordinals = ids, ordinals
+            self._generation += 1
+            self._all = BitMap(range(len(ids)))
+            self._tags, self._facets = tags, facets
+            self._new_tags = True
+            changed, self._changed_during_rebuild = self._changed_during_rebuild, None
+            for change in changed:
+                self._apply(*change)
+        print(f"🧩 Question bitmaps rebuilt with {len(ids)} questions and {len(tags)} tags")
+        return len(ids)
+
+    def add(self, question_id: str, tag_ids: Iterable[str] = ()):
+        """Index a new question (it gets the next, i.e. newest, ordinal)"""
+        self._change("add", question_id, tuple(tag_ids))
+
+    def set_tags(self, question_id: str, old_tag_ids: Iterable[str], new_tag_ids: Iterable[str]):
+        self._change("set_tags", question_id, tuple(old_tag_ids), tuple(new_tag_ids))
+
+    def set_facets(self, question_id: str, solved: bool, answered: bool):
+        self._change("set_facets", question_id, solved, answered)
+
+    def remove(self, question_id: str):
+        self._change("remove", question_id)
+
+    def refresh(self, db: Session, question_ids: Iterable[str]):
+        """Re-read the facets of questions whose solved/answer state changed"""
+        question_ids = set(question_ids)
+        if question_ids:
+            rows = db.query(Question.id, Question.is_solved, Question.answer_count).filter(
+                Question.id.in_(question_ids)
+            ).all()
+            for row in rows:
+                self.set_facets(row.id, bool(row.is_solved), bool(row.answer_count))
+
+    def _change(self, *change):
+        with self._lock:
+            self._apply(*change)
+            if self._changed_during_rebuild is not None:
+                self._changed_during_rebuild.append(change)
+
+    def _apply(self, kind: str, question_id: str, *args):
+        ordinal = self._ordinals.get(question_id)
+        if kind == "add":
+            if ordinal is None:
+                ordinal = len(self._ids)
+                self._ids.append(question_id)
+                self._ordinals[question_id] = ordinal
+                self._all.add(ordinal)
+            self._tag(args[0], ordinal)
+        elif ordinal is None:
+            return
+        elif kind == "set_tags":
+            old, new = args
+            for tag_id in old:
+                if tag_id in self._tags:
+                    self._tags[tag_id].discard(ordinal)
+            self._tag(new, ordinal)
+        elif kind == "set_facets":
+            for facet, value in zip(FACETS, args):
+                if value:
+                    self._facets[facet].add(ordinal)
+                else:
+                    self._facets[facet].discard(ordinal)
+        elif kind == "remove":
+            # Tag bitmaps may keep the ordinal; every query is intersected with _all
+            self._all.discard(ordinal)
+            for bitmap in self._facets.values():
+                bitmap.discard(ordinal)
+            self._ids[ordinal] = None
+            del self._ordinals[question_id]
+
+    def _tag(self, tag_ids: Iterable[str], ordinal: int):
+        for tag_id in tag_ids:
+            bitmap = self._tags.get(tag_id)
+            if bitmap is None:
+                bitmap = self._tags[tag_id] = BitMap()
+                self._new_tags = True
+            bitmap.add(ordinal)
+
+    def match(
+        self,
+        any_tags: Optional[Iterable[str]] = None,
+        all_tags: Optional[Iterable[str]] = None,
+        exclude_tags: Optional[Iterable[str]] = None,
+        facets: Optional[Dict[str, bool]] = None
+    ) -> Matches:
+        """Questions with any of any_tags, all of all_tags, none of exclude_tags
+        and the given facet values (tag ids; unknown tags match nothing)"""
+        empty = BitMap()
+        with self._lock:
+            result = self._all
+            if all_tags:
+                result = BitMap.intersection(result, *(self._tags.get(tag_id, empty) for tag_id in all_tags))
+            if any_tags:
+                result = result & BitMap.union(empty, *(self._tags.get(tag_id, empty) for tag_id in any_tags))
+            if exclude_tags:
+                result = result - BitMap.union(empty, *(self._tags.get(tag_id, empty) for tag_id in exclude_tags))
+            for facet, value in (facets or {}).items():
+                result = result & self._facets[facet] if value else result - self._facets[facet]
+            return Matches(BitMap(result) if result is self._all else result, self._ids, self._generation)
+
+    def page(self, matches: Matches, offset: int, limit: int, newest_first: bool = True) -> List[str]:
+        """Question ids for one page of matches in creation order"""
+        bitmap, ids = matches.bitmap, matches.ids
+        count = len(bitmap)
+        if newest_first:
+            positions = range(count - 1 - offset, max(count - 1 - offset - limit, -1), -1)
+        else:
+            positions = range(offset, min(offset + limit, count))
+        # A question deleted since matching comes back as None and is skipped
+        return [question_id for question_id in (ids[bitmap[position]] for position in positions) if question_id]
+
+    def ids(self, matches: Matches) -> List[str]:
+        ids = matches.ids
+        return [ids[ordinal] for ordinal in matches.bitmap if ids[ordinal]]
+
+    def of(self, question_ids: Iterable[str], within: Optional[Matches] = None) -> Matches:
+        """The given questions that still exist, optionally limited to within"""
+        with self._lock:
+            ordinals = self._ordinals
+            result = BitMap(ordinals[question_id] for question_id in question_ids if question_id in ordinals)
+            if within is not None:
+                result &= self._current(within)
+            return Matches(result, self._ids, self._generation)
+
+    def _current(self, matches: Matches) -> BitMap:
+        """matches in the current ordinals (they differ if a rebuild ran since); call with the lock held"""
+        if matches.generation == self._generation:
+            return matches.bitmap
+        ordinals, ids = self._ordinals, matches.ids
+        return BitMap(ordinals[ids[ordinal]] for ordinal in matches.bitmap if ids[ordinal] in ordinals)
+
+    def solved_count(self, matches: Matches) -> int:
+        with self._lock:
+            return self._current(matches).intersection_cardinality(self._facets["solved"])
+
+    def top_tags(self, matches: Matches, limit: int = 10) -> List[Tuple[str, int]]:
+        """(tag_id, matches with the tag) for the most common tags within matches
+
+        Checks the largest tags first and stops once a tag is too small to
+        make the list; tags outside the FACET_CANDIDATE_TAGS largest are
+        not considered, so this is approximate for narrow result sets.
+        """
+        best: List[Tuple[int, str]] = []  # Min-heap of (count, tag_id)
+        with self._lock:
+            matched = self._current(matches)
+            if self._new_tags or time.monotonic() - self._sorted_at > FACET_RESORT_INTERVAL:
+                self._by_size = sorted(self._tags, key=lambda tag_id: len(self._tags[tag_id]), reverse=True)
+                self._sorted_at, self._new_tags = time.monotonic(), False
+            for tag_id in self._by_size[:FACET_CANDIDATE_TAGS]:
+                bitmap = self._tags.get(tag_id)
+                if bitmap is None:
+                    continue
+                if len(best) == limit and len(bitmap) <= best[0][0]:
+                    break
+                count = matched.intersection_cardinality(bitmap)
+                if not count:
+                    continue
+                if len(best) < limit:
+                    heapq.heappush(best, (count, tag_id))
+                elif count > best[0][0]:
+                    heapq.heapreplace(best, (count, tag_id))
+        return [(tag_id, count) for count, tag_id in sorted(best, reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+
+# Create a global instance
+question_bitmaps = QuestionBitmaps()
@@ -1,14 +1,17 @@
 import httpx
 import jwt
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Awaitable, Callable
 from fastapi import HTTPException, status
 from decouple import config
-import json
+import asyncio
 import base64
+import hashlib
+import hmac
+import json
 import time
 
 class ClerkService:
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.secret_key = config('CLERK_SECRET_KEY')
         self.publishable_key = config('CLERK_PUBLISHABLE_KEY', default='')
         self.base_url = "https://api.clerk.com/v1"
@@ -16,43 +19,164 @@ class ClerkService:
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json"
         }
+        
+        # Local JWT verification against Clerk's JWKS
+        self.jwks_url = config('CLERK_JWKS_URL', default=f"{self.base_url}/jwks")
+        self.jwks_refresh_interval = config('CLERK_JWKS_REFRESH_INTERVAL', default=3600, cast=int)
+        self.jwks_min_refetch_interval = config('CLERK_JWKS_MIN_REFETCH_INTERVAL', default=30, cast=int)
+        self.jwt_leeway = config('CLERK_JWT_LEEWAY', default=5, cast=int)
+        self.issuer = config('CLERK_ISSUER', default='')
+        self.webhook_secret = config('CLERK_WEBHOOK_SECRET', default='')
+        self.webhook_tolerance = config('CLERK_WEBHOOK_TOLERANCE', default=300, cast=int)
+        self._signing_keys: Dict[str, Any] = {}
+        self._jwks_fetched_at = float('-inf')
+        self._jwks_lock = asyncio.Lock()
+        self._jwks_refresh_task: Optional[asyncio.Task] = None
+        
+        # Shared outbound HTTP client (created at startup, see startup())
+        self.max_connections = config('CLERK_HTTP_MAX_CONNECTIONS', default=20, cast=int)
+        self.max_keepalive_connections = config('CLERK_HTTP_MAX_KEEPALIVE', default=10, cast=int)
+        self.request_timeout = config('CLERK_HTTP_TIMEOUT', default=5.0, cast=float)
+        self._transport = transport  # Lets tests plug in httpx.MockTransport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._request_slots = asyncio.Semaphore(self.max_connections)
+        self._inflight_users: Dict[str, asyncio.Future] = {}
+        self._metrics = {
+            "requests": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "saturated": 0,  # Requests that had to wait for a free connection slot
+            "deduplicated": 0,  # get_user calls served by an in-flight lookup
+            "latency_total_ms": 0.0,
+            "latency_max_ms": 0.0
+        }
+    
+    async def startup(self):
+        """Create the shared HTTP client and start the JWKS refresh task"""
+        self._get_client()
+        await self.start_jwks_refresh()
+    
+    async def shutdown(self):
+        """Stop background work and close the shared HTTP client"""
+        await self.stop_jwks_refresh()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.request_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+    
+    async def _request(self, method: str, url: str) -> httpx.Response:
+        """Send a request through the shared client, bounded by the connection limit"""
+        if self._request_slots.locked():
+            self._metrics["saturated"] += 1
+        async with self._request_slots:
+            self._metrics["requests"] += 1
+            self._metrics["in_flight"] += 1
+            started = time.perf_counter()
+            try:
+                return await self._get_client().request(method, url)
+            except Exception:
+                self._metrics["errors"] += 1
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._metrics["in_flight"] -= 1
+                self._metrics["latency_total_ms"] += elapsed_ms
+                self._metrics["latency_max_ms"] = max(self._metrics["latency_max_ms"], elapsed_ms)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Outbound request and pool saturation counters"""
+        metrics = dict(self._metrics)
+        metrics["latency_avg_ms"] = round(metrics["latency_total_ms"] / metrics["requests"], 2) if metrics["requests"] else 0.0
+        metrics["max_connections"] = self.max_connections
+        metrics["available_slots"] = self._request_slots._value
+        return metrics
     
     async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify a Clerk JWT token"""
         return await self.verify_jwt_token(token)
     
-    async def verify_jwt_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify a Clerk JWT token"""
+    async def verify_jwt_token(
+        self,
+        token: str,
+        local_profile: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Verify a Clerk JWT token locally against the cached JWKS signing keys.
+        
+        For tokens without profile claims, local_profile(sub) may return the stored
+        profile (email, name, image_url) of an already synced user; the Clerk API is
+        only called for users it doesn't know.
+        """
         try:
-            print(f"🔍 Decoding JWT token...")
-            
-            # For development, we'll decode without verification
-            # In production, you should verify the signature with Clerk's public key
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            
-            print(f"📄 Decoded token: {decoded}")
-            
-            # Check if token is expired
-            current_time = int(time.time())
-            exp = decoded.get('exp', 0)
+            header = jwt.get_unverified_header(token)
+            kid = header.get('kid')
+            if not kid:
+                print("❌ Token has no key ID")
+                return None
             
-            if exp and current_time > exp:
-                print("❌ Token expired")
+            signing_key = await self._get_signing_key(kid)
+            if not signing_key:
+                print(f"❌ Unknown signing key: {kid}")
                 return None
             
-            # Get user ID from token
+            # Signature, expiry and not-before are all checked here
+            decoded = jwt.decode(
+                token,
+                signing_key,
+                algorithms=["RS256"],
+                leeway=self.jwt_leeway,
+                issuer=self.issuer or None,
+                options={"require": ["exp", "sub"], "verify_aud": False}
+            )
+            
             user_id = decoded.get('sub')  # 'sub' is the user ID in JWT
             
-            if not user_id:
-                print("❌ No user ID in token")
-                return None
+            # Session tokens carry the profile when the Clerk session token
+            # template includes these claims; otherwise fall back to the API.
+            if decoded.get('email'):
+                given_name = decoded.get('given_name') or decoded.get('first_name') or ''
+                family_name = decoded.get('family_name') or decoded.get('last_name') or ''
+                return {
+                    'sub': user_id,
+                    'user_id': user_id,
+                    'email': decoded.get('email'),
+                    'given_name': given_name,
+                    'family_name': family_name,
+                    'name': decoded.get('name') or f"{given_name} {family_name}".strip(),
+                    'image_url': decoded.get('image_url') or decoded.get('picture') or '',
+                    'exp': decoded['exp'],
+                    'clerk_data': None
+                }
             
-            print(f"👤 User ID from token: {user_id}")
+            profile = await local_profile(user_id) if local_profile else None
+            if profile:
+                return {
+                    'sub': user_id,
+                    'user_id': user_id,
+                    'email': profile.get('email'),
+                    'given_name': '',
+                    'family_name': '',
+                    'name': profile.get('name') or '',
+                    'image_url': profile.get('image_url') or '',
+                    'exp': decoded['exp'],
+                    'clerk_data': None
+                }
             
-            # Get additional user data from Clerk API
+            print(f"⚠️ Token for unknown user {user_id} has no profile claims, fetching from Clerk API")
             user_data = await self.get_user(user_id)
             if user_data:
-                result = {
+                return {
                     'sub': user_id,  # Keep original field name
                     'user_id': user_id,
                     'email': user_data.get('email_addresses', [{}])[0].get('email_address'),
@@ -60,39 +184,167 @@ class ClerkService:
                     'family_name': user_data.get('last_name', ''),
                     'name': f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip(),
                     'image_url': user_data.get('image_url', ''),
+                    'exp': decoded['exp'],
                     'clerk_data': user_data
                 }
-                print(f"✅ User data retrieved: {result}")
-                return result
             
             print("❌ Could not get user data from Clerk API")
             return None
+        except jwt.ExpiredSignatureError:
+            print("❌ Token expired")
+            return None
+        except jwt.InvalidTokenError as e:
+            print(f"❌ Invalid token: {e}")
+            return None
         except Exception as e:
             print(f"💥 Error verifying JWT: {e}")
             import traceback
             traceback.print_exc()
             return None
     
+    async def _get_signing_key(self, kid: str) -> Optional[Any]:
+        """Get a signing key by ID, re-fetching the JWKS once for unknown keys"""
+        key = self._signing_keys.get(kid)
+        if key is not None:
+            return key
+        
+        # A new kid usually means Clerk rotated keys; throttle re-fetches so
+        # tokens with garbage kids can't hammer the JWKS endpoint.
+        if time.monotonic() - self._jwks_fetched_at >= self.jwks_min_refetch_interval:
+            await self.refresh_jwks()
+        return self._signing_keys.get(kid)
+    
+    async def refresh_jwks(self) -> bool:
+        """Fetch Clerk's JWKS and replace the cached signing keys"""
+        async with self._jwks_lock:
+            # Another request may have refreshed while we waited for the lock
+            if time.monotonic() - self._jwks_fetched_at < self.jwks_min_refetch_interval and self._signing_keys:
+                return True
+            self._jwks_fetched_at = time.monotonic()
+            try:
+                response = await self._request("GET", self.jwks_url)
+                
+                if response.status_code != 200:
+                    print(f"❌ JWKS fetch failed: {response.status_code} {response.text}")
+                    return False
+                
+                keys = {}
+                for jwk in response.json().get('keys', []):
+                    kid = jwk.get('kid')
+                    if kid and jwk.get('kty') == 'RSA':
+                        keys[kid] = jwt.PyJWK(jwk).key
+                
+                self._signing_keys = keys
+                print(f"🔑 Loaded {len(keys)} Clerk signing key(s)")
+                return True
+            except Exception as e:
+                print(f"💥 Error fetching JWKS: {e}")
+                return False
+    
+    async def _jwks_refresh_loop(self):
+        """Keep the JWKS cache warm so key rotation never hits a request"""
+        while True:
+            await self.refresh_jwks()
+            await asyncio.sleep(self.jwks_refresh_interval)
+    
+    async def start_jwks_refresh(self):
+        """Start the background JWKS refresh task"""
+        if self._jwks_refresh_task is None:
+            self._jwks_refresh_task = asyncio.create_task(self._jwks_refresh_loop())
+    
+    async def stop_jwks_refresh(self):
+        """Stop the background JWKS refresh task"""
+        if self._jwks_refresh_task is not None:
+            self._jwks_refresh_task.cancel()
+            try:
+                await self._jwks_refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._jwks_refresh_task = None
+    
+    def verify_webhook(self, payload: bytes, headers: Dict[str, str]) -> Optional[Any]:
+        """Verify a Svix-signed Clerk webhook and return the decoded payload"""
+        if not self.webhook_secret:
+            print("❌ CLERK_WEBHOOK_SECRET is not configured")
+            return None
+        
+        msg_id = headers.get('svix-id')
+        msg_timestamp = headers.get('svix-timestamp')
+        msg_signatures = headers.get('svix-signature')
+        if not (msg_id and msg_timestamp and msg_signatures):
+            print("❌ Missing webhook signature headers")
+            return None
+        
+        try:
+            timestamp = int(msg_timestamp)
+        except ValueError:
+            print("❌ Invalid webhook timestamp")
+            return None
+        if abs(time.time() - timestamp) > self.webhook_tolerance:
+            print("❌ Webhook timestamp outside tolerance")
+            return None
+        
+        secret = self.webhook_secret
+        if secret.startswith('whsec_'):
+            secret = secret[len('whsec_'):]
+        signed_content = f"{msg_id}.{msg_timestamp}.".encode() + payload
+        expected = base64.b64encode(
+            hmac.new(base64.b64decode(secret), signed_content, hashlib.sha256).digest()
+        ).decode()
+        
+        # The header holds space-separated "v1,<signature>" entries
+        for versioned in msg_signatures.split(' '):
+            version, _, signature = versioned.partition(',')
+            if version == 'v1' and hmac.compare_digest(signature, expected):
+                return json.loads(payload)
+        
+        print("❌ Webhook signature mismatch")
+        return None
+    
+    def profile_from_user_data(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the fields we store locally from a Clerk user object"""
+        emails = user_data.get('email_addresses') or []
+        primary_id = user_data.get('primary_email_address_id')
+        primary = next((e for e in emails if e.get('id') == primary_id), emails[0] if emails else {})
+        first_name = user_data.get('first_name') or ''
+        last_name = user_data.get('last_name') or ''
+        return {
+            'clerk_id': user_data.get('id'),
+            'email': primary.get('email_address'),
+            'name': f"{first_name} {last_name}".strip(),
+            'avatar_url': user_data.get('image_url') or ''
+        }
+    
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user data from Clerk"""
+        """Get user data from Clerk; concurrent lookups for one user share a single call"""
+        inflight = self._inflight_users.get(user_id)
+        if inflight is not None:
+            self._metrics["deduplicated"] += 1
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.ensure_future(self._fetch_user(user_id))
+        self._inflight_users[user_id] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight_users.pop(user_id, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight_users.pop(user_id, None))
+    
+    async def _fetch_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
             print(f"🔍 Getting user data for: {user_id}")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/users/{user_id}",
-                    headers=self.headers
-                )
-                
-                print(f"📡 Clerk API response: {response.status_code}")
-                
-                if response.status_code == 200:
-                    user_data = response.json()
-                    print(f"✅ User data from Clerk: {user_data}")
-                    return user_data
-                else:
-                    print(f"❌ Clerk API error: {response.text}")
-                    return None
+            response = await self._request("GET", f"{self.base_url}/users/{user_id}")
+            
+            print(f"📡 Clerk API response: {response.status_code}")
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"❌ Clerk API error: {response.text}")
+                return None
         except Exception as e:
             print(f"💥 Error getting user: {e}")
             import traceback
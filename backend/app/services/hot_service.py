@@ -0,0 +1,103 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam
+from decouple import config
+from app.models.models import Question
+from typing import Optional, Set
+from datetime import datetime
+import math
+import threading
+
+# hot = engagement * 0.5 ** (age / half-life). Stored as its logarithm shifted by
+# the decay since a fixed epoch: log(engagement) + rate * (created_at - epoch).
+# That differs from log(hot) by the same amount for every question at any
+# moment, so it sorts identically without ever being decayed, and hot-sort
+# cursors stay valid. Scores only change when engagement does.
+HOT_HALF_LIFE_HOURS = config('HOT_HALF_LIFE_HOURS', default=24, cast=float)
+HOT_VOTE_WEIGHT = config('HOT_VOTE_WEIGHT', default=1.0, cast=float)
+HOT_ANSWER_WEIGHT = config('HOT_ANSWER_WEIGHT', default=2.0, cast=float)
+HOT_VIEW_WEIGHT = config('HOT_VIEW_WEIGHT', default=0.5, cast=float)  # Per doubling of views
+HOT_REFRESH_INTERVAL = config('HOT_REFRESH_INTERVAL', default=15, cast=int)
+# Engagement at or below this (e.g. net downvoted) ranks as this
+HOT_MIN_ENGAGEMENT = 0.01
+HOT_EPOCH = datetime(2020, 1, 1)
+HOT_BATCH_SIZE = 1000
+
+_DECAY_RATE = math.log(2) / (HOT_HALF_LIFE_HOURS * 3600)  # Per second
+
+
+def hot_score(vote_count: int, answer_count: int, views: int, created_at: Optional[datetime]) -> float:
+    """Sort key for the hot order: log engagement (votes, answers, log views) plus the question's creation time in half-lives"""
+    engagement = (
+        1
+        + HOT_VOTE_WEIGHT * (vote_count or 0)
+        + HOT_ANSWER_WEIGHT * (answer_count or 0)
+        + HOT_VIEW_WEIGHT * math.log2(1 + (views or 0))
+    )
+    created = ((created_at or datetime.utcnow()) - HOT_EPOCH).total_seconds()
+    return math.log(max(engagement, HOT_MIN_ENGAGEMENT)) + _DECAY_RATE * created
+
+
+class HotScores:
+    """Keeps questions.hot_score current: touched questions are rescored in batches"""
+
+    def __init__(self):
+        self._touched: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def touch(self, *question_ids: Optional[str]):
+        """Mark questions whose votes, answers or views changed"""
+        with self._lock:
+            self._touched.update(question_id for question_id in question_ids if question_id)
+
+    def flush(self, db: Session) -> int:
+        """Rescore touched questions from their current counters"""
+        with self._lock:
+            touched, self._touched = self._touched, set()
+        if not touched:
+            return 0
+        try:
+            ids = list(touched)
+            return sum(
+                self._rescore(db, Question.id.in_(ids[start:start + HOT_BATCH_SIZE]))
+                for start in range(0, len(ids), HOT_BATCH_SIZE)
+            )
+        except Exception:
+            with self._lock:
+                self._touched |= touched
+            raise
+
+    def rescore_all(self, db: Session) -> int:
+        """Recompute every question's score (after changing the formula or its weights)"""
+        rescored, last_id = 0, ""
+        while True:
+            ids = [row.id for row in db.query(Question.id).filter(Question.id > last_id)
+                   .order_by(Question.id).limit(HOT_BATCH_SIZE)]
+            if not ids:
+                return rescored
+            rescored += self._rescore(db, Question.id.in_(ids))
+            last_id = ids[-1]
+
+    def _rescore(self, db: Session, condition) -> int:
+        questions = Question.__table__
+        stmt = questions.update().where(questions.c.id == bindparam("question_id")).values(
+            hot_score=bindparam("score"),
+            updated_at=questions.c.updated_at
+        )
+        rows = db.query(
+            Question.id, Question.vote_count, Question.answer_count, Question.views, Question.created_at
+        ).filter(condition).all()
+        try:
+            for start in range(0, len(rows), HOT_BATCH_SIZE):
+                db.execute(stmt, [
+                    {"question_id": row.id, "score": hot_score(row.vote_count, row.answer_count, row.views, row.created_at)}
+                    for row in rows[start:start + HOT_BATCH_SIZE]
+                ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return len(rows)
+
+
+# Create a global instance
+hot_scores = HotScores()
@@ -0,0 +1,91 @@
+from sqlalchemy.orm import Session
+from sortedcontainers import SortedList
+from decouple import config
+from app.models.models import User
+from typing import Dict, List, Optional, Tuple
+import threading
+
+# Full rebuild from the users table; live changes are applied in between
+LEADERBOARD_REBUILD_INTERVAL = config('LEADERBOARD_REBUILD_INTERVAL', default=600, cast=int)
+
+
+class Leaderboard:
+    """In-memory reputation ranking: top-N and a user's rank in O(log n)"""
+
+    def __init__(self):
+        self._entries = SortedList()  # (-reputation, user_id): best first, ties by id
+        self._reputations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Changes made while a rebuild is reading the table, re-applied on swap
+        self._changed_during_rebuild: Optional[Dict[str, int]] = None
+
+    def rebuild(self, db: Session) -> int:
+        """Reload every user's reputation from the database"""
+        with self._lock:
+            self._changed_during_rebuild = {}
+
+        try:
+            reputations = {
+                user_id: reputation or 0
+                for user_id, reputation in db.query(User.id, User.reputation).yield_per(10000)
+            }
+        except Exception:
+            with self._lock:
+                self._changed_during_rebuild = None
+            raise
+
+        entries = SortedList((-reputation, user_id) for user_id, reputation in reputations.items())
+        with self._lock:
+            # The snapshot may predate these; the live values win
+            for user_id, reputation in self._changed_during_rebuild.items():
+                old = reputations.get(user_id)
+                if old is not None:
+                    entries.remove((-old, user_id))
+                entries.add((-reputation, user_id))
+                reputations[user_id] = reputation
+            self._changed_during_rebuild = None
+            self._entries = entries
+            self._reputations = reputations
+        print(f"🏆 Leaderboard rebuilt with {len(reputations)} users")
+        return len(reputations)
+
+    def replace(self, reputations: Dict[str, int]):
+        """Swap in a complete user_id -> reputation mapping"""
+        entries = SortedList((-reputation, user_id) for user_id, reputation in reputations.items())
+        with self._lock:
+            self._entries = entries
+            self._reputations = reputations
+
+    def set(self, user_id: str, reputation: int):
+        """Record a user's current reputation"""
+        with self._lock:
+            old = self._reputations.get(user_id)
+            if old is not None:
+                self._entries.remove((-old, user_id))
+            self._entries.add((-reputation, user_id))
+            self._reputations[user_id] = reputation
+            if self._changed_during_rebuild is not None:
+                self._changed_during_rebuild[user_id] = reputation
+
+    def top(self, limit: int = 10, offset: int = 0) -> List[Tuple[str, int]]:
+        """(user_id, reputation) pairs, best first"""
+        with self._lock:
+            return [(user_id, -negated) for negated, user_id in self._entries.islice(offset, offset + limit)]
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank; users with equal reputation share a rank"""
+        with self._lock:
+            reputation = self._reputations.get(user_id)
+            if reputation is None:
+                return None
+            return self._entries.bisect_left((-reputation, "")) + 1
+
+    def reputation(self, user_id: str) -> Optional[int]:
+        return self._reputations.get(user_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Create a global instance
+leaderboard = Leaderboard()
@@ -0,0 +1,88 @@
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Dict, Iterable, List, Type
+from app.schemas.schemas import (
+    AuthorSummary, TagSummary, UserResponse, TagResponse, QuestionListFields, AnswerFields
+)
+from functools import lru_cache
+
+# ?format= values: nested embeds authors and tags in every item; normalized
+# references them by id and serializes each distinct one once under `included`
+RESPONSE_FORMAT_PATTERN = '^(nested|normalized)$'
+
+_any = TypeAdapter(Any)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+class Normalizer:
+    """Builds a normalized response body: items keep user_id and get tag_ids,
+    and each distinct user and tag is validated and dumped only once"""
+
+    def __init__(self, user_schema: Type[BaseModel] = UserResponse, tag_schema: Type[BaseModel] = TagResponse):
+        self.user_schema = user_schema
+        self.tag_schema = tag_schema
+        self.users: Dict[str, Any] = {}  # id -> ORM object, validated in included()
+        self.tags: Dict[str, Any] = {}
+
+    def questions(self, questions: Iterable, schema: Type[BaseModel] = QuestionListFields) -> List[dict]:
+        questions = list(questions)
+        items = _list_adapter(schema).validate_python(questions, from_attributes=True)
+        data = []
+        for question, item in zip(questions, items):
+            self.users.setdefault(question.author.id, question.author)
+            tag_ids = []
+            for tag in question.tags:
+                self.tags.setdefault(tag.id, tag)
+                tag_ids.append(tag.id)
+            data.append({**item.__dict__, "tag_ids": tag_ids})
+        return data
+
+    def answers(self, answers: Iterable) -> List[dict]:
+        answers = list(answers)
+        for answer in answers:
+            self.users.setdefault(answer.author.id, answer.author)
+        return [item.__dict__ for item in _list_adapter(AnswerFields).validate_python(answers, from_attributes=True)]
+
+    def included(self) -> Dict[str, Dict[str, BaseModel]]:
+        users = _list_adapter(self.user_schema).validate_python(list(self.users.values()), from_attributes=True)
+        tags = _list_adapter(self.tag_schema).validate_python(list(self.tags.values()), from_attributes=True)
+        return {"users": dict(zip(self.users, users)), "tags": dict(zip(self.tags, tags))}
+
+    def response(self, body: Dict[str, Any], headers: Dict[str, str] = None) -> Response:
+        """JSON response of body plus `included`, dumped in one pass (skips the response model)"""
+        content = _any.dump_json({**body, "included": self.included()})
+        return Response(content=content, media_type="application/json", headers=headers)
+
+
+def normalized_questions(questions: Iterable, headers: Dict[str, str] = None, key: str = "data", **fields) -> Response:
+    """Normalized question list (QuestionListResponse items) under `key`, next to any other fields"""
+    normalizer = Normalizer(AuthorSummary, TagSummary)
+    return normalizer.response({**fields, key: normalizer.questions(questions)}, headers)
+
+
+def normalized_answers(answers: Iterable) -> Response:
+    """Normalized answer list (AnswerResponse items)"""
+    normalizer = Normalizer()
+    return normalizer.response({"data": normalizer.answers(answers)})
+
+
+def normalize_question_payload(payload: dict) -> dict:
+    """Normalized form of an already serialized QuestionWithAnswers (the cached detail payload)"""
+    users: Dict[str, dict] = {}
+    tags: Dict[str, dict] = {}
+    question = {key: value for key, value in payload.items() if key not in ("author", "tags", "answers")}
+    users[payload["author"]["id"]] = payload["author"]
+    question["tag_ids"] = []
+    for tag in payload["tags"]:
+        tags[tag["id"]] = tag
+        question["tag_ids"].append(tag["id"])
+    answers: List[dict] = []
+    for answer in payload["answers"]:
+        users.setdefault(answer["author"]["id"], answer["author"])
+        answers.append({key: value for key, value in answer.items() if key != "author"})
+    question["answers"] = answers
+    return {"data": question, "included": {"users": users, "tags": tags}}
@@ -0,0 +1,90 @@
+from sqlalchemy import and_, or_, desc, asc
+from typing import Any, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+
+
+# Response header carrying the cursor for the next page (list bodies stay plain arrays)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for the sort key of the last row on a page"""
+    raw = json.dumps({
+        "sort": sort,
+        "values": [v.isoformat() if isinstance(v, datetime) else v for v in values],
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into sort key values typed like `columns`
+
+    A cursor issued for another sort is rejected even when its values would
+    fit, since resuming one order from another's position skips rows.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if not isinstance(payload, dict) or payload.get("sort") != sort:
+        raise InvalidCursor("Cursor does not match sort order")
+    values = payload.get("values")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor("Cursor does not match sort order")
+
+    typed = []
+    for column, value in zip(columns, values):
+        python_type = getattr(column.type, "python_type", None)
+        try:
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type in (int, float):
+                value = python_type(value)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor("Malformed cursor") from e
+        typed.append(value)
+    return typed
+
+
+def keyset_page(
+    query,
+    sort: str,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[list, Optional[str]]:
+    """Apply keyset pagination over `columns` (last one must be unique) for the named sort
+
+    Rows come after the cursor position in (col1, col2, ...) order, so every
+    page is an index range scan no matter how deep the client has paged.
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        # Expanded row comparison: (a < x) OR (a = x AND b < y) ...
+        clauses = []
+        for i, (column, value) in enumerate(zip(columns, values)):
+            beyond = column < value if descending else column > value
+            clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], beyond))
+        # Redundant bound on the leading column: planners (SQLite with bound
+        # parameters) can't turn the OR alone into an index range
+        leading = columns[0] <= values[0] if descending else columns[0] >= values[0]
+        query = query.filter(leading, or_(*clauses))
+
+    direction = desc if descending else asc
+    rows = query.order_by(*[direction(c) for c in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, c.key) for c in columns])
+    return rows, next_cursor
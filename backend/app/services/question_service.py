@@ -1,13 +1,209 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, desc, asc
-from app.models.models import Question, User, Tag, Answer, Vote
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, or_, desc, asc, select, bindparam
+from app.models.models import Question, User, Tag, Answer, Vote, question_tags
 from app.schemas.schemas import QuestionCreate, QuestionUpdate, SearchRequest
-from typing import Optional, List, Tuple
+from app.services.pagination import keyset_page
+from app.services.search_service import search_engine
+from app.services.cache import LRUCache
+from app.services.reputation_service import ReputationService
+from app.services.site_stats_service import bump_site_counters
+from app.services.activity_service import record_activity
+from app.services.hot_service import hot_scores, hot_score
+from app.services.autocomplete_service import tag_autocomplete
+from app.services.related_tags_service import related_tags
+from app.services.bitmap_index_service import question_bitmaps
+from app.database.upsert import upsert
+from decouple import config
+from typing import Optional, List, Tuple, Dict, Set
+from collections import OrderedDict
+import html
 import math
+import re
+import threading
+import uuid
+
+# Buffered view counts: flushed every VIEW_FLUSH_INTERVAL seconds, or sooner once
+# VIEW_FLUSH_MAX_PENDING views are waiting. Those two bound what a crash can lose.
+VIEW_FLUSH_INTERVAL = config('VIEW_FLUSH_INTERVAL', default=10, cast=int)
+VIEW_FLUSH_MAX_PENDING = config('VIEW_FLUSH_MAX_PENDING', default=10000, cast=int)
+
+# Serialized question detail responses
+QUESTION_CACHE_TTL = config('QUESTION_CACHE_TTL', default=60, cast=int)
+QUESTION_CACHE_MAX_ENTRIES = config('QUESTION_CACHE_MAX_ENTRIES', default=5000, cast=int)
+QUESTION_CACHE_MAX_INVALIDATIONS = config('QUESTION_CACHE_MAX_INVALIDATIONS', default=50000, cast=int)
+
+# Match sets up to this size are filtered with an id IN list; larger ones in SQL
+SEARCH_CANDIDATE_LIMIT = 1000
+
+# Text query matches considered by the sorted search (total_capped beyond it)
+SEARCH_MATCH_LIMIT = config('SEARCH_MATCH_LIMIT', default=10000, cast=int)
+
+# Search facet counts: exact up to this many matches, cached beyond it
+SEARCH_FACET_EXACT_LIMIT = 1000
+SEARCH_FACET_TAGS = 10
+SEARCH_FACETS_CACHE_TTL = config('SEARCH_FACETS_CACHE_TTL', default=30, cast=int)
+
+# Plain-text excerpt stored with each question for list views
+EXCERPT_LENGTH = 200
+
+# Columns loaded for question lists (QuestionListResponse); content and
+# the author's email/bio stay in the database. hot_score is a cursor column.
+QUESTION_LIST_OPTIONS = (
+    load_only(
+        Question.id, Question.user_id, Question.title, Question.excerpt, Question.views,
+        Question.vote_count, Question.answer_count, Question.hot_score, Question.is_solved,
+        Question.created_at, Question.updated_at
+    ),
+    joinedload(Question.author).load_only(
+        User.id, User.username, User.display_name, User.avatar_url, User.reputation
+    ),
+    selectinload(Question.tags).load_only(Tag.id, Tag.name, Tag.color),
+)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    """First `length` characters of content as plain text, cut at a word boundary"""
+    text = _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", content or ""))).strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip(" ,.;:") + "…"
+
+# Keyset sort orders for question listings; each ends with the unique id
+QUESTION_SORTS = {
+    'newest': (Question.created_at, Question.id),
+    'votes': (Question.vote_count, Question.id),
+    'hot': (Question.hot_score, Question.id),
+}
+
+class ViewCounter:
+    """Aggregates question views in memory and writes them as batched increments"""
+    
+    def __init__(self, max_pending: int = VIEW_FLUSH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._counts: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+    
+    def record(self, question_id: str) -> bool:
+        """Count a view; returns True for the one view that takes pending views to the early flush threshold"""
+        with self._lock:
+            self._counts[question_id] = self._counts.get(question_id, 0) + 1
+            self._total += 1
+            # Only the crossing view schedules a flush, not every view until it has run
+            return self._total == self.max_pending
+    
+    def pending(self, question_id: str) -> int:
+        """Views recorded for a question but not yet written"""
+        return self._counts.get(question_id, 0)
+    
+    def flush(self, db: Session) -> int:
+        """Write pending views as one views = views + n UPDATE per question"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._total = 0
+        if not counts:
+            return 0
+        
+        questions = Question.__table__
+        # A view is not an edit, so updated_at is left alone
+        stmt = questions.update().where(questions.c.id == bindparam('b_id')).values(
+            views=questions.c.views + bindparam('b_views'),
+            updated_at=questions.c.updated_at
+        )
+        try:
+            db.execute(stmt, [{'b_id': question_id, 'b_views': n} for question_id, n in counts.items()])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for question_id, n in counts.items():
+                    self._counts[question_id] = self._counts.get(question_id, 0) + n
+                    self._total += n
+            raise
+        
+        # Cached payloads carry the old base count
+        question_cache.add_views(counts)
+        hot_scores.touch(*counts)
+        return sum(counts.values())
+
+# Create a global instance
+view_counter = ViewCounter()
+
+class QuestionDetailCache:
+    """Serialized QuestionWithAnswers payloads, invalidated whenever the question or its answers change"""
+    
+    def __init__(
+        self,
+        ttl: int = QUESTION_CACHE_TTL,
+        max_entries: int = QUESTION_CACHE_MAX_ENTRIES,
+        max_invalidations: int = QUESTION_CACHE_MAX_INVALIDATIONS
+    ):
+        self._cache = LRUCache(max_entries=max_entries, default_ttl=ttl)
+        self._clock = 0
+        # question_id -> clock at its last invalidation, oldest first; questions
+        # dropped off the end count as invalidated at _invalidated_floor
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._invalidated_floor = 0
+        self.max_invalidations = max_invalidations
+        self._lock = threading.Lock()
+    
+    def get(self, question_id: str) -> Optional[dict]:
+        return self._cache.get(question_id)
+    
+    def version(self, question_id: str) -> int:
+        """Take before loading from the database and hand back to set()"""
+        return self._clock
+    
+    def set(self, question_id: str, payload: dict, version: int):
+        """Store a payload unless the question was invalidated while it was being built"""
+        with self._lock:
+            if self._invalidated.get(question_id, self._invalidated_floor) <= version:
+                self._cache.set(question_id, payload)
+    
+    def invalidate(self, question_id: Optional[str]):
+        if not question_id:
+            return
+        with self._lock:
+            self._stamp(question_id)
+            self._cache.delete(question_id)
+    
+    def add_views(self, counts: Dict[str, int]):
+        """Fold flushed view counts into cached payloads instead of dropping them"""
+        with self._lock:
+            for question_id, n in counts.items():
+                # Payloads being built may have read views from before the flush
+                self._stamp(question_id)
+                payload = self._cache.peek(question_id)
+                if payload is not None:
+                    payload["views"] += n
+    
+    def _stamp(self, question_id: str):
+        self._clock += 1
+        self._invalidated.pop(question_id, None)
+        self._invalidated[question_id] = self._clock
+        while len(self._invalidated) > self.max_invalidations:
+            _, self._invalidated_floor = self._invalidated.popitem(last=False)
+    
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "tracked_invalidations": len(self._invalidated)}
+
+# Create a global instance
+question_cache = QuestionDetailCache()
+search_facets_cache = LRUCache(max_entries=1000, default_ttl=SEARCH_FACETS_CACHE_TTL)
 
 class QuestionService:
     def __init__(self, db: Session):
         self.db = db
+        # Applied to the in-memory tag indexes after commit
+        self._changed_tags: Set[str] = set()  # Tags whose usage count changed
+        self._retagged: List[Tuple[str, Set[str], Set[str]]] = []  # (question_id, old tag ids, new tag ids)
 
     def create_question(self, question_data: QuestionCreate, user_id: str) -> Question:
         """Create a new question with tags"""
@@ -15,31 +211,83 @@ class QuestionService:
         question_dict = question_data.model_dump()
         tag_names = question_dict.pop('tag_names')
         
-        db_question = Question(**question_dict, user_id=user_id)
+        db_question = Question(
+            **question_dict,
+            user_id=user_id,
+            excerpt=make_excerpt(question_dict['content']),
+            hot_score=hot_score(0, 0, 0, None)
+        )
         self.db.add(db_question)
         self.db.flush()  # Flush to get the question ID
         
         # Handle tags
-        for tag_name in tag_names:
-            tag = self.db.query(Tag).filter(Tag.name == tag_name.lower()).first()
-            if not tag:
-                tag = Tag(name=tag_name.lower(), usage_count=1)
-                self.db.add(tag)
-            else:
-                tag.usage_count += 1
-            
-            db_question.tags.append(tag)
+        tags, new_tags = self._resolve_tags(tag_names)
+        self._bump_usage([tag.id for tag in tags], 1)
+        self._retagged.append((db_question.id, set(), {tag.id for tag in tags}))
+        db_question.tags = tags
         
+        search_engine.index_question(self.db, db_question)
+        bump_site_counters(self.db, total_questions=1, total_tags=new_tags)
+        record_activity(self.db, questions=1, tag_ids=[tag.id for tag in tags])
+        question_id = db_question.id
         self.db.commit()
+        question_bitmaps.add(question_id)
+        self._publish_tags()
         self.db.refresh(db_question)
         return db_question
 
+    def _resolve_tags(self, tag_names: List[str]) -> Tuple[List[Tag], int]:
+        """Load tags by name in one IN query, creating missing ones; returns (tags, number created)
+
+        Missing names go through insert-or-ignore, so a tag created by a
+        concurrent request is simply picked up by the re-read instead of
+        failing on the unique name.
+        """
+        names = list(dict.fromkeys(name.lower() for name in tag_names))
+        if not names:
+            return [], 0
+        found = {tag.name: tag for tag in self.db.query(Tag).filter(Tag.name.in_(names))}
+        # Sorted, so concurrent requests insert and lock new tag names in the same order
+        # (otherwise two requests creating {a, b} and {b, a} can deadlock on MySQL)
+        missing = sorted(name for name in names if name not in found)
+        created = 0
+        if missing:
+            result = upsert(self.db, Tag.__table__, [
+                {"id": str(uuid.uuid4()), "name": name, "usage_count": 0} for name in missing
+            ], ["name"])
+            created = max(result.rowcount, 0)
+            # Locking read: sees rows another transaction committed after our first read
+            found.update(
+                (tag.name, tag)
+                for tag in self.db.query(Tag).filter(Tag.name.in_(missing)).order_by(Tag.name).with_for_update(read=True)
+            )
+        return [found[name] for name in names], created
+
+    def _bump_usage(self, tag_ids, delta: int):
+        """usage_count += delta for all tags in one UPDATE"""
+        tag_ids = list(tag_ids)
+        if tag_ids:
+            self.db.query(Tag).filter(Tag.id.in_(tag_ids)).update(
+                {Tag.usage_count: Tag.usage_count + delta}, synchronize_session=False
+            )
+            self._changed_tags.update(tag_ids)
+
+    def _publish_tags(self):
+        """Push committed tag changes to the in-memory tag indexes"""
+        changed, self._changed_tags = self._changed_tags, set()
+        retagged, self._retagged = self._retagged, []
+        for question_id, old_ids, new_ids in retagged:
+            related_tags.update(question_id, old_ids, new_ids)
+            question_bitmaps.set_tags(question_id, old_ids, new_ids)
+        tag_autocomplete.refresh(self.db, changed)
+
     def get_question_by_id(self, question_id: str) -> Optional[Question]:
         """Get question by ID with all relationships"""
+        # selectinload keeps answers x tags from multiplying into one wide result
         return self.db.query(Question).options(
             joinedload(Question.author),
-            joinedload(Question.tags),
-            joinedload(Question.answers).joinedload(Answer.author)
+            selectinload(Question.tags),
+            selectinload(Question.answers).joinedload(Answer.author)
         ).filter(Question.id == question_id).first()
 
     def update_question(self, question_id: str, question_data: QuestionUpdate, user_id: str) -> Optional[Question]:
@@ -58,27 +306,27 @@ class QuestionService:
         if 'tag_names' in update_data:
             tag_names = update_data.pop('tag_names')
             
-            # Remove old tags
-            for tag in question.tags:
-                tag.usage_count -= 1
-            question.tags.clear()
-            
-            # Add new tags
-            for tag_name in tag_names:
-                tag = self.db.query(Tag).filter(Tag.name == tag_name.lower()).first()
-                if not tag:
-                    tag = Tag(name=tag_name.lower(), usage_count=1)
-                    self.db.add(tag)
-                else:
-                    tag.usage_count += 1
-                
-                question.tags.append(tag)
+            tags, new_tags = self._resolve_tags(tag_names)
+            old_ids = {tag.id for tag in question.tags}
+            new_ids = {tag.id for tag in tags}
+            # Only tags actually added or removed change their usage count
+            self._bump_usage(old_ids - new_ids, -1)
+            self._bump_usage(new_ids - old_ids, 1)
+            self._retagged.append((question_id, old_ids, new_ids))
+            question.tags = tags
+            bump_site_counters(self.db, total_tags=new_tags)
         
         # Update other fields
         for field, value in update_data.items():
             setattr(question, field, value)
+        if 'content' in update_data:
+            question.excerpt = make_excerpt(question.content)
         
+        if 'title' in update_data or 'content' in update_data:
+            search_engine.index_question(self.db, question)
         self.db.commit()
+        self._publish_tags()
+        question_cache.invalidate(question_id)
         self.db.refresh(question)
         return question
 
@@ -93,67 +341,191 @@ class QuestionService:
             return False
         
         # Decrease tag usage count
-        for tag in question.tags:
-            tag.usage_count -= 1
+        tag_ids = {tag.id for tag in question.tags}
+        self._bump_usage(tag_ids, -1)
+        self._retagged.append((question_id, tag_ids, set()))
+        
+        reputation_service = ReputationService(self.db)
+        reputation_service.record_question_removal(question, actor_id=user_id)
         
+        # Answers and votes go with the question (ORM cascade)
+        answer_ids = select(Answer.id).where(Answer.question_id == question_id)
+        answers = self.db.query(func.count(Answer.id)).filter(Answer.question_id == question_id).scalar()
+        votes = self.db.query(func.count(Vote.id)).filter(
+            or_(Vote.question_id == question_id, Vote.answer_id.in_(answer_ids))
+        ).scalar()
+        bump_site_counters(
+            self.db,
+            total_questions=-1,
+            total_answers=-(answers or 0),
+            total_votes=-(votes or 0),
+            solved_questions=-1 if question.is_solved else 0
+        )
+        search_engine.remove_question(self.db, question_id)
         self.db.delete(question)
         self.db.commit()
+        reputation_service.publish()
+        self._publish_tags()
+        question_bitmaps.remove(question_id)
+        question_cache.invalidate(question_id)
         return True
 
-    def get_questions(self, search_params: SearchRequest) -> Tuple[List[Question], int]:
-        """Get questions with search, filter, and pagination"""
-        query = self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
-        )
+    def get_questions(self, search_params: SearchRequest) -> dict:
+        """Get questions with search, filter, and pagination, plus facet counts
+
+        Tag (any/all/none) and solved/unanswered filters resolve against the
+        in-memory question bitmaps, which also give the total and facet
+        counts without a COUNT query; only the page's rows are read. A text
+        query is resolved to its full match set (not just the best-ranked
+        hits), so sorting and paging cover every match up to
+        SEARCH_MATCH_LIMIT; past that, total_capped is set and the rest of
+        the matches are left out. A search backend with no SQL match clause
+        sorts by votes/views/answers only within the newest
+        SEARCH_CANDIDATE_LIMIT matches, also flagged by total_capped.
+        """
+        query = self.db.query(Question).options(*QUESTION_LIST_OPTIONS)
+        offset = (search_params.page - 1) * search_params.limit
+        matches = self._match_filters(search_params)
+        total_capped = False
         
         # Apply search filter
         if search_params.query:
-            search_term = f"%{search_params.query}%"
-            query = query.filter(
-                or_(
-                    Question.title.ilike(search_term),
-                    Question.content.ilike(search_term)
-                )
-            )
+            matching_ids = search_engine.match(self.db, search_params.query, SEARCH_MATCH_LIMIT)
+            total_capped = len(matching_ids) >= SEARCH_MATCH_LIMIT
+            matches = question_bitmaps.of(matching_ids, within=matches)
+        elif matches is None:
+            matches = question_bitmaps.match()
         
-        # Apply tag filter
-        if search_params.tags:
-            query = query.join(Question.tags).filter(
-                Tag.name.in_([tag.lower() for tag in search_params.tags])
-            )
+        if search_params.sort_by == 'created_at':
+            # Ordinals follow creation order, so the page comes straight off the bitmap
+            ids = question_bitmaps.page(matches, offset, search_params.limit, search_params.sort_order == 'desc')
+            rows = {question.id: question for question in query.filter(Question.id.in_(ids))}
+            questions = [rows[question_id] for question_id in ids if question_id in rows]
+        else:
+            text_clause = search_engine.match_clause(self.db, search_params.query) if search_params.query else None
+            if search_params.query and text_clause is None and len(matches) > SEARCH_CANDIDATE_LIMIT:
+                # No SQL condition for the text index: sort only the newest matches rather than bind them all
+                matches = question_bitmaps.of(question_bitmaps.page(matches, 0, SEARCH_CANDIDATE_LIMIT))
+                total_capped = True
+            if len(matches) <= SEARCH_CANDIDATE_LIMIT:
+                query = query.filter(Question.id.in_(question_bitmaps.ids(matches)))
+            else:
+                query = self._filter_in_sql(query, search_params)
+                if text_clause is not None:
+                    query = query.filter(text_clause)
+            
+            # Apply sorting
+            sort_column = getattr(Question, search_params.sort_by)
+            if search_params.sort_order == 'desc':
+                query = query.order_by(desc(sort_column), desc(Question.id))
+            else:
+                query = query.order_by(asc(sort_column), asc(Question.id))
+            questions = query.offset(offset).limit(search_params.limit).all()
         
-        # Apply sorting
-        sort_column = getattr(Question, search_params.sort_by)
-        if search_params.sort_order == 'desc':
-            query = query.order_by(desc(sort_column))
+        return {
+            "items": questions,
+            "total": len(matches),
+            "total_capped": total_capped,
+            "facets": self._facet_counts(search_params, matches)
+        }
+
+    def _facet_counts(self, search_params: SearchRequest, matches) -> dict:
+        """Most common tags and solved/unsolved counts within the matches
+
+        Small result sets are counted exactly from question_tags; large ones
+        from the tag bitmaps, cached for SEARCH_FACETS_CACHE_TTL seconds.
+        """
+        large = len(matches) > SEARCH_FACET_EXACT_LIMIT
+        key = search_params.model_dump_json(include={'query', 'tags', 'all_tags', 'exclude_tags', 'is_solved', 'unanswered'})
+        if large:
+            cached = search_facets_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        if large:
+            top = question_bitmaps.top_tags(matches, SEARCH_FACET_TAGS)
+        elif matches:
+            count = func.count().label('count')
+            top = self.db.query(question_tags.c.tag_id, count).filter(
+                question_tags.c.question_id.in_(question_bitmaps.ids(matches))
+            ).group_by(question_tags.c.tag_id).order_by(desc(count)).limit(SEARCH_FACET_TAGS).all()
         else:
-            query = query.order_by(asc(sort_column))
+            top = []
         
-        # Get total count
-        total = query.count()
+        tags = []
+        for tag_id, count in top:
+            tag = tag_autocomplete.get_by_id(tag_id)
+            if tag:
+                tags.append({"name": tag["name"], "count": count})
+        solved = question_bitmaps.solved_count(matches)
+        facets = {"tags": tags, "solved": solved, "unsolved": len(matches) - solved}
+        if large:
+            search_facets_cache.set(key, facets)
+        return facets
+
+    def _match_filters(self, search_params: SearchRequest):
+        """Bitmap of questions passing the tag and facet filters, or None when there are none"""
+        facets = {}
+        if search_params.is_solved is not None:
+            facets['solved'] = search_params.is_solved
+        if search_params.unanswered is not None:
+            facets['answered'] = not search_params.unanswered
+        if not (search_params.tags or search_params.all_tags or search_params.exclude_tags or facets):
+            return None
         
-        # Apply pagination
-        offset = (search_params.page - 1) * search_params.limit
-        questions = query.offset(offset).limit(search_params.limit).all()
+        def tag_ids(names: Optional[List[str]]) -> Optional[List[Optional[str]]]:
+            # Unknown names resolve to None, which matches no question
+            return [(tag_autocomplete.get(name) or {}).get('id') for name in names] if names else None
         
-        return questions, total
+        return question_bitmaps.match(
+            any_tags=tag_ids(search_params.tags),
+            all_tags=tag_ids(search_params.all_tags),
+            exclude_tags=tag_ids(search_params.exclude_tags),
+            facets=facets
+        )
 
-    def get_user_questions(self, user_id: str, skip: int = 0, limit: int = 10) -> List[Question]:
-        """Get questions by a specific user"""
-        return self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
-        ).filter(Question.user_id == user_id).offset(skip).limit(limit).all()
+    def _filter_in_sql(self, query, search_params: SearchRequest):
+        """The same filters as EXISTS subqueries, for large match sets under a non-creation sort"""
+        def tagged(names: List[str]):
+            return select(question_tags.c.question_id).join(Tag, Tag.id == question_tags.c.tag_id).where(
+                question_tags.c.question_id == Question.id,
+                Tag.name.in_([name.lower() for name in names])
+            ).exists()
+        
+        if search_params.tags:
+            query = query.filter(tagged(search_params.tags))
+        for name in search_params.all_tags or []:
+            query = query.filter(tagged([name]))
+        if search_params.exclude_tags:
+            query = query.filter(~tagged(search_params.exclude_tags))
+        if search_params.is_solved is not None:
+            query = query.filter(Question.is_solved == search_params.is_solved)
+        if search_params.unanswered is not None:
+            query = query.filter(Question.answer_count == 0 if search_params.unanswered else Question.answer_count > 0)
+        return query
 
-    def increment_views(self, question_id: str) -> bool:
-        """Increment question view count"""
-        question = self.db.query(Question).filter(Question.id == question_id).first()
-        if question:
-            question.views += 1
-            self.db.commit()
-            return True
-        return False
+    def get_questions_page(
+        self,
+        sort: str = 'newest',
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        user_id: Optional[str] = None
+    ) -> Tuple[List[Question], Optional[str]]:
+        """Get a page of questions and the cursor for the next one"""
+        query = self.db.query(Question).options(*QUESTION_LIST_OPTIONS)
+        if user_id:
+            query = query.filter(Question.user_id == user_id)
+        return keyset_page(query, sort, QUESTION_SORTS[sort], cursor, limit)
+
+    def get_user_questions(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        sort: str = 'newest'
+    ) -> Tuple[List[Question], Optional[str]]:
+        """Get questions by a specific user"""
+        return self.get_questions_page(sort, cursor, limit, user_id=user_id)
 
     def mark_as_solved(self, question_id: str, user_id: str) -> bool:
         """Mark question as solved (only by owner)"""
@@ -163,41 +535,59 @@ class QuestionService:
         ).first()
         
         if question:
+            if not question.is_solved:
+                bump_site_counters(self.db, solved_questions=1)
             question.is_solved = True
             self.db.commit()
+            question_cache.invalidate(question_id)
+            question_bitmaps.refresh(self.db, [question_id])
             return True
         return False
 
     def get_popular_questions(self, limit: int = 10) -> List[Question]:
         """Get most popular questions (by votes)"""
         return self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
+            *QUESTION_LIST_OPTIONS
         ).order_by(desc(Question.vote_count)).limit(limit).all()
 
     def get_recent_questions(self, limit: int = 10) -> List[Question]:
         """Get most recent questions"""
         return self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
+            *QUESTION_LIST_OPTIONS
         ).order_by(desc(Question.created_at)).limit(limit).all()
 
     def get_unanswered_questions(self, limit: int = 10) -> List[Question]:
         """Get questions with no answers"""
         return self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
+            *QUESTION_LIST_OPTIONS
         ).filter(Question.answer_count == 0).order_by(desc(Question.created_at)).limit(limit).all()
 
-    def search_questions(self, query: str, limit: int = 10) -> List[Question]:
-        """Full-text search in questions"""
-        search_term = f"%{query}%"
-        return self.db.query(Question).options(
-            joinedload(Question.author),
-            joinedload(Question.tags)
-        ).filter(
-            or_(
-                Question.title.ilike(search_term),
-                Question.content.ilike(search_term)
-            )
-        ).order_by(desc(Question.vote_count)).limit(limit).all() 
\ No newline at end of file
+    def search_questions(self, query: str, limit: int = 10, offset: int = 0) -> List[Question]:
+        """Full-text search in questions, best match first"""
+        question_ids = search_engine.search(self.db, query, limit, offset)
+        if not question_ids:
+            return []
+        
+        questions = self.db.query(Question).options(
+            *QUESTION_LIST_OPTIONS
+        ).filter(Question.id.in_(question_ids)).all()
+        
+        by_id = {question.id: question for question in questions}
+        return [by_id[question_id] for question_id in question_ids if question_id in by_id]
+
+class AsyncQuestionService:
+    """Read-heavy QuestionService paths on an AsyncSession"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_question_by_id(self, question_id: str) -> Optional[Question]:
+        """Get question by ID with all relationships"""
+        result = await self.db.execute(
+            select(Question).options(
+                joinedload(Question.author),
+                selectinload(Question.tags),
+                selectinload(Question.answers).selectinload(Answer.author)
+            ).where(Question.id == question_id)
+        )
+        return result.scalars().first()
@@ -0,0 +1,181 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from decouple import config
+from app.models.models import question_tags
+from app.services.cache import LRUCache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from itertools import combinations
+import heapq
+import math
+import threading
+import numpy as np
+
+# Full rebuild from question_tags; question edits are applied in between
+RELATED_TAGS_REBUILD_INTERVAL = config('RELATED_TAGS_REBUILD_INTERVAL', default=3600, cast=int)
+# Pairs seen on fewer questions than this rank after all better-supported pairs
+RELATED_TAGS_MIN_SUPPORT = config('RELATED_TAGS_MIN_SUPPORT', default=2, cast=int)
+# Ranking a popular tag walks all of its neighbors, so results are kept briefly
+RELATED_TAGS_CACHE_TTL = config('RELATED_TAGS_CACHE_TTL', default=60, cast=int)
+
+
+class RelatedTags:
+    """Sparse tag x tag co-occurrence counts, ranked by lift (how much more often
+    two tags appear together than they would by chance)"""
+
+    def __init__(self):
+        self._pairs: Dict[str, Dict[str, int]] = {}  # tag_id -> {other tag_id: questions with both}
+        self._tag_counts: Dict[str, int] = {}  # tag_id -> questions with the tag
+        self._questions = 0  # Tagged questions
+        self._cache = LRUCache(max_entries=1000, default_ttl=RELATED_TAGS_CACHE_TTL)
+        self._lock = threading.Lock()
+        # question_id -> latest tags for questions retagged while a rebuild runs
+        self._changed_during_rebuild: Optional[Dict[str, Set[str]]] = None
+
+    def rebuild(self, db: Session) -> int:
+        """Recount all pairs from question_tags
+
+        Questions retagged while it runs may or may not be in the snapshot,
+        so on swap each one moves from its tags in the snapshot to its
+        latest tags; a change the snapshot already has is then a no-op.
+        """
+        with self._lock:
+            self._changed_during_rebuild = {}
+
+        try:
+            rows = db.connection().execute(
+                select(question_tags.c.question_id, question_tags.c.tag_id)
+            ).all()
+        except Exception:
+            with self._lock:
+                self._changed_during_rebuild = None
+            raise
+
+        pairs, tag_counts, questions = self._count(rows)
+        with self._lock:
+            changed = set(self._changed_during_rebuild)
+        snapshot = self._tags_of(rows, changed)
+        with self._lock:
+            latest, self._changed_during_rebuild = self._changed_during_rebuild, None
+            late = set(latest) - changed
+            if late:
+                snapshot.update(self._tags_of(rows, late))
+            self._pairs, self._tag_counts, self._questions = pairs, tag_counts, questions
+            for question_id, new in latest.items():
+                old = snapshot.get(question_id, set())
+                if old != new:
+                    self._update(old, new)
+        self._cache.clear()
+        print(f"🔗 Related tags rebuilt from {questions} questions")
+        return questions
+
+    @staticmethod
+    def _tags_of(rows, question_ids: Set[str]) -> Dict[str, Set[str]]:
+        tags: Dict[str, Set[str]] = {}
+        if question_ids:
+            for question_id, tag_id in rows:
+                if question_id in question_ids:
+                    tags.setdefault(question_id, set()).add(tag_id)
+        return tags
+
+    @staticmethod
+    def _count(rows) -> Tuple[Dict[str, Dict[str, int]], Dict[str, int], int]:
+        """Co-occurrence counts from (question_id, tag_id) rows, vectorized with NumPy
+
+        Rows are sorted by (question, tag); every pair of tags on a question
+        is then a pair of rows d apart for some d below the question's tag
+        count, so each offset is one array comparison. Pairs are encoded as
+        a * n_tags + b and counted with np.unique (a sparse COO matrix).
+        """
+        if not rows:
+            return {}, {}, 0
+        question_ids = np.array([row[0] for row in rows], dtype=str)
+        _, question_index = np.unique(question_ids, return_inverse=True)
+        tag_ids, tag_index = np.unique(np.array([row[1] for row in rows], dtype=str), return_inverse=True)
+        n_tags = len(tag_ids)
+
+        order = np.lexsort((tag_index, question_index))
+        questions, tags = question_index[order], tag_index[order].astype(np.int64)
+
+        codes = []
+        for offset in range(1, len(tags)):
+            same = questions[offset:] == questions[:-offset]
+            if not same.any():
+                break  # No question has more than `offset` tags
+            codes.append(tags[:-offset][same] * n_tags + tags[offset:][same])
+
+        pairs: Dict[str, Dict[str, int]] = {}
+        if codes:
+            unique_codes, counts = np.unique(np.concatenate(codes), return_counts=True)
+            names = tag_ids.tolist()
+            for a, b, count in zip((unique_codes // n_tags).tolist(), (unique_codes % n_tags).tolist(), counts.tolist()):
+                pairs.setdefault(names[a], {})[names[b]] = count
+                pairs.setdefault(names[b], {})[names[a]] = count
+
+        tag_counts = dict(zip(tag_ids.tolist(), np.bincount(tag_index, minlength=n_tags).tolist()))
+        return pairs, tag_counts, int(question_index.max()) + 1
+
+    def update(self, question_id: str, old_tag_ids: Iterable[str], new_tag_ids: Iterable[str]):
+        """Move one question from one tag set to another (empty for create/delete), after its commit"""
+        old, new = set(old_tag_ids), set(new_tag_ids)
+        if old == new:
+            return
+        with self._lock:
+            self._update(old, new)
+            if self._changed_during_rebuild is not None:
+                self._changed_during_rebuild[question_id] = new
+
+    def _update(self, old: Set[str], new: Set[str]):
+        self._add(old, -1)
+        self._add(new, 1)
+        self._questions += bool(new) - bool(old)
+
+    def _add(self, tag_ids: Set[str], delta: int):
+        for tag_id in tag_ids:
+            count = self._tag_counts.get(tag_id, 0) + delta
+            if count > 0:
+                self._tag_counts[tag_id] = count
+            else:
+                self._tag_counts.pop(tag_id, None)
+        for a, b in combinations(tag_ids, 2):
+            for x, y in ((a, b), (b, a)):
+                neighbors = self._pairs.setdefault(x, {})
+                count = neighbors.get(y, 0) + delta
+                if count > 0:
+                    neighbors[y] = count
+                else:
+                    neighbors.pop(y, None)
+                    if not neighbors:
+                        del self._pairs[x]
+
+    def related(self, tag_id: str, limit: int = 10) -> List[Tuple[str, int, float, float]]:
+        """Top (tag_id, questions together, lift, PMI) for a tag
+
+        Pairs with at least RELATED_TAGS_MIN_SUPPORT shared questions come
+        first; within each group the highest lift wins, then the most shared
+        questions.
+        """
+        cached = self._cache.get((tag_id, limit))
+        if cached is not None:
+            return cached
+        with self._lock:
+            neighbors = self._pairs.get(tag_id)
+            count = self._tag_counts.get(tag_id)
+            if not neighbors or not count:
+                return []
+            scale = self._questions / count
+            scored = [
+                (together >= RELATED_TAGS_MIN_SUPPORT, together * scale / self._tag_counts[other], together, other)
+                for other, together in neighbors.items()
+                if self._tag_counts.get(other)
+            ]
+        top = heapq.nlargest(limit, scored)
+        related = [(other, together, lift, math.log2(lift)) for _, lift, together, other in top]
+        self._cache.set((tag_id, limit), related)
+        return related
+
+    def __len__(self) -> int:
+        return len(self._tag_counts)
+
+
+# Create a global instance
+related_tags = RelatedTags()
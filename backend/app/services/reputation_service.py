@@ -0,0 +1,185 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, bindparam, func
+from decouple import config
+from app.models.models import ReputationEvent, User, Vote, Question, Answer
+from app.services.leaderboard_service import leaderboard
+from typing import Dict, List, Optional
+import numpy as np
+import uuid
+
+# Reputation rules
+UPVOTE_REPUTATION = 5
+DOWNVOTE_REPUTATION = -2
+ACCEPT_REPUTATION = 15
+
+# Rows pulled per round trip by the bulk recompute
+REPUTATION_RECOMPUTE_CHUNK_SIZE = config('REPUTATION_RECOMPUTE_CHUNK_SIZE', default=100000, cast=int)
+REPUTATION_WRITE_BATCH_SIZE = 1000
+
+
+def vote_reputation(vote_type: int) -> int:
+    """Reputation the content owner gets for a vote of this type"""
+    if vote_type == 1:  # Upvote
+        return UPVOTE_REPUTATION
+    elif vote_type == -1:  # Downvote
+        return DOWNVOTE_REPUTATION
+    return 0
+
+
+class ReputationService:
+    def __init__(self, db: Session):
+        self.db = db
+        self._changed: Dict[str, int] = {}  # user_id -> reputation after this transaction
+
+    def record(
+        self,
+        user_id: str,
+        delta: int,
+        reason: str,
+        actor_id: Optional[str] = None,
+        question_id: Optional[str] = None,
+        answer_id: Optional[str] = None
+    ):
+        """Append a ledger event and apply it to the user's reputation (the caller commits, then publishes)"""
+        if not delta:
+            return
+        self.db.execute(insert(ReputationEvent).values(
+            user_id=user_id,
+            delta=delta,
+            reason=reason,
+            actor_id=actor_id,
+            question_id=question_id,
+            answer_id=answer_id
+        ))
+        self.db.query(User).filter(User.id == user_id).update(
+            {User.reputation: User.reputation + delta},
+            synchronize_session=False
+        )
+        self._changed[user_id] = self.db.query(User.reputation).filter(User.id == user_id).scalar()
+
+    def publish(self):
+        """Push reputations changed by this service to the leaderboard; call after commit"""
+        for user_id, reputation in self._changed.items():
+            if reputation is not None:
+                leaderboard.set(user_id, reputation)
+        self._changed = {}
+
+    def record_answer_removal(self, answer: Answer, question_owner_id: str, actor_id: Optional[str] = None):
+        """Take back what an answer earned (votes and acceptance) before it is deleted"""
+        earned = self._earned(answer.upvotes, answer.downvotes)
+        if answer.is_accepted and answer.user_id != question_owner_id:
+            earned += ACCEPT_REPUTATION
+        self.record(answer.user_id, -earned, "delete", actor_id=actor_id,
+                    question_id=answer.question_id, answer_id=answer.id)
+
+    def record_question_removal(self, question: Question, actor_id: Optional[str] = None):
+        """Take back what a question and its answers earned before they are deleted"""
+        self.record(question.user_id, -self._earned(question.upvotes, question.downvotes), "delete",
+                    actor_id=actor_id, question_id=question.id)
+        answers = self.db.query(
+            Answer.id, Answer.question_id, Answer.user_id, Answer.upvotes, Answer.downvotes, Answer.is_accepted
+        ).filter(Answer.question_id == question.id).all()
+        for answer in answers:
+            self.record_answer_removal(answer, question.user_id, actor_id=actor_id)
+
+    def get_user_events(self, user_id: str, skip: int = 0, limit: int = 20) -> List[ReputationEvent]:
+        """Get a user's reputation history, newest first"""
+        return self.db.query(ReputationEvent).filter(
+            ReputationEvent.user_id == user_id
+        ).order_by(ReputationEvent.created_at.desc(), ReputationEvent.id.desc()).offset(skip).limit(limit).all()
+
+    def recompute_all(self, chunk_size: int = REPUTATION_RECOMPUTE_CHUNK_SIZE, dry_run: bool = False) -> Dict[str, int]:
+        """Rebuild every user's reputation from votes and accepted answers
+
+        Streams the source rows in chunks and sums them per user with
+        np.unique/np.bincount, then rewrites only the reputations that
+        differ, adding "recompute" ledger events so the ledger sums match.
+        Writes that land while it runs may be overwritten, so run it offline.
+        """
+        users = self.db.query(User.id, User.reputation).all()
+        user_ids = np.array([row.id for row in users], dtype=str)
+        current = np.array([row.reputation or 0 for row in users], dtype=np.int64)
+        order = np.argsort(user_ids)
+        user_ids, current = user_ids[order], current[order]
+        totals = np.zeros(len(user_ids), dtype=np.int64)
+
+        # Self-votes and self-accepts never earn reputation
+        sources = {
+            "question_votes": (
+                select(Question.user_id, Vote.vote_type).join(Question, Vote.question_id == Question.id)
+                .where(Vote.user_id != Question.user_id),
+                lambda vote_types: np.where(vote_types == 1, UPVOTE_REPUTATION,
+                                            np.where(vote_types == -1, DOWNVOTE_REPUTATION, 0))
+            ),
+            "answer_votes": (
+                select(Answer.user_id, Vote.vote_type).join(Answer, Vote.answer_id == Answer.id)
+                .where(Vote.user_id != Answer.user_id),
+                lambda vote_types: np.where(vote_types == 1, UPVOTE_REPUTATION,
+                                            np.where(vote_types == -1, DOWNVOTE_REPUTATION, 0))
+            ),
+            "accepted_answers": (
+                select(Answer.user_id, Answer.is_accepted).join(Question, Answer.question_id == Question.id)
+                .where(Answer.is_accepted == True, Answer.user_id != Question.user_id),
+                lambda accepted: np.full(len(accepted), ACCEPT_REPUTATION)
+            ),
+        }
+
+        # Core connection: plain tuples, no ORM row processing per vote
+        connection = self.db.connection()
+        result = {"users": len(user_ids)}
+        for name, (stmt, points) in sources.items():
+            rows_seen = 0
+            stream = connection.execute(stmt.execution_options(yield_per=chunk_size))
+            for chunk in stream.partitions():
+                owners, values = zip(*chunk)
+                rows_seen += len(chunk)
+                self._accumulate(totals, user_ids, np.array(owners, dtype=str), points(np.array(values, dtype=np.int64)))
+            result[name] = rows_seen
+
+        # The ledger must sum to the rebuilt value too, whatever happened to the column
+        ledger = np.zeros(len(user_ids), dtype=np.int64)
+        ledger_sums = connection.execute(
+            select(ReputationEvent.user_id, func.sum(ReputationEvent.delta)).group_by(ReputationEvent.user_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for chunk in ledger_sums.partitions():
+            owners, sums = zip(*chunk)
+            self._accumulate(ledger, user_ids, np.array(owners, dtype=str), np.array(sums, dtype=np.int64))
+
+        changed = np.nonzero((totals != current) | (totals != ledger))[0]
+        result["changed"] = len(changed)
+        if dry_run or not len(changed):
+            return result
+
+        update_stmt = User.__table__.update().where(User.__table__.c.id == bindparam("target_id")).values(
+            reputation=bindparam("reputation"),
+            updated_at=User.__table__.c.updated_at  # Not a profile edit
+        )
+        for start in range(0, len(changed), REPUTATION_WRITE_BATCH_SIZE):
+            batch = changed[start:start + REPUTATION_WRITE_BATCH_SIZE]
+            self.db.execute(update_stmt, [
+                {"target_id": str(user_ids[i]), "reputation": int(totals[i])} for i in batch
+            ])
+            corrections = [
+                {"id": str(uuid.uuid4()), "user_id": str(user_ids[i]), "delta": int(totals[i] - ledger[i]), "reason": "recompute"}
+                for i in batch if totals[i] != ledger[i]
+            ]
+            if corrections:
+                self.db.execute(insert(ReputationEvent), corrections)
+            self.db.commit()
+        return result
+
+    @staticmethod
+    def _accumulate(totals: np.ndarray, user_ids: np.ndarray, owners: np.ndarray, points: np.ndarray):
+        """Group-by-sum one chunk of (owner, points) into totals, indexed like sorted user_ids"""
+        owner_keys, inverse = np.unique(owners, return_inverse=True)
+        sums = np.bincount(inverse, weights=points, minlength=len(owner_keys)).astype(np.int64)
+        positions = np.searchsorted(user_ids, owner_keys)
+        # Ignore owners that no longer have a users row
+        known = positions < len(user_ids)
+        known[known] = user_ids[positions[known]] == owner_keys[known]
+        totals[positions[known]] += sums[known]
+
+    @staticmethod
+    def _earned(upvotes: Optional[int], downvotes: Optional[int]) -> int:
+        return (upvotes or 0) * UPVOTE_REPUTATION + (downvotes or 0) * DOWNVOTE_REPUTATION
@@ -0,0 +1,63 @@
+from typing import Callable, List, Any
+import asyncio
+import traceback
+
+from app.database.config import SessionLocal
+
+
+def run_with_session(job: Callable[[Any], Any]) -> Any:
+    """Run job(db) with a fresh database session"""
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
+
+
+class Scheduler:
+    """Runs periodic background jobs in worker threads for the app's lifetime"""
+
+    def __init__(self):
+        self._jobs: List[dict] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval: float, func: Callable[[], Any], run_on_shutdown: bool = False):
+        """Register a blocking job to run every `interval` seconds"""
+        self._jobs.append({
+            "name": name,
+            "interval": interval,
+            "func": func,
+            "run_on_shutdown": run_on_shutdown
+        })
+
+    async def start(self):
+        """Start a loop task for every registered job"""
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+
+    async def stop(self):
+        """Cancel the loops, then give shutdown jobs a final run"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job in self._jobs:
+            if job["run_on_shutdown"]:
+                await self._run(job)
+
+    async def _loop(self, job: dict):
+        while True:
+            await asyncio.sleep(job["interval"])
+            await self._run(job)
+
+    async def _run(self, job: dict):
+        try:
+            await asyncio.to_thread(job["func"])
+        except Exception as e:
+            print(f"💥 Background job {job['name']} failed: {e}")
+            traceback.print_exc()
+
+
+# Create a global instance
+scheduler = Scheduler()
@@ -0,0 +1,415 @@
+from sqlalchemy import text, String, func, bindparam
+from sqlalchemy.orm import Session
+from decouple import config
+from app.database.config import engine
+from app.models.models import Question
+from typing import Dict, List, Set
+import bisect
+import heapq
+import math
+import re
+import threading
+
+# Which search backend to use: auto, memory, sqlite or mysql
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+
+# Title matches count this many times more than body matches
+TITLE_WEIGHT = 3
+
+# Queries matching more questions than this are ranked within their newest this-many
+# matches (SQLite): scoring every posting of a term most questions contain takes seconds
+SEARCH_RANK_CANDIDATES = config('SEARCH_RANK_CANDIDATES', default=2000, cast=int)
+
+# InnoDB FULLTEXT settings: innodb_ft_min_token_size and default stopwords not in STOPWORDS
+MYSQL_FT_MIN_TOKEN_SIZE = config('MYSQL_FT_MIN_TOKEN_SIZE', default=3, cast=int)
+MYSQL_FT_STOPWORDS = frozenset("about com de en la und www".split())
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+# Tokens as FTS5's default unicode61 tokenizer splits them
+_FTS_TOKEN_RE = re.compile(r"[^\W_]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from how i if in into is it its my of on or "
+    "so that the their then there these this to was what when where which while who "
+    "why will with you your".split()
+)
+
+
+def tokenize(value: str) -> List[str]:
+    """Lowercased word tokens with HTML stripped; keeps c++ / c# style terms"""
+    value = _TAG_RE.sub(" ", value or "").lower()
+    return [t for t in _TOKEN_RE.findall(value) if t not in STOPWORDS]
+
+
+class SearchBackend:
+    """Interface for question search backends
+
+    Every backend matches questions containing all query terms, the last one
+    as a prefix (it may still be being typed).
+    """
+
+    name = "base"
+
+    def load(self, db: Session):
+        """Prepare the backend at startup (build or verify the index)"""
+
+    def index_question(self, db: Session, question: Question):
+        """Add or replace a question in the index"""
+
+    def remove_question(self, db: Session, question_id: str):
+        """Drop a question from the index"""
+
+    def search(self, db: Session, query: str, limit: int = 10, offset: int = 0) -> List[str]:
+        """Question ids best match first"""
+        raise NotImplementedError
+
+    def match(self, db: Session, query: str, limit: int) -> List[str]:
+        """Ids of up to `limit` matching questions, unranked"""
+        raise NotImplementedError
+
+    def match_clause(self, db: Session, query: str):
+        """SQL condition selecting the matching questions, or None if the index isn't in the database"""
+        return None
+
+
+class InMemorySearchBackend(SearchBackend):
+    """In-process inverted index with BM25 ranking and prefix matching on the last term"""
+
+    name = "memory"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_prefix_expansions: int = 50):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_expansions = max_prefix_expansions
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {question_id: weighted tf}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}  # question_id -> {term: weighted tf}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._vocabulary: List[str] = []  # Sorted, for prefix lookups
+        self._lock = threading.RLock()
+
+    def load(self, db: Session):
+        rows = db.query(Question.id, Question.title, Question.content).yield_per(1000)
+        with self._lock:
+            for question_id, title, content in rows:
+                self._add(question_id, title, content, sort_vocabulary=False)
+            # One sort at the end; inserting every new term in order is quadratic
+            self._vocabulary = sorted(self._postings)
+        print(f"🔎 Indexed {len(self._doc_lengths)} questions in memory")
+
+    def index_question(self, db: Session, question: Question):
+        with self._lock:
+            self._remove(question.id)
+            self._add(question.id, question.title, question.content)
+
+    def remove_question(self, db: Session, question_id: str):
+        with self._lock:
+            self._remove(question_id)
+
+    def search(self, db: Session, query: str, limit: int = 10, offset: int = 0) -> List[str]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_lengths)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+
+            expanded = self._expand(terms)
+            matching = self._matching(expanded)
+
+            scores: Dict[str, float] = {}
+            for alternatives in expanded:
+                for term in alternatives:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for question_id, tf in postings.items():
+                        if question_id not in matching:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[question_id] / avg_length)
+                        scores[question_id] = scores.get(question_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+        return [question_id for question_id, _ in best[offset:]]
+
+    def match(self, db: Session, query: str, limit: int) -> List[str]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            matching = self._matching(self._expand(terms))
+        return list(matching)[:limit]
+
+    def _expand(self, terms: List[str]) -> List[List[str]]:
+        """Terms as alternatives per position; the last one may still be being typed, so it matches as a prefix"""
+        return [[term] for term in terms[:-1]] + [self._expand_prefix(terms[-1])]
+
+    def _matching(self, expanded: List[List[str]]) -> Set[str]:
+        """Questions containing every term (any alternative of each), rarest term first"""
+        candidates = sorted(
+            (set().union(*(self._postings.get(term, ()) for term in alternatives)) for alternatives in expanded),
+            key=len
+        )
+        return candidates[0].intersection(*candidates[1:])
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:start + self.max_prefix_expansions]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches or [prefix]
+
+    def _add(self, question_id: str, title: str, content: str, sort_vocabulary: bool = True):
+        terms: Dict[str, int] = {}
+        for term in tokenize(title):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+        for term in tokenize(content):
+            terms[term] = terms.get(term, 0) + 1
+
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if sort_vocabulary:
+                    bisect.insort(self._vocabulary, term)
+            postings[question_id] = tf
+
+        length = sum(terms.values())
+        self._doc_terms[question_id] = terms
+        self._doc_lengths[question_id] = length
+        self._total_length += length
+
+    def _remove(self, question_id: str):
+        terms = self._doc_terms.pop(question_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(question_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._total_length -= self._doc_lengths.pop(question_id)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """SQLite FTS5 table kept in step with questions, ranked with bm25()
+
+    FTS5 can't index question_id, so questions_fts_rows maps it to the
+    FTS rowid for updates and deletes. Rowids follow indexing order, so
+    the newest matches come first in rowid order; broad queries are
+    ranked within the newest SEARCH_RANK_CANDIDATES of them. The last
+    query term is expanded to indexed terms through questions_fts_terms
+    (a plain sorted table) rather than an FTS5 prefix query, which merges
+    the full posting list of every term under the prefix.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, max_prefix_expansions: int = 50):
+        self.max_prefix_expansions = max_prefix_expansions
+
+    def load(self, db: Session):
+        db.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts "
+            "USING fts5(question_id UNINDEXED, title, content)"
+        ))
+        db.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts_vocab USING fts5vocab(questions_fts, row)"))
+        db.execute(text(
+            "CREATE TABLE IF NOT EXISTS questions_fts_rows "
+            "(question_id TEXT PRIMARY KEY, fts_rowid INTEGER NOT NULL) WITHOUT ROWID"
+        ))
+        db.execute(text("CREATE TABLE IF NOT EXISTS questions_fts_terms (term TEXT PRIMARY KEY) WITHOUT ROWID"))
+
+        fts_rows, mapped = db.execute(text("SELECT (SELECT count(*) FROM questions_fts), (SELECT count(*) FROM questions_fts_rows)")).one()
+        if fts_rows != mapped:
+            # Index from before questions_fts_rows existed (or rows without a mapping): map every row again
+            db.execute(text("DELETE FROM questions_fts_rows"))
+            db.execute(text("INSERT OR REPLACE INTO questions_fts_rows (question_id, fts_rowid) SELECT question_id, rowid FROM questions_fts ORDER BY rowid"))
+            db.execute(text("DELETE FROM questions_fts WHERE rowid NOT IN (SELECT fts_rowid FROM questions_fts_rows)"))
+        changed = self._sync(db)
+        if changed or not db.execute(text("SELECT 1 FROM questions_fts_terms LIMIT 1")).first():
+            # One pass over the FTS5 vocabulary; index_question adds new terms after this
+            db.execute(text("INSERT OR IGNORE INTO questions_fts_terms (term) SELECT term FROM questions_fts_vocab"))
+        db.commit()
+
+    def _sync(self, db: Session) -> int:
+        """Index questions written outside index_question (scripts, a crash before indexing) and drop deleted ones"""
+        indexed_ids = {row[0] for row in db.execute(text("SELECT question_id FROM questions_fts_rows"))}
+        question_ids = {question_id for (question_id,) in db.query(Question.id)}
+        stale = list(indexed_ids - question_ids)
+        for start in range(0, len(stale), 1000):
+            batch = {"ids": stale[start:start + 1000]}
+            db.execute(text(
+                "DELETE FROM questions_fts WHERE rowid IN (SELECT fts_rowid FROM questions_fts_rows WHERE question_id IN :ids)"
+            ).bindparams(bindparam("ids", expanding=True)), batch)
+            db.execute(text("DELETE FROM questions_fts_rows WHERE question_id IN :ids").bindparams(bindparam("ids", expanding=True)), batch)
+
+        missing = question_ids - indexed_ids
+        if missing:
+            # Explicit rowids past the current end, oldest first
+            next_rowid = (db.execute(text("SELECT rowid FROM questions_fts ORDER BY rowid DESC LIMIT 1")).scalar() or 0) + 1
+            rows = []
+            for question_id, title, content in db.query(
+                Question.id, Question.title, Question.content
+            ).order_by(Question.created_at).yield_per(1000):
+                if question_id in missing:
+                    rows.append({"rowid": next_rowid, "id": question_id, "title": title, "content": _TAG_RE.sub(" ", content or "")})
+                    next_rowid += 1
+                if len(rows) >= 1000:
+                    self._insert_rows(db, rows)
+                    rows = []
+            if rows:
+                self._insert_rows(db, rows)
+        if missing or stale:
+            print(f"🔎 Search index synced: {len(missing)} question(s) added, {len(stale)} removed")
+        return len(missing) + len(stale)
+
+    def _insert_rows(self, db: Session, rows: List[dict]):
+        db.execute(text("INSERT INTO questions_fts (rowid, question_id, title, content) VALUES (:rowid, :id, :title, :content)"), rows)
+        db.execute(text("INSERT INTO questions_fts_rows (question_id, fts_rowid) VALUES (:id, :rowid)"), rows)
+
+    def index_question(self, db: Session, question: Question):
+        self.remove_question(db, question.id)
+        content = _TAG_RE.sub(" ", question.content or "")
+        db.execute(
+            text("INSERT INTO questions_fts (question_id, title, content) VALUES (:id, :title, :content)"),
+            {"id": question.id, "title": question.title, "content": content}
+        )
+        db.execute(
+            text("INSERT INTO questions_fts_rows (question_id, fts_rowid) VALUES (:id, last_insert_rowid())"),
+            {"id": question.id}
+        )
+        terms = set(_FTS_TOKEN_RE.findall(f"{question.title} {content}".lower()))
+        if terms:
+            db.execute(text("INSERT OR IGNORE INTO questions_fts_terms (term) VALUES (:term)"), [{"term": term} for term in terms])
+
+    def remove_question(self, db: Session, question_id: str):
+        db.execute(
+            text("DELETE FROM questions_fts WHERE rowid IN (SELECT fts_rowid FROM questions_fts_rows WHERE question_id = :id)"),
+            {"id": question_id}
+        )
+        db.execute(text("DELETE FROM questions_fts_rows WHERE question_id = :id"), {"id": question_id})
+
+    def search(self, db: Session, query: str, limit: int = 10, offset: int = 0) -> List[str]:
+        match = self._match_expression(db, query)
+        if not match:
+            return []
+        # FTS5 walks a match in rowid order cheaply; bm25() has to score every row it ranks
+        floor = db.execute(
+            text("SELECT rowid FROM questions_fts WHERE questions_fts MATCH :match ORDER BY rowid DESC LIMIT 1 OFFSET :skip"),
+            {"match": match, "skip": max(SEARCH_RANK_CANDIDATES, offset + limit) - 1}
+        ).scalar()
+        rows = db.execute(
+            text(
+                "SELECT question_id FROM questions_fts WHERE questions_fts MATCH :match AND rowid >= :floor "
+                f"ORDER BY bm25(questions_fts, 0.0, {float(TITLE_WEIGHT)}, 1.0) LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "floor": floor or 0, "limit": limit, "offset": offset}
+        )
+        return [row[0] for row in rows]
+
+    def match(self, db: Session, query: str, limit: int) -> List[str]:
+        match = self._match_expression(db, query)
+        if not match:
+            return []
+        rows = db.execute(
+            text("SELECT question_id FROM questions_fts WHERE questions_fts MATCH :match LIMIT :limit"),
+            {"match": match, "limit": limit}
+        )
+        return [row[0] for row in rows]
+
+    def match_clause(self, db: Session, query: str):
+        match = self._match_expression(db, query)
+        if not match:
+            return None
+        matching = text("SELECT question_id FROM questions_fts WHERE questions_fts MATCH :match")
+        return Question.id.in_(matching.bindparams(match=match).columns(question_id=String))
+
+    def _match_expression(self, db: Session, query: str) -> str:
+        """FTS5 query: quoted terms ANDed, the last one OR'ed over the indexed terms it prefixes"""
+        terms = tokenize(query)
+        if not terms:
+            return ""
+        *exact, prefix = _FTS_TOKEN_RE.findall(terms[-1])
+        # Terms starting with prefix sort between it and prefix + the highest code point
+        expansions = [row[0] for row in db.execute(
+            text("SELECT term FROM questions_fts_terms WHERE term >= :prefix AND term < :upper ORDER BY term LIMIT :limit"),
+            {"prefix": prefix, "upper": prefix + "\U0010ffff", "limit": self.max_prefix_expansions}
+        )]
+        if not expansions:
+            return ""
+        phrases = [f'"{term}"' for term in terms[:-1] + exact]
+        return " AND ".join(phrases + ["(" + " OR ".join(f'"{term}"' for term in expansions) + ")"])
+
+
+class MySQLFulltextBackend(SearchBackend):
+    """MySQL InnoDB FULLTEXT indexes on (title, content) and (title); MySQL maintains them itself"""
+
+    name = "mysql"
+
+    def search(self, db: Session, query: str, limit: int = 10, offset: int = 0) -> List[str]:
+        against = self._against(query)
+        if not against:
+            return []
+        # Boolean mode has no per-column weights: the title-only MATCH adds the extra title weight
+        rows = db.execute(
+            text(
+                "SELECT id FROM questions "
+                "WHERE MATCH(title, content) AGAINST (:against IN BOOLEAN MODE) "
+                "ORDER BY MATCH(title, content) AGAINST (:against IN BOOLEAN MODE) "
+                "+ :title_boost * MATCH(title) AGAINST (:against IN BOOLEAN MODE) DESC "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            {"against": against, "title_boost": TITLE_WEIGHT - 1, "limit": limit, "offset": offset}
+        )
+        return [row[0] for row in rows]
+
+    def match(self, db: Session, query: str, limit: int) -> List[str]:
+        against = self._against(query)
+        if not against:
+            return []
+        rows = db.execute(
+            text("SELECT id FROM questions WHERE MATCH(title, content) AGAINST (:against IN BOOLEAN MODE) LIMIT :limit"),
+            {"against": against, "limit": limit}
+        )
+        return [row[0] for row in rows]
+
+    def match_clause(self, db: Session, query: str):
+        against = self._against(query)
+        if not against:
+            return None
+        return text("MATCH(questions.title, questions.content) AGAINST (:against IN BOOLEAN MODE)").bindparams(against=against)
+
+    def _against(self, query: str) -> str:
+        """Boolean-mode query: every term required (+), the last one as a prefix (*)"""
+        # Operators (+ - * " ...) are stripped from the terms; words InnoDB doesn't
+        # index are dropped, since requiring them would match nothing
+        terms = [
+            t for t in (re.sub(r"[^a-z0-9]", "", t) for t in tokenize(query))
+            if len(t) >= MYSQL_FT_MIN_TOKEN_SIZE and t not in MYSQL_FT_STOPWORDS
+        ]
+        if not terms:
+            return ""
+        return (" ".join(f"+{term}" for term in terms[:-1]) + f" +{terms[-1]}*").strip()
+
+
+def create_search_backend(dialect: str, backend: str = SEARCH_BACKEND) -> SearchBackend:
+    """Pick the search backend for a database dialect (or an explicit override)"""
+    if backend == "auto":
+        backend = {"mysql": "mysql", "sqlite": "sqlite"}.get(dialect, "memory")
+    if backend == "mysql":
+        return MySQLFulltextBackend()
+    if backend == "sqlite":
+        return SQLiteFTSBackend()
+    return InMemorySearchBackend()
+
+
+# Create a global instance
+search_engine = create_search_backend(engine.dialect.name)
@@ -0,0 +1,147 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, bindparam, select
+from decouple import config
+from app.models.models import SiteCounter, User, Question, Answer, Vote, Tag
+from app.services.cache import LRUCache
+from app.database.upsert import upsert
+from app.database.after_commit import after_commit
+from typing import Dict, Union
+import threading
+
+# /api/stats responses are served from memory for this long
+SITE_STATS_CACHE_TTL = config('SITE_STATS_CACHE_TTL', default=30, cast=int)
+# Buffered counter deltas are written this often
+SITE_COUNTERS_FLUSH_INTERVAL = config('SITE_COUNTERS_FLUSH_INTERVAL', default=10, cast=int)
+# Counters are recounted from the tables this often to repair any drift
+SITE_COUNTERS_RECONCILE_INTERVAL = config('SITE_COUNTERS_RECONCILE_INTERVAL', default=3600, cast=int)
+
+# Counter name -> how to recount it
+SITE_COUNTERS = {
+    "total_users": select(func.count(User.id)),
+    "total_questions": select(func.count(Question.id)),
+    "total_answers": select(func.count(Answer.id)),
+    "total_votes": select(func.count(Vote.id)),
+    "total_tags": select(func.count(Tag.id)),
+    "solved_questions": select(func.count(Question.id)).where(Question.is_solved == True),
+}
+
+_counters = SiteCounter.__table__
+# value = value + delta is applied by the database, so concurrent writers never lose updates
+_increment = _counters.update().where(_counters.c.name == bindparam("counter_name")).values(
+    value=_counters.c.value + bindparam("delta")
+)
+
+
+class SiteCounterBuffer:
+    """Sums committed counter deltas in memory and writes them as batched increments
+
+    Writes never touch the site_counters rows themselves, so they don't
+    queue behind one another on those few hot rows.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, deltas: Dict[str, int]):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._deltas[name] = self._deltas.get(name, 0) + delta
+
+    def pending(self) -> Dict[str, int]:
+        """Deltas added but not yet written"""
+        with self._lock:
+            return dict(self._deltas)
+
+    def flush(self, db: Session) -> int:
+        """Write pending deltas as one value = value + delta UPDATE per counter"""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        params = [{"counter_name": name, "delta": delta} for name, delta in deltas.items() if delta]
+        if not params:
+            return 0
+        try:
+            db.execute(_increment, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.add(deltas)
+            raise
+        return len(params)
+
+# Create a global instance
+site_counter_buffer = SiteCounterBuffer()
+site_stats_cache = LRUCache(max_entries=1, default_ttl=SITE_STATS_CACHE_TTL)
+
+
+def bump_site_counters(db: Union[Session, AsyncSession], **deltas: int):
+    """Add deltas to site counters once the caller's transaction commits"""
+    unknown = set(deltas) - set(SITE_COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown site counters: {', '.join(sorted(unknown))}")
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        after_commit(db, lambda: site_counter_buffer.add(deltas))
+
+
+class SiteStatsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_stats(self) -> Dict[str, int]:
+        """Site-wide totals: one small table read, cached for SITE_STATS_CACHE_TTL seconds"""
+        stats = site_stats_cache.get("stats")
+        if stats is None:
+            stored = dict(self.db.execute(select(_counters.c.name, _counters.c.value)).all())
+            if len(stored) < len(SITE_COUNTERS):
+                # Fresh database: seed the counters first
+                stored = self.reconcile()["counters"]
+            stats = {name: stored.get(name) or 0 for name in SITE_COUNTERS}
+            site_stats_cache.set("stats", stats)
+        return stats
+
+    def reconcile(self) -> Dict[str, object]:
+        """Recount every counter from its table and fix any drift
+
+        Nothing is locked. The counts and the stored values come from one
+        statement, so they share a snapshot, and the drift is added as
+        value = value + drift, so increments flushed meanwhile are kept.
+        Deltas this process committed before the snapshot but had not yet
+        written are in the counts already and are taken out of the drift.
+        Deltas still buffered in other workers are not, so with several
+        workers a reconcile can be off by their last flush interval of
+        writes until the next one.
+        """
+        try:
+            site_counter_buffer.flush(self.db)
+            upsert(self.db, _counters, [{"name": name, "value": 0} for name in SITE_COUNTERS], ["name"])
+            self.db.commit()
+
+            pending = site_counter_buffer.pending()
+            snapshot = self.db.execute(select(*(
+                column
+                for name, count in SITE_COUNTERS.items()
+                for column in (
+                    count.scalar_subquery().label(name),
+                    select(_counters.c.value).where(_counters.c.name == name).scalar_subquery().label(f"stored_{name}"),
+                )
+            ))).mappings().one()
+
+            counts = {name: snapshot[name] or 0 for name in SITE_COUNTERS}
+            drift = {}
+            for name in SITE_COUNTERS:
+                delta = counts[name] - (snapshot[f"stored_{name}"] or 0) - pending.get(name, 0)
+                if delta:
+                    drift[name] = delta
+            if drift:
+                self.db.execute(_increment, [{"counter_name": name, "delta": delta} for name, delta in drift.items()])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        if drift:
+            print(f"🧮 Reconciled site counters: {drift}")
+            site_stats_cache.delete("stats")
+        return {"counters": counts, "drift": drift}
@@ -2,7 +2,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from app.models.models import Tag, Question
 from app.schemas.schemas import TagCreate
-from typing import Optional, List
+from app.services.pagination import keyset_page
+from app.services.question_service import QUESTION_SORTS, QUESTION_LIST_OPTIONS
+from app.services.site_stats_service import bump_site_counters
+from app.services.autocomplete_service import tag_autocomplete
+from app.services.related_tags_service import related_tags
+from typing import Optional, List, Tuple
 
 class TagService:
     def __init__(self, db: Session):
@@ -13,8 +18,10 @@ class TagService:
         db_tag = Tag(**tag_data.model_dump())
         db_tag.name = db_tag.name.lower()  # Normalize tag names
         self.db.add(db_tag)
+        bump_site_counters(self.db, total_tags=1)
         self.db.commit()
         self.db.refresh(db_tag)
+        tag_autocomplete.set(db_tag)
         return db_tag
 
     def get_tag_by_id(self, tag_id: str) -> Optional[Tag]:
@@ -31,8 +38,10 @@ class TagService:
         if not tag:
             tag = Tag(name=name.lower())
             self.db.add(tag)
+            bump_site_counters(self.db, total_tags=1)
             self.db.commit()
             self.db.refresh(tag)
+            tag_autocomplete.set(tag)
         return tag
 
     def get_all_tags(self, skip: int = 0, limit: int = 50) -> List[Tag]:
@@ -43,12 +52,9 @@ class TagService:
         """Get most popular tags"""
         return self.db.query(Tag).order_by(desc(Tag.usage_count)).limit(limit).all()
 
-    def search_tags(self, query: str, limit: int = 10) -> List[Tag]:
-        """Search tags by name"""
-        search_term = f"%{query.lower()}%"
-        return self.db.query(Tag).filter(
-            Tag.name.ilike(search_term)
-        ).order_by(desc(Tag.usage_count)).limit(limit).all()
+    def search_tags(self, query: str, limit: int = 10) -> List[dict]:
+        """Most used tags starting with query, from the in-memory autocomplete index"""
+        return tag_autocomplete.suggest(query, limit)
 
     def update_tag(self, tag_id: str, tag_data: TagCreate) -> Optional[Tag]:
         """Update a tag"""
@@ -64,6 +70,7 @@ class TagService:
         
         self.db.commit()
         self.db.refresh(tag)
+        tag_autocomplete.set(tag)
         return tag
 
     def delete_tag(self, tag_id: str) -> bool:
@@ -76,8 +83,11 @@ class TagService:
         if tag.usage_count > 0:
             return False
         
+        name = tag.name
         self.db.delete(tag)
+        bump_site_counters(self.db, total_tags=-1)
         self.db.commit()
+        tag_autocomplete.remove(name)
         return True
 
     def get_tag_statistics(self) -> dict:
@@ -91,34 +101,42 @@ class TagService:
             "most_used_count": most_used_tag.usage_count if most_used_tag else 0
         }
 
-    def get_questions_by_tag(self, tag_name: str, skip: int = 0, limit: int = 10) -> List[Question]:
+    def get_questions_by_tag(
+        self,
+        tag_name: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        sort: str = 'newest'
+    ) -> Tuple[List[Question], Optional[str]]:
         """Get questions by tag name"""
-        return self.db.query(Question).join(Question.tags).filter(
+        query = self.db.query(Question).options(*QUESTION_LIST_OPTIONS).join(Question.tags).filter(
             Tag.name == tag_name.lower()
-        ).order_by(desc(Question.created_at)).offset(skip).limit(limit).all()
+        )
+        return keyset_page(query, sort, QUESTION_SORTS[sort], cursor, limit)
 
-    def get_related_tags(self, tag_name: str, limit: int = 5) -> List[Tag]:
-        """Get tags that are commonly used together with the given tag"""
-        # Get questions that use this tag
-        questions_with_tag = self.db.query(Question).join(Question.tags).filter(
-            Tag.name == tag_name.lower()
-        ).subquery()
-        
-        # Get other tags used in these questions
-        related_tags = self.db.query(Tag).join(Tag.questions).filter(
-            Question.id.in_(self.db.query(questions_with_tag.c.id)),
-            Tag.name != tag_name.lower()
-        ).group_by(Tag.id).order_by(desc(func.count(Question.id))).limit(limit).all()
-        
-        return related_tags
+    def get_related_tags(self, tag_name: str, limit: int = 5) -> Optional[List[dict]]:
+        """Tags most often used together with the given tag, from the in-memory co-occurrence counts"""
+        tag = tag_autocomplete.get(tag_name)
+        if not tag:
+            return None
+        related = []
+        for tag_id, questions, lift, pmi in related_tags.related(tag["id"], limit):
+            other = tag_autocomplete.get_by_id(tag_id)
+            if other:
+                related.append({**other, "questions": questions, "lift": lift, "pmi": pmi})
+        return related
 
     def cleanup_unused_tags(self) -> int:
         """Remove tags with usage_count = 0"""
         unused_tags = self.db.query(Tag).filter(Tag.usage_count == 0).all()
         count = len(unused_tags)
+        names = [tag.name for tag in unused_tags]
         
         for tag in unused_tags:
             self.db.delete(tag)
         
+        bump_site_counters(self.db, total_tags=-count)
         self.db.commit()
+        for name in names:
+            tag_autocomplete.remove(name)
         return count 
\ No newline at end of file
@@ -1,11 +1,66 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, bindparam, or_, select
+from decouple import config
 from app.models.models import User, Question, Answer
 from app.schemas.schemas import UserCreate, UserUpdate
-from typing import Optional, List
+from app.services.site_stats_service import bump_site_counters
+from app.services.activity_service import record_activity
+from typing import Optional, List, Dict, Any
 from datetime import datetime
+import threading
 import uuid
 
+# How often buffered last_login timestamps are written, and rows per UPDATE
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=30, cast=int)
+LAST_LOGIN_BATCH_SIZE = config('LAST_LOGIN_BATCH_SIZE', default=500, cast=int)
+
+class LastLoginBuffer:
+    """Coalesces last_login updates in memory and writes them in bulk"""
+    
+    def __init__(self, batch_size: int = LAST_LOGIN_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+    
+    def touch(self, user_id: str, when: Optional[datetime] = None):
+        """Record a login; only the latest timestamp per user is kept"""
+        with self._lock:
+            self._pending[user_id] = when or datetime.utcnow()
+    
+    def pending(self) -> int:
+        return len(self._pending)
+    
+    def flush(self, db: Session) -> int:
+        """Write all buffered timestamps, one executemany UPDATE per batch"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        users = User.__table__
+        # Keep updated_at as-is: a login is not a profile change
+        stmt = users.update().where(users.c.id == bindparam('b_id')).values(
+            last_login=bindparam('b_last_login'),
+            updated_at=users.c.updated_at
+        )
+        rows = [{'b_id': user_id, 'b_last_login': when} for user_id, when in pending.items()]
+        try:
+            for i in range(0, len(rows), self.batch_size):
+                db.execute(stmt, rows[i:i + self.batch_size])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the timestamps back unless a newer login already replaced them
+            with self._lock:
+                for user_id, when in pending.items():
+                    self._pending.setdefault(user_id, when)
+            raise
+        return len(rows)
+
+# Create a global instance
+last_login_buffer = LastLoginBuffer()
+
 class UserService:
     def __init__(self, db: Session):
         self.db = db
@@ -14,6 +69,8 @@ class UserService:
         """Create a new user"""
         db_user = User(**user_data.model_dump())
         self.db.add(db_user)
+        bump_site_counters(self.db, total_users=1)
+        record_activity(self.db, users=1)
         self.db.commit()
         self.db.refresh(db_user)
         return db_user
@@ -55,6 +112,7 @@ class UserService:
             return False
         
         self.db.delete(user)
+        bump_site_counters(self.db, total_users=-1)
         self.db.commit()
         return True
 
@@ -82,37 +140,142 @@ class UserService:
         self.db.commit()
         return True
 
-    def sync_clerk_user(self, clerk_user_id: str, email: str, name: str, avatar_url: str = "") -> User:
-        """Sync a Clerk user with local database (synchronous)"""
-        print(f"🔄 Syncing Clerk user: {clerk_user_id}, {email}, {name}")
+    def upsert_clerk_users(self, profiles: List[Dict[str, Any]]) -> List[User]:
+        """Create or update a batch of Clerk users (from webhooks) in one transaction"""
+        # Last event wins when a batch carries several events for one user
+        by_clerk_id = {p['clerk_id']: p for p in profiles if p.get('clerk_id') and p.get('email')}
+        if not by_clerk_id:
+            return []
         
-        # Check if user already exists
-        existing_user = self.get_user_by_clerk_id(clerk_user_id)
+        existing = {
+            user.clerk_id: user
+            for user in self.db.query(User).filter(User.clerk_id.in_(list(by_clerk_id))).all()
+        }
         
-        if existing_user:
-            print(f"✅ Found existing user: {existing_user.id}")
-            # Update existing user with latest info
-            existing_user.display_name = name
-            existing_user.email = email
-            existing_user.avatar_url = avatar_url
-            existing_user.last_login = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(existing_user)
-            return existing_user
+        users = []
+        new_profiles = []
+        for clerk_id, profile in by_clerk_id.items():
+            user = existing.get(clerk_id)
+            if not user:
+                new_profiles.append(profile)
+                continue
+            for field, value in (('display_name', profile['name']), ('email', profile['email']), ('avatar_url', profile['avatar_url'])):
+                if getattr(user, field) != value:
+                    setattr(user, field, value)
+            user.is_active = True
+            users.append(user)
         
-        # Generate a unique username from email
-        base_username = email.split('@')[0]
-        username = base_username
+        usernames = self._allocate_usernames([p['email'].split('@')[0] for p in new_profiles])
+        for profile, username in zip(new_profiles, usernames):
+            user = User(
+                id=str(uuid.uuid4()),
+                clerk_id=profile['clerk_id'],
+                username=username,
+                email=profile['email'],
+                display_name=profile['name'],
+                avatar_url=profile['avatar_url'],
+                reputation=0,
+                is_active=True,
+                created_at=datetime.utcnow()
+            )
+            self.db.add(user)
+            users.append(user)
+        
+        bump_site_counters(self.db, total_users=len(new_profiles))
+        record_activity(self.db, users=len(new_profiles))
+        self.db.commit()
+        print(f"✅ Upserted {len(users)} Clerk user(s), {len(new_profiles)} new")
+        return users
+
+    def deactivate_clerk_users(self, clerk_ids: List[str]) -> int:
+        """Deactivate users deleted in Clerk (their content is kept)"""
+        if not clerk_ids:
+            return 0
+        count = self.db.query(User).filter(User.clerk_id.in_(clerk_ids)).update(
+            {User.is_active: False}, synchronize_session=False
+        )
+        self.db.commit()
+        return count
+
+    def _allocate_usernames(self, base_usernames: List[str]) -> List[str]:
+        """Pick a free username for each base, using a single query for the whole batch"""
+        if not base_usernames:
+            return []
+        bases = [base[:45] or 'user' for base in base_usernames]
+        taken = {row[0] for row in self.db.query(User.username).filter(_username_prefix_filter(bases))}
+        return _pick_usernames(bases, taken)
+
+def _username_prefix_filter(bases: List[str]):
+    """Match every username starting with one of the bases"""
+    def escape_like(value: str) -> str:
+        return value.replace('/', '//').replace('%', '/%').replace('_', '/_')
+    return or_(*[User.username.like(escape_like(base) + '%', escape='/') for base in set(bases)])
+
+def _pick_usernames(bases: List[str], taken: set) -> List[str]:
+    """Append the lowest free counter to each base that is already taken"""
+    usernames = []
+    for base in bases:
+        username = base
         counter = 1
-        while self.get_user_by_username(username):
-            username = f"{base_username}{counter}"
+        while username in taken:
+            username = f"{base}{counter}"
             counter += 1
+        taken.add(username)
+        usernames.append(username)
+    return usernames
+
+class AsyncUserService:
+    """UserService counterpart on an AsyncSession, for the async auth path"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID"""
+        return await self.db.get(User, user_id)
+    
+    async def get_user_by_clerk_id(self, clerk_id: str) -> Optional[User]:
+        """Get user by Clerk ID"""
+        result = await self.db.execute(select(User).where(User.clerk_id == clerk_id))
+        return result.scalars().first()
+    
+    async def get_user_stats(self, user_id: str) -> dict:
+        """Get user statistics"""
+        question_count = await self.db.scalar(select(func.count(Question.id)).where(Question.user_id == user_id))
+        answer_count = await self.db.scalar(select(func.count(Answer.id)).where(Answer.user_id == user_id))
+        
+        return {
+            "question_count": question_count or 0,
+            "answer_count": answer_count or 0
+        }
+    
+    async def sync_clerk_user(self, clerk_user_id: str, email: str, name: str, avatar_url: str = "") -> User:
+        """Sync a Clerk user with local database"""
+        existing_user = await self.get_user_by_clerk_id(clerk_user_id)
+        
+        if existing_user:
+            # Only write when the profile actually changed; last_login is buffered
+            changed = False
+            for field, value in (('display_name', name), ('email', email), ('avatar_url', avatar_url)):
+                if getattr(existing_user, field) != value:
+                    setattr(existing_user, field, value)
+                    changed = True
+            
+            last_login_buffer.touch(existing_user.id)
+            
+            if changed:
+                print(f"✏️ Updating profile for user: {existing_user.id}")
+                await self.db.commit()
+            return existing_user
+        
+        base = email.split('@')[0][:45] or 'user'
+        result = await self.db.execute(select(User.username).where(_username_prefix_filter([base])))
+        username = _pick_usernames([base], set(result.scalars().all()))[0]
         
         print(f"🆕 Creating new user with username: {username}")
         
-        # Create new user
         new_user = User(
-            id=str(uuid.uuid4()),  # Generate new UUID
+            id=str(uuid.uuid4()),
             clerk_id=clerk_user_id,
             username=username,
             email=email,
@@ -125,8 +288,9 @@ class UserService:
         )
         
         self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
+        bump_site_counters(self.db, total_users=1)
+        record_activity(self.db, users=1)
+        await self.db.commit()
         
         print(f"✅ Created new user: {new_user.id}")
-        return new_user 
\ No newline at end of file
+        return new_user
@@ -1,91 +1,147 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.models import Vote, Question, Answer, User
+from sqlalchemy import func, select, union_all, literal, case, bindparam
+from app.models.models import Vote, Question, Answer
 from app.schemas.schemas import VoteCreate
-from typing import Optional, Dict
-from app.services.user_service import UserService
+from typing import Optional, Dict, List
+from app.services.question_service import question_cache
+from app.database.upsert import upsert
+from app.services.reputation_service import ReputationService, vote_reputation
+from app.services.site_stats_service import bump_site_counters
+from app.services.activity_service import record_activity
+from app.services.hot_service import hot_scores
+
+# Re-reads allowed when another request changed the same vote in between
+VOTE_WRITE_ATTEMPTS = 3
+_CONFLICT = object()
 
 class VoteService:
     def __init__(self, db: Session):
         self.db = db
-        self.user_service = UserService(db)
 
     def vote(self, vote_data: VoteCreate, user_id: str) -> Dict[str, any]:
-        """Create or update a vote"""
+        """Create, change or toggle off a vote"""
         if not vote_data.question_id and not vote_data.answer_id:
             return {"success": False, "message": "Either question_id or answer_id is required"}
         
         if vote_data.question_id and vote_data.answer_id:
             return {"success": False, "message": "Cannot vote on both question and answer simultaneously"}
         
-        # Check if vote already exists
-        existing_vote = None
-        if vote_data.question_id:
-            existing_vote = self.db.query(Vote).filter(
-                Vote.user_id == user_id,
-                Vote.question_id == vote_data.question_id
-            ).first()
-        else:
-            existing_vote = self.db.query(Vote).filter(
-                Vote.user_id == user_id,
-                Vote.answer_id == vote_data.answer_id
-            ).first()
-        
-        target_obj = None
-        target_owner_id = None
-        
-        if vote_data.question_id:
-            target_obj = self.db.query(Question).filter(Question.id == vote_data.question_id).first()
-            target_owner_id = target_obj.user_id if target_obj else None
+        result = self._apply_vote(user_id, vote_data.question_id, vote_data.answer_id, vote_data.vote_type)
+        if result is None:
+            return {"success": True, "message": "Vote removed", "vote_type": 0, "total_votes": self._get_vote_total(vote_data)}
+        return result
+
+    def _apply_vote(self, user_id: str, question_id: Optional[str], answer_id: Optional[str], vote_type: Optional[int]) -> Optional[Dict[str, any]]:
+        """Apply a vote in one transaction with SQL-side counter updates
+
+        vote_type None removes the vote; voting the same way twice toggles it off.
+        Returns None when there was nothing to change.
+        """
+        for _ in range(VOTE_WRITE_ATTEMPTS):
+            result = self._try_vote(user_id, question_id, answer_id, vote_type)
+            if result is not _CONFLICT:
+                return result
+        return {"success": False, "message": "Vote conflicted with a concurrent change, please retry"}
+
+    def _try_vote(self, user_id: str, question_id: Optional[str], answer_id: Optional[str], vote_type: Optional[int]):
+        """One attempt at _apply_vote; _CONFLICT if the vote row changed under us (rolled back)
+
+        The vote write is conditional on the vote type read first (insert-or-ignore
+        for a first vote, UPDATE/DELETE ... WHERE vote_type = old otherwise), so
+        the counter and reputation deltas only follow a write that really
+        happened. Where row locks exist the target row is locked first, which
+        queues concurrent votes on it instead of deadlocking on the vote key.
+        """
+        if question_id:
+            target_model, target_id, vote_column = Question, question_id, 'question_id'
         else:
-            target_obj = self.db.query(Answer).filter(Answer.id == vote_data.answer_id).first()
-            target_owner_id = target_obj.user_id if target_obj else None
-        
-        if not target_obj:
-            return {"success": False, "message": "Target not found"}
+            target_model, target_id, vote_column = Answer, answer_id, 'answer_id'
+        vote_filter = (Vote.user_id == user_id, getattr(Vote, vote_column) == target_id)
         
-        # Don't allow voting on own content
-        if target_owner_id == user_id:
-            return {"success": False, "message": "Cannot vote on your own content"}
-        
-        old_vote_type = 0
-        if existing_vote:
-            old_vote_type = existing_vote.vote_type
+        try:
+            target = self.db.query(target_model.user_id).filter(target_model.id == target_id).with_for_update().first()
+            if not target:
+                self.db.rollback()
+                return {"success": False, "message": "Target not found"}
+            target_owner_id = target.user_id
+            
+            # Don't allow voting on own content
+            if target_owner_id == user_id:
+                self.db.rollback()
+                return {"success": False, "message": "Cannot vote on your own content"}
             
-            # If same vote type, remove the vote (toggle)
-            if existing_vote.vote_type == vote_data.vote_type:
-                self.db.delete(existing_vote)
-                self._update_vote_count(target_obj, -vote_data.vote_type)
-                self._update_user_reputation(target_owner_id, -self._get_reputation_change(vote_data.vote_type))
-                self.db.commit()
-                return {
-                    "success": True, 
-                    "message": "Vote removed", 
-                    "vote_type": 0,
-                    "total_votes": target_obj.vote_count
-                }
+            old_vote_type = self.db.query(Vote.vote_type).filter(*vote_filter).with_for_update().scalar() or 0
+            
+            if vote_type is None or vote_type == old_vote_type:
+                new_vote_type = 0
             else:
-                # Update existing vote
-                existing_vote.vote_type = vote_data.vote_type
-        else:
-            # Create new vote
-            new_vote = Vote(**vote_data.model_dump(), user_id=user_id)
-            self.db.add(new_vote)
-        
-        # Update vote count
-        vote_change = vote_data.vote_type - old_vote_type
-        self._update_vote_count(target_obj, vote_change)
-        
-        # Update user reputation
-        reputation_change = self._get_reputation_change(vote_data.vote_type) - self._get_reputation_change(old_vote_type)
-        self._update_user_reputation(target_owner_id, reputation_change)
+                new_vote_type = vote_type
+            
+            if new_vote_type == old_vote_type:
+                # Removing a vote that doesn't exist
+                self.db.rollback()
+                return None
+            
+            if not old_vote_type:
+                # A concurrent first vote by the same user makes this insert a no-op
+                written = upsert(
+                    self.db,
+                    Vote.__table__,
+                    {"user_id": user_id, vote_column: target_id, "vote_type": new_vote_type},
+                    conflict_columns=["user_id", vote_column]
+                ).rowcount
+            elif new_vote_type == 0:
+                written = self.db.query(Vote).filter(*vote_filter, Vote.vote_type == old_vote_type).delete(
+                    synchronize_session=False
+                )
+            else:
+                written = self.db.query(Vote).filter(*vote_filter, Vote.vote_type == old_vote_type).update(
+                    {Vote.vote_type: new_vote_type}, synchronize_session=False
+                )
+            if written != 1:
+                self.db.rollback()
+                return _CONFLICT
+            
+            bump_site_counters(self.db, total_votes=bool(new_vote_type) - bool(old_vote_type))
+            if not old_vote_type:
+                record_activity(self.db, votes=1)
+            
+            counter_changes = {target_model.vote_count: target_model.vote_count + (new_vote_type - old_vote_type)}
+            upvote_change = (new_vote_type == 1) - (old_vote_type == 1)
+            downvote_change = (new_vote_type == -1) - (old_vote_type == -1)
+            if upvote_change:
+                counter_changes[target_model.upvotes] = target_model.upvotes + upvote_change
+            if downvote_change:
+                counter_changes[target_model.downvotes] = target_model.downvotes + downvote_change
+            self.db.query(target_model).filter(target_model.id == target_id).update(
+                counter_changes,
+                synchronize_session=False
+            )
+            
+            reputation_service = ReputationService(self.db)
+            reputation_service.record(
+                target_owner_id,
+                vote_reputation(new_vote_type) - vote_reputation(old_vote_type),
+                "vote",
+                actor_id=user_id,
+                question_id=question_id,
+                answer_id=answer_id
+            )
+            
+            total_votes = self.db.query(target_model.vote_count).filter(target_model.id == target_id).scalar()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         
-        self.db.commit()
+        reputation_service.publish()
+        hot_scores.touch(question_id)
+        question_cache.invalidate(question_id or self.db.query(Answer.question_id).filter(Answer.id == answer_id).scalar())
         return {
-            "success": True, 
-            "message": "Vote recorded", 
-            "vote_type": vote_data.vote_type,
-            "total_votes": target_obj.vote_count
+            "success": True,
+            "message": "Vote recorded" if new_vote_type else "Vote removed",
+            "vote_type": new_vote_type,
+            "total_votes": total_votes
         }
 
     def get_user_vote(self, user_id: str, question_id: str = None, answer_id: str = None) -> Optional[Vote]:
@@ -102,91 +158,60 @@ class VoteService:
             ).first()
         return None
 
+    def get_vote_state(self, user_id: str, question_ids: List[str], answer_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Get the user's votes on many questions and answers in one query"""
+        state = {"questions": {}, "answers": {}}
+        selects = []
+        # Each branch is a range scan on idx_votes_user_question / idx_votes_user_answer
+        if question_ids:
+            selects.append(select(literal("q").label("kind"), Vote.question_id.label("target_id"), Vote.vote_type).where(
+                Vote.user_id == user_id, Vote.question_id.in_(set(question_ids))
+            ))
+        if answer_ids:
+            selects.append(select(literal("a").label("kind"), Vote.answer_id.label("target_id"), Vote.vote_type).where(
+                Vote.user_id == user_id, Vote.answer_id.in_(set(answer_ids))
+            ))
+        if not selects:
+            return state
+        
+        stmt = union_all(*selects) if len(selects) > 1 else selects[0]
+        for kind, target_id, vote_type in self.db.execute(stmt):
+            state["questions" if kind == "q" else "answers"][target_id] = vote_type
+        return state
+
     def get_votes_by_user(self, user_id: str, skip: int = 0, limit: int = 10) -> list:
         """Get all votes by a user"""
         return self.db.query(Vote).filter(Vote.user_id == user_id).offset(skip).limit(limit).all()
 
     def get_question_votes(self, question_id: str) -> Dict[str, int]:
         """Get vote statistics for a question"""
-        upvotes = self.db.query(func.count(Vote.id)).filter(
-            Vote.question_id == question_id,
-            Vote.vote_type == 1
-        ).scalar()
-        
-        downvotes = self.db.query(func.count(Vote.id)).filter(
-            Vote.question_id == question_id,
-            Vote.vote_type == -1
-        ).scalar()
-        
-        return {
-            "upvotes": upvotes or 0,
-            "downvotes": downvotes or 0,
-            "total": (upvotes or 0) - (downvotes or 0)
-        }
+        return self._get_vote_counters(Question, question_id)
 
     def get_answer_votes(self, answer_id: str) -> Dict[str, int]:
         """Get vote statistics for an answer"""
-        upvotes = self.db.query(func.count(Vote.id)).filter(
-            Vote.answer_id == answer_id,
-            Vote.vote_type == 1
-        ).scalar()
-        
-        downvotes = self.db.query(func.count(Vote.id)).filter(
-            Vote.answer_id == answer_id,
-            Vote.vote_type == -1
-        ).scalar()
-        
+        return self._get_vote_counters(Answer, answer_id)
+
+    def _get_vote_counters(self, target_model, target_id: str) -> Dict[str, int]:
+        row = self.db.query(target_model.upvotes, target_model.downvotes).filter(target_model.id == target_id).first()
+        upvotes = (row.upvotes or 0) if row else 0
+        downvotes = (row.downvotes or 0) if row else 0
         return {
-            "upvotes": upvotes or 0,
-            "downvotes": downvotes or 0,
-            "total": (upvotes or 0) - (downvotes or 0)
+            "upvotes": upvotes,
+            "downvotes": downvotes,
+            "total": upvotes - downvotes
         }
 
-    def _update_vote_count(self, target_obj, vote_change: int):
-        """Update vote count on question or answer"""
-        target_obj.vote_count += vote_change
-
-    def _get_reputation_change(self, vote_type: int) -> int:
-        """Get reputation change based on vote type"""
-        if vote_type == 1:  # Upvote
-            return 5
-        elif vote_type == -1:  # Downvote
-            return -2
-        return 0
-
-    def _update_user_reputation(self, user_id: str, reputation_change: int):
-        """Update user reputation"""
-        if reputation_change != 0:
-            self.user_service.update_user_reputation(user_id, reputation_change)
+    def _get_vote_total(self, vote_data: VoteCreate) -> Optional[int]:
+        if vote_data.question_id:
+            return self.db.query(Question.vote_count).filter(Question.id == vote_data.question_id).scalar()
+        return self.db.query(Answer.vote_count).filter(Answer.id == vote_data.answer_id).scalar()
 
     def remove_vote(self, user_id: str, question_id: str = None, answer_id: str = None) -> bool:
         """Remove a user's vote"""
-        vote = self.get_user_vote(user_id, question_id, answer_id)
-        if not vote:
+        if not question_id and not answer_id:
             return False
-        
-        # Get target object
-        target_obj = None
-        target_owner_id = None
-        
-        if question_id:
-            target_obj = self.db.query(Question).filter(Question.id == question_id).first()
-            target_owner_id = target_obj.user_id if target_obj else None
-        else:
-            target_obj = self.db.query(Answer).filter(Answer.id == answer_id).first()
-            target_owner_id = target_obj.user_id if target_obj else None
-        
-        if not target_obj:
-            return False
-        
-        # Revert vote count and reputation
-        self._update_vote_count(target_obj, -vote.vote_type)
-        self._update_user_reputation(target_owner_id, -self._get_reputation_change(vote.vote_type))
-        
-        # Delete vote
-        self.db.delete(vote)
-        self.db.commit()
-        return True
+        result = self._apply_vote(user_id, question_id, answer_id, None)
+        return bool(result and result["success"])
 
     def get_top_voted_questions(self, limit: int = 10) -> list:
         """Get questions with highest votes"""
@@ -194,4 +219,52 @@ class VoteService:
 
     def get_top_voted_answers(self, limit: int = 10) -> list:
         """Get answers with highest votes"""
-        return self.db.query(Answer).order_by(Answer.vote_count.desc()).limit(limit).all() 
\ No newline at end of file
+        return self.db.query(Answer).order_by(Answer.vote_count.desc()).limit(limit).all()
+
+
+def reconcile_vote_counters(db: Session, fix: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+    """Recompute upvotes/downvotes/vote_count from votes and report (optionally fix) drift
+
+    One grouped aggregate per target type, compared against the stored
+    counters streamed in id order; drifted rows are rewritten in batches.
+    Fixed questions are dropped from this process's question cache only;
+    other processes serve their cached copies until QUESTION_CACHE_TTL.
+    """
+    drift = {}
+    for target_model, vote_column, question_column in (
+        (Question, Vote.question_id, Question.id),
+        (Answer, Vote.answer_id, Answer.question_id)
+    ):
+        actual = {
+            target_id: (up or 0, down or 0)
+            for target_id, up, down in db.query(
+                vote_column,
+                func.sum(case((Vote.vote_type == 1, 1), else_=0)),
+                func.sum(case((Vote.vote_type == -1, 1), else_=0))
+            ).filter(vote_column.isnot(None)).group_by(vote_column)
+        }
+
+        table = target_model.__table__
+        fix_stmt = table.update().where(table.c.id == bindparam("target_id")).values(
+            upvotes=bindparam("up"), downvotes=bindparam("down"), vote_count=bindparam("total"),
+            updated_at=table.c.updated_at  # Counter repair isn't an edit
+        )
+        drifted = []
+        affected_questions = set()
+        stored = db.query(
+            target_model.id, question_column, target_model.upvotes, target_model.downvotes, target_model.vote_count
+        ).order_by(target_model.id).yield_per(batch_size)
+        for target_id, question_id, upvotes, downvotes, vote_count in stored:
+            up, down = actual.get(target_id, (0, 0))
+            if (upvotes, downvotes, vote_count) != (up, down, up - down):
+                drifted.append({"target_id": target_id, "up": up, "down": down, "total": up - down})
+                affected_questions.add(question_id)
+
+        if fix and drifted:
+            for start in range(0, len(drifted), batch_size):
+                db.execute(fix_stmt, drifted[start:start + batch_size])
+            db.commit()
+            for question_id in affected_questions:
+                question_cache.invalidate(question_id)
+        drift[table.name] = len(drifted)
+    return drift
@@ -0,0 +1,22 @@
+"""
+Build activity and per-tag rollups for all existing history
+
+Usage: python backfill_activity_rollups.py
+The app's catch-up job only recounts recent history; run this once after
+adding the rollup tables.
+"""
+from datetime import datetime
+
+from app.database.config import SessionLocal
+from app.services.activity_service import ActivityService
+
+def main():
+    db = SessionLocal()
+    try:
+        result = ActivityService(db).catch_up(since=datetime.min)
+    finally:
+        db.close()
+    print(f"✅ Wrote {result['buckets']} activity bucket(s) and {result['tag_days']} tag-day row(s)")
+
+if __name__ == "__main__":
+    main()
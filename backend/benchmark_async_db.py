@@ -0,0 +1,160 @@
+"""
+Benchmark latency under concurrent clients for async def routes on the sync Session
+(the old auth path) vs on an AsyncSession (aiosqlite), served by one uvicorn worker
+
+Usage: python benchmark_async_db.py [clients] [requests per client] [users] [seconds per route]
+Each request looks a user up by Clerk ID and counts their questions and answers, as
+get_current_user plus the profile route do. While the clients run, a probe keeps
+calling /health, which never touches the database: its latency shows how long the
+event loop was stalled by other requests' database work. Failed requests (errors and
+client timeouts) are counted, not retried. Each route gets a fresh server and a time
+limit: on the sync Session, a checkout from an exhausted pool blocks the event loop,
+and the connections it waits for are only returned by cleanup that needs the loop, so
+past the pool size the worker can stall for good.
+"""
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}")
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.config import engine, get_async_db, get_db
+from app.models.models import Answer, Base, Question, User
+from app.services.user_service import AsyncUserService, UserService
+
+app = FastAPI()
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.get("/sync/{clerk_id}")
+async def sync_route(clerk_id: str, db: Session = Depends(get_db)):
+    user_service = UserService(db)
+    user = user_service.get_user_by_clerk_id(clerk_id)
+    return {"id": user.id, **user_service.get_user_stats(user.id)}
+
+@app.get("/async/{clerk_id}")
+async def async_route(clerk_id: str, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_clerk_id(clerk_id)
+    return {"id": user.id, **await user_service.get_user_stats(user.id)}
+
+def populate(users: int):
+    Base.metadata.create_all(engine)
+    user_rows = [{"id": str(uuid.uuid4()), "clerk_id": f"user_{n}", "email": f"user{n}@example.com",
+                  "username": f"user{n}", "reputation": 0} for n in range(users)]
+    questions, answers = [], []
+    for _ in range(users * 20):
+        question_id = str(uuid.uuid4())
+        questions.append({"id": question_id, "user_id": random.choice(user_rows)["id"], "title": "Question",
+                          "content": "Synthetic question", "excerpt": "Synthetic question"})
+        answers.append({"id": str(uuid.uuid4()), "question_id": question_id,
+                        "user_id": random.choice(user_rows)["id"], "content": "Synthetic answer"})
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), user_rows)
+        connection.execute(Question.__table__.insert(), questions)
+        connection.execute(Answer.__table__.insert(), answers)
+
+def percentile(samples, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+async def load(base_url: str, route: str, clients: int, per_client: int, users: int, deadline: float):
+    latencies, probe = [], []
+    failures = 0
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10) as client:
+        async def worker():
+            nonlocal failures
+            for _ in range(per_client):
+                started = time.perf_counter()
+                try:
+                    response = await client.get(f"/{route}/user_{random.randrange(users)}")
+                    failures += response.status_code != 200
+                except httpx.TimeoutException:
+                    failures += 1
+                latencies.append(time.perf_counter() - started)
+
+        async def health_probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    await client.get("/health")
+                except httpx.TimeoutException:
+                    pass
+                probe.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        probing = asyncio.create_task(health_probe())
+        started = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(clients)]
+        _, stalled = await asyncio.wait(workers, timeout=deadline)
+        elapsed = time.perf_counter() - started
+        for task in stalled:
+            task.cancel()
+        done.set()
+        probing.cancel()
+
+    if stalled:
+        print(f"🧊 {route:>5}: stalled, {len(latencies)} of {clients * per_client} requests answered "
+              f"in {deadline:.0f}s ({failures} failed)")
+        return
+    print(f"⏱️ {route:>5}: {len(latencies) / elapsed:6.0f} req/s, p50 {percentile(latencies, 0.5):7.1f}ms, "
+          f"p99 {percentile(latencies, 0.99):7.1f}ms, max {max(latencies) * 1000:7.1f}ms | "
+          f"/health p50 {statistics.median(probe) * 1000:6.1f}ms, p99 {percentile(probe, 0.99):6.1f}ms, "
+          f"{failures} failed")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_until_up(base_url: str):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    users = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    deadline = float(sys.argv[4]) if len(sys.argv) > 4 else 120
+    populate(users)
+    print(f"🏗️ {users} users with {users * 20} questions and answers in {os.environ['DATABASE_URL']}")
+    print(f"🏁 {clients} concurrent clients x {per_client} requests, one uvicorn worker")
+
+    for route in ("sync", "async"):
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmark_async_db:app", "--port", str(port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            asyncio.run(wait_until_up(base_url))
+            asyncio.run(load(base_url, route, clients, per_client, users, deadline))
+        finally:
+            server.kill()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark requests/sec on an authenticated endpoint: a Clerk API round trip per request
+(verify_jwt_token before local verification) vs local JWKS verification
+
+Usage: python benchmark_auth.py [requests] [concurrency] [stub latency ms]
+A local stub stands in for Clerk through httpx.MockTransport: it serves the JWKS and
+answers /users/{id} after the given latency. Unless noted, every request carries a
+distinct token, so the auth context cache never short-circuits verification.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}")
+os.environ.setdefault("CLERK_SECRET_KEY", "sk_test_benchmark")
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+
+from app.database.config import engine
+from app.dependencies.auth import auth_cache, rejected_tokens, require_auth
+from app.models.models import Base
+from app.services.clerk_service import clerk_service
+
+KID = "benchmark"
+
+def clerk_stub(private_key, latency: float) -> httpx.MockTransport:
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=KID, use="sig", alg="RS256")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/jwks"):
+            return httpx.Response(200, json={"keys": [jwk]})
+        await asyncio.sleep(latency)
+        user_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={
+            "id": user_id, "first_name": "Bench", "last_name": "User", "image_url": "",
+            "primary_email_address_id": "email", "email_addresses": [{"id": "email", "email_address": f"{user_id}@example.com"}],
+        })
+    return httpx.MockTransport(handler)
+
+async def verify_via_api(token: str, local_profile=None):
+    """The old verify_jwt_token: unverified decode, then the user from the Clerk API"""
+    claims = jwt.decode(token, options={"verify_signature": False})
+    user_data = await clerk_service._fetch_user(claims["sub"])
+    profile = clerk_service.profile_from_user_data(user_data)
+    return {"sub": claims["sub"], "email": profile["email"], "name": profile["name"],
+            "image_url": profile["avatar_url"], "exp": claims["exp"]}
+
+def mint(private_key, subs, email: bool = True):
+    expires = int(time.time()) + 3600
+    return [jwt.encode({"sub": sub, "exp": expires, "jti": str(uuid.uuid4()),
+                        **({"email": f"{sub}@example.com", "name": "Bench User"} if email else {})},
+                       private_key, algorithm="RS256", headers={"kid": KID}) for sub in subs]
+
+async def run(client: httpx.AsyncClient, tokens, concurrency: int):
+    """Requests/sec over tokens and the number of Clerk API calls they made"""
+    pending = iter(tokens)
+    failures = 0
+    calls = clerk_service.metrics()["requests"]
+
+    async def worker():
+        nonlocal failures
+        for token in pending:
+            response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+            failures += response.status_code != 200
+
+    auth_cache.clear()
+    rejected_tokens.clear()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Auth logs a few lines per request
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    if failures:
+        print(f"❌ {failures} requests were rejected")
+    return len(tokens) / elapsed, clerk_service.metrics()["requests"] - calls
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+    Base.metadata.create_all(engine)
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    clerk_service._transport = clerk_stub(private_key, latency)
+    await clerk_service.startup()
+
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(current_user=Depends(require_auth)):
+        return current_user
+
+    subs = [f"user_{n}" for n in range(max(concurrency * 2, 200))]
+    cycle = [subs[n % len(subs)] for n in range(requests)]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        await run(client, mint(private_key, subs), concurrency)  # Creates the local users
+        print(f"🏁 {requests} requests, {concurrency} concurrent, Clerk stub latency {latency * 1000:.0f}ms")
+
+        clerk_service.verify_jwt_token = verify_via_api
+        before, calls = await run(client, mint(private_key, cycle), concurrency)
+        del clerk_service.verify_jwt_token
+        print(f"⏱️ Clerk API per request (before): {before:8.0f} req/s, {calls} Clerk calls")
+
+        repeated = mint(private_key, subs)
+        for label, tokens in (
+            ("Local JWKS verification:       ", mint(private_key, cycle)),
+            ("Local JWKS, no profile claims: ", mint(private_key, cycle, email=False)),
+            ("Local JWKS + auth cache:       ", [repeated[n % len(subs)] for n in range(requests)]),
+        ):
+            rate, calls = await run(client, tokens, concurrency)
+            print(f"⏱️ {label} {rate:8.0f} req/s ({rate / before:.1f}x), {calls} Clerk calls")
+    await clerk_service.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
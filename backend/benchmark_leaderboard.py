@@ -0,0 +1,34 @@
+"""
+Benchmark the in-memory reputation leaderboard with synthetic users (no database)
+
+Usage: python benchmark_leaderboard.py [users]
+"""
+import random
+import sys
+import time
+import uuid
+
+from app.services.leaderboard_service import Leaderboard
+
+def timed(label: str, operations: int, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"⏱️ {label}: {elapsed:.2f}s ({elapsed / operations * 1e6:.1f}µs each)")
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = 100_000
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    reputations = {user_id: int(random.paretovariate(1.2)) for user_id in user_ids}
+    board = Leaderboard()
+
+    sample = random.choices(user_ids, k=operations)
+    timed(f"Build from {users} users", users, lambda: board.replace(dict(reputations)))
+    timed("Reputation changes", operations, lambda: [board.set(user_id, board.reputation(user_id) + 5) for user_id in sample])
+    timed("Rank lookups", operations, lambda: [board.rank(user_id) for user_id in sample])
+    timed("Top 10", operations, lambda: [board.top(10) for _ in range(operations)])
+    timed("Top 10 at offset 500k", operations, lambda: [board.top(10, users // 2) for _ in range(operations)])
+
+if __name__ == "__main__":
+    main()
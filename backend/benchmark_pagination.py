@@ -0,0 +1,98 @@
+"""
+Benchmark question list pages by depth: keyset cursors vs OFFSET, on a synthetic SQLite database
+
+Usage: python benchmark_pagination.py [questions] [page size]
+The newest TIES_PER_SECOND questions are inserted in one statement and get the
+same server-stamped created_at second; paging through them first checks that
+cursors move past rows sharing a timestamp.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Question, Tag, User, question_tags
+from app.services.pagination import encode_cursor
+from app.services.question_service import QuestionService, QUESTION_LIST_OPTIONS, QUESTION_SORTS
+
+TIES_PER_SECOND = 500
+
+def populate(engine, questions: int):
+    user_ids = [str(uuid.uuid4()) for _ in range(1000)]
+    started = datetime(2020, 1, 1)
+
+    def row(n: int) -> dict:
+        return {
+            "id": str(uuid.uuid4()), "user_id": random.choice(user_ids), "title": f"Question {n}",
+            "content": "Synthetic question", "excerpt": "Synthetic question", "views": 0,
+            "vote_count": random.randint(-5, 50), "upvotes": 0, "downvotes": 0, "hot_score": 0,
+            "answer_count": 0, "is_solved": False,
+        }
+
+    dated = max(questions - TIES_PER_SECOND, 0)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {"id": user_id, "email": f"{user_id}@example.com", "username": user_id[:20], "reputation": 0}
+            for user_id in user_ids
+        ])
+        for start in range(0, dated, 50000):
+            connection.execute(Question.__table__.insert(), [
+                {**row(n), "created_at": started + timedelta(seconds=n), "updated_at": started + timedelta(seconds=n)}
+                for n in range(start, min(start + 50000, dated))
+            ])
+        # created_at from the server default (CURRENT_TIMESTAMP), all in the same second
+        connection.execute(Question.__table__.insert(), [row(n) for n in range(dated, questions)])
+
+def check_ties(db: Session, limit: int):
+    """Walk the newest pages through the last second's TIES_PER_SECOND rows"""
+    service, cursor, seen = QuestionService(db), None, []
+    for _ in range(TIES_PER_SECOND // limit + 1):
+        page, cursor = service.get_questions_page('newest', cursor, limit)
+        seen += [question.id for question in page]
+    distinct = len(set(seen))
+    print(f"{'✅' if distinct == len(seen) else '❌'} {len(seen)} rows over "
+          f"{TIES_PER_SECOND // limit + 1} pages, {distinct} distinct")
+
+def timed(operations: int, func) -> float:
+    started = time.perf_counter()
+    for _ in range(operations):
+        func()
+    return (time.perf_counter() - started) / operations * 1e3
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Tag.__table__, Question.__table__, question_tags])
+
+    started = time.perf_counter()
+    populate(engine, questions)
+    print(f"🏗️ {questions} questions written to {path} in {time.perf_counter() - started:.0f}s")
+
+    db = Session(engine)
+    check_ties(db, limit)
+    service = QuestionService(db)
+    for sort in ('newest', 'votes'):
+        columns = QUESTION_SORTS[sort]
+        ordered = db.query(Question).options(*QUESTION_LIST_OPTIONS).order_by(*[column.desc() for column in columns])
+        print(f"📄 sort={sort}, pages of {limit}")
+        depth = 1
+        while depth * limit < questions:
+            offset = (depth - 1) * limit
+            # The cursor a client would hold after paging down to this depth
+            before = ordered.offset(offset - 1).limit(1).first() if offset else None
+            cursor = encode_cursor(sort, [getattr(before, column.key) for column in columns]) if before else None
+            keyset = timed(20, lambda: (service.get_questions_page(sort, cursor, limit), db.expunge_all()))
+            offset_ms = timed(3, lambda: (ordered.offset(offset).limit(limit).all(), db.expunge_all()))
+            print(f"⏱️ page {depth:>6}: keyset {keyset:7.2f}ms, OFFSET {offset_ms:8.2f}ms")
+            depth *= 10
+
+if __name__ == "__main__":
+    main()
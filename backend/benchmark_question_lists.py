@@ -0,0 +1,105 @@
+"""
+Benchmark a question list page: full QuestionResponse vs the lean QuestionListResponse
+projection, nested and normalized (?format=normalized)
+
+Usage: python benchmark_question_lists.py [questions] [page size] [authors] [tags]
+Reports query time, serialization (validate + JSON dump) time and payload bytes per page.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.models import Base, Question, Tag, User, question_tags
+from app.schemas.schemas import QuestionListResponse, QuestionResponse
+from app.services.question_service import QUESTION_LIST_OPTIONS, make_excerpt
+from app.services.normalize import normalized_questions
+
+WORDS = "async await promise render state query index cache thread socket buffer stream schema".split()
+
+def paragraph(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+def body() -> str:
+    # Rich-editor HTML of a typical question: some prose and a code block
+    parts = [f"<p>{paragraph(random.randint(40, 120))}</p>" for _ in range(random.randint(2, 6))]
+    parts.insert(1, f"<pre><code>{paragraph(random.randint(30, 200))}</code></pre>")
+    return "".join(parts)
+
+def populate(engine, questions: int, authors: int, tag_count: int):
+    users = [{
+        "id": str(uuid.uuid4()), "email": f"user{n}@example.com", "username": f"user{n}",
+        "display_name": f"User {n}", "bio": paragraph(60), "reputation": random.randint(0, 5000),
+        "avatar_url": f"https://example.com/avatars/{n}.png",
+    } for n in range(authors)]
+    tags = [{"id": str(uuid.uuid4()), "name": f"tag{n}", "description": paragraph(20), "usage_count": 0}
+            for n in range(tag_count)]
+    started = datetime(2020, 1, 1)
+    rows, links = [], []
+    for n in range(questions):
+        question_id, content = str(uuid.uuid4()), body()
+        rows.append({
+            "id": question_id, "user_id": random.choice(users)["id"], "title": f"Question {n}: {paragraph(8)}",
+            "content": content, "excerpt": make_excerpt(content), "views": 0, "vote_count": 0, "upvotes": 0,
+            "downvotes": 0, "hot_score": 0, "answer_count": 0, "is_solved": False,
+            "created_at": started + timedelta(minutes=n), "updated_at": started + timedelta(minutes=n),
+        })
+        for tag in random.sample(tags, random.randint(1, min(5, tag_count))):
+            links.append({"question_id": question_id, "tag_id": tag["id"]})
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), users)
+        connection.execute(Tag.__table__.insert(), tags)
+        connection.execute(Question.__table__.insert(), rows)
+        connection.execute(question_tags.insert(), links)
+
+def nested(schema):
+    adapter = TypeAdapter(List[schema])
+    # What FastAPI does with a response_model: validate from attributes, then dump JSON
+    return lambda page: adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+def normalized(page) -> bytes:
+    return normalized_questions(page).body
+
+def measure(label: str, engine, options, serialize, limit: int, runs: int = 20):
+    query_time = serialize_time = 0.0
+    for _ in range(runs):
+        with Session(engine) as db:  # Fresh identity map, so every run really loads its columns
+            started = time.perf_counter()
+            page = db.query(Question).options(*options).order_by(
+                Question.created_at.desc(), Question.id.desc()
+            ).limit(limit).all()
+            loaded = time.perf_counter()
+            payload = serialize(page)
+            query_time += loaded - started
+            serialize_time += time.perf_counter() - loaded
+    print(f"⏱️ {label}: query {query_time / runs * 1e3:.2f}ms, "
+          f"serialize {serialize_time / runs * 1e3:.2f}ms, {len(payload) / 1024:.1f} KiB per page")
+    return len(payload)
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    authors = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    tags = int(sys.argv[4]) if len(sys.argv) > 4 else 300
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Tag.__table__, Question.__table__, question_tags])
+    populate(engine, questions, authors, tags)
+    print(f"🏗️ {questions} questions by {authors} authors with {tags} tags written to {path}, pages of {limit}")
+
+    full = measure("QuestionResponse", engine,
+                   (joinedload(Question.author), joinedload(Question.tags)), nested(QuestionResponse), limit)
+    lean = measure("QuestionListResponse", engine, QUESTION_LIST_OPTIONS, nested(QuestionListResponse), limit)
+    flat = measure("QuestionListResponse, normalized", engine, QUESTION_LIST_OPTIONS, normalized, limit)
+    print(f"📉 Payload {lean / full:.0%} (nested) and {flat / full:.0%} (normalized) of QuestionResponse")
+
+if __name__ == "__main__":
+    main()
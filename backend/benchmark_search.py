@@ -0,0 +1,94 @@
+"""
+Benchmark question search at scale: the search backends vs the old ilike('%q%') scan
+
+Usage: python benchmark_search.py [questions] [backends]
+backends is a comma-separated list of sqlite and memory (default sqlite; the memory
+index needs several GB at a million questions). Words follow a Zipf distribution
+over a technical vocabulary plus synthetic rare terms, so queries cover very common,
+rare, multi-term and prefix (still being typed) searches.
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}")
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Question, User
+from app.services.search_service import InMemorySearchBackend, SQLiteFTSBackend
+from app.services.question_service import SEARCH_MATCH_LIMIT
+
+COMMON = ("python javascript react async await database query index cache thread socket buffer stream "
+          "schema error exception function class module package install docker deploy server client "
+          "request response json api route token auth session memory performance loop array string").split()
+VOCABULARY = COMMON + [f"term{n}" for n in range(20000)]
+WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+QUERIES = ["python", "async await", "react hooks", "term15000", "pyth", "database query perf", "docker term500"]
+
+def words(n: int) -> str:
+    return " ".join(random.choices(VOCABULARY, cum_weights=WEIGHTS, k=n))
+
+def populate(engine, questions: int):
+    user_id = str(uuid.uuid4())
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{"id": user_id, "email": "bench@example.com", "username": "bench", "reputation": 0}])
+        for start in range(0, questions, 50000):
+            connection.execute(Question.__table__.insert(), [{
+                "id": str(uuid.uuid4()), "user_id": user_id, "title": words(8),
+                "content": f"<p>{words(random.randint(20, 80))}</p>", "excerpt": "",
+            } for _ in range(start, min(start + 50000, questions))])
+
+def timed(operations: int, func) -> float:
+    started = time.perf_counter()
+    for _ in range(operations):
+        result = func()
+    return (time.perf_counter() - started) / operations * 1e3, result
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    backends = (sys.argv[2] if len(sys.argv) > 2 else "sqlite").split(",")
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Question.__table__])
+
+    started = time.perf_counter()
+    populate(engine, questions)
+    print(f"🏗️ {questions} questions written to {path} in {time.perf_counter() - started:.0f}s")
+
+    with Session(engine) as db:
+        for name in backends:
+            backend = SQLiteFTSBackend() if name == "sqlite" else InMemorySearchBackend()
+            started = time.perf_counter()
+            backend.load(db)
+            print(f"🔎 {name}: index built in {time.perf_counter() - started:.0f}s")
+            started = time.perf_counter()
+            backend.load(db)
+            print(f"🔎 {name}: startup check of an up-to-date index in {time.perf_counter() - started:.1f}s")
+            for query in QUERIES:
+                search_ms, hits = timed(5, lambda: backend.search(db, query, 10))
+                match_ms, matches = timed(3, lambda: backend.match(db, query, SEARCH_MATCH_LIMIT))
+                print(f"⏱️ {name:>6} {query!r:>22}: top 10 in {search_ms:7.2f}ms, "
+                      f"{len(matches):>6} matches (limit {SEARCH_MATCH_LIMIT}) in {match_ms:8.2f}ms")
+
+            # An edit: the question is dropped from the index and added again
+            question = db.query(Question).first()
+            edit_ms, _ = timed(20, lambda: backend.index_question(db, question))
+            db.rollback()
+            print(f"✏️ {name:>6} re-index one question in {edit_ms:.2f}ms")
+
+        # What search_questions did before: a leading-wildcard scan of every title and body
+        for query in ("python", "term15000"):
+            scan_ms, rows = timed(1, lambda: db.query(Question.id).filter(or_(
+                Question.title.ilike(f"%{query}%"), Question.content.ilike(f"%{query}%")
+            )).limit(10).all())
+            print(f"🐢 ilike {query!r:>22}: first 10 in {scan_ms:8.2f}ms")
+
+if __name__ == "__main__":
+    main()
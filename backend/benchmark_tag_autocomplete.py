@@ -0,0 +1,63 @@
+"""
+Benchmark the in-memory tag autocomplete index with synthetic tags (no database)
+
+Usage: python benchmark_tag_autocomplete.py [tags]
+"""
+import random
+import string
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from app.services.autocomplete_service import TagAutocomplete
+
+class SyntheticTag:
+    def __init__(self, name: str, usage_count: int):
+        self.id = str(uuid.uuid4())
+        self.name = name
+        self.description = None
+        self.color = "#3B82F6"
+        self.usage_count = usage_count
+        self.created_at = datetime.utcnow()
+
+def random_name() -> str:
+    alphabet = string.ascii_lowercase + string.digits + "-."
+    return random.choice(string.ascii_lowercase) + "".join(random.choices(alphabet, k=random.randint(1, 14)))
+
+def timed(label: str, operations: int, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"⏱️ {label}: {elapsed:.2f}s ({elapsed / operations * 1e6:.1f}µs each)")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    operations = 100_000
+    tags = {}
+    while len(tags) < count:
+        name = random_name()
+        tags[name] = SyntheticTag(name, int(random.paretovariate(1.1)))
+    tags = list(tags.values())
+    index = TagAutocomplete()
+
+    # What a user types into the tag picker, one keystroke at a time
+    queries = [tag.name[:random.randint(1, min(len(tag.name), 6))] for tag in random.choices(tags, k=operations)]
+    sample = random.choices(tags, k=operations)
+
+    def bump():
+        for tag in sample:
+            tag.usage_count += 1
+            index.set(tag)
+
+    timed(f"Build from {count} tags", count, lambda: index.replace([
+        {"id": tag.id, "name": tag.name, "description": None, "color": tag.color,
+         "usage_count": tag.usage_count, "created_at": tag.created_at}
+        for tag in tags
+    ]))
+    timed("Suggestions (1-6 character prefixes)", operations, lambda: [index.suggest(query) for query in queries])
+    timed("Suggestions (1-2 character prefixes)", operations, lambda: [index.suggest(query[:2]) for query in queries])
+    timed("Usage count changes", operations, bump)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark tag AND/OR/NOT filtering: roaring bitmaps vs SQL, on a synthetic SQLite database
+
+Usage: python benchmark_tag_filters.py [questions] [tags]
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Question, Tag, question_tags
+from app.schemas.schemas import SearchRequest
+from app.services.bitmap_index_service import QuestionBitmaps
+from app.services.question_service import QuestionService
+
+def timed(label: str, operations: int, func):
+    started = time.perf_counter()
+    for _ in range(operations):
+        result = func()
+    elapsed = time.perf_counter() - started
+    print(f"⏱️ {label}: {elapsed / operations * 1e3:.2f}ms each")
+    return result
+
+def populate(engine, questions: int, tags: int):
+    tag_ids = [str(uuid.uuid4()) for _ in range(tags)]
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(tags)))  # Zipf-like popularity
+    started = datetime(2020, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(Tag.__table__.insert(), [
+            {"id": tag_id, "name": f"tag{rank}", "usage_count": 0} for rank, tag_id in enumerate(tag_ids)
+        ])
+        for start in range(0, questions, 50000):
+            rows, links = [], []
+            for n in range(start, min(start + 50000, questions)):
+                question_id = str(uuid.uuid4())
+                rows.append({
+                    "id": question_id, "user_id": "bench", "title": f"Question {n}", "content": "Synthetic question",
+                    "views": 0, "vote_count": 0, "upvotes": 0, "downvotes": 0, "hot_score": 0,
+                    "answer_count": random.choice((0, 0, 1, 2, 3)), "is_solved": random.random() < 0.3,
+                    "created_at": started + timedelta(minutes=n), "updated_at": started + timedelta(minutes=n),
+                })
+                for tag_id in set(random.choices(tag_ids, cum_weights=weights, k=random.randint(1, 5))):
+                    links.append({"question_id": question_id, "tag_id": tag_id})
+            connection.execute(Question.__table__.insert(), rows)
+            connection.execute(question_tags.insert(), links)
+    return tag_ids
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tags = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Tag.__table__, Question.__table__, question_tags])
+
+    started = time.perf_counter()
+    tag_ids = populate(engine, questions, tags)
+    print(f"🏗️ {questions} questions x {tags} tags written to {path} in {time.perf_counter() - started:.0f}s")
+
+    db = Session(engine)
+    bitmaps = QuestionBitmaps()
+    timed("Bitmap build", 1, lambda: bitmaps.rebuild(db))
+
+    # Tag ranks 0-2 are the most used; 500 is mid-range
+    cases = {
+        "tag0 AND tag1": {"all_tags": ["tag0", "tag1"]},
+        "tag0 AND tag1 AND unsolved": {"all_tags": ["tag0", "tag1"], "is_solved": False},
+        "(tag1 OR tag2 OR tag500) AND NOT tag0": {"tags": ["tag1", "tag2", "tag500"], "exclude_tags": ["tag0"]},
+        "tag500 AND unanswered": {"all_tags": ["tag500"], "unanswered": True},
+    }
+    for label, filters in cases.items():
+        search = SearchRequest(**filters, limit=10)
+        facets = {}
+        if search.is_solved is not None:
+            facets["solved"] = search.is_solved
+        if search.unanswered is not None:
+            facets["answered"] = not search.unanswered
+        ids = lambda names: [tag_ids[int(name[3:])] for name in names] if names else None
+
+        def bitmap_page():
+            matches = bitmaps.match(ids(search.tags), ids(search.all_tags), ids(search.exclude_tags), facets)
+            return len(matches), bitmaps.page(matches, 0, 10)
+
+        def sql_page():
+            query = QuestionService(db)._filter_in_sql(db.query(Question.id), search)
+            page = [row.id for row in query.order_by(Question.created_at.desc(), Question.id.desc()).limit(10)]
+            return query.count(), page
+
+        print(f"🔎 {label}")
+        total, _ = timed("  bitmap (count + newest page)", 20, bitmap_page)
+        sql_total, _ = timed("  SQL EXISTS (count + newest page)", 3, sql_page)
+        print(f"  {total} matches{'' if total == sql_total else f' (SQL found {sql_total})'}")
+
+if __name__ == "__main__":
+    main()
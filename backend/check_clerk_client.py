@@ -0,0 +1,164 @@
+"""
+Exercise ClerkService's shared HTTP client against a local mock transport
+
+Usage: python check_clerk_client.py
+Clerk is replaced by an httpx.MockTransport handler that records every call, so the
+checks run offline: singleflight de-duplication, the connection limit and saturation
+metrics, error accounting, JWKS fetch/rotation and the client's lifecycle.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("CLERK_SECRET_KEY", "sk_test_check")
+os.environ["CLERK_HTTP_MAX_CONNECTIONS"] = "5"
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.clerk_service import ClerkService
+
+class MockClerk:
+    """Stand-in for the Clerk API: serves /jwks and /users/{id}, counting calls"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.keys = {}  # kid -> private key
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    def add_key(self, kid: str):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def token(self, kid: str, sub: str, **claims) -> str:
+        return jwt.encode({"sub": sub, "exp": int(time.time()) + 600, **claims},
+                          self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls.append(path)
+        if path.endswith("/jwks"):
+            keys = []
+            for kid, key in self.keys.items():
+                jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+                keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+            return httpx.Response(200, json={"keys": keys})
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        user_id = path.rsplit("/", 1)[-1]
+        if user_id.startswith("missing"):
+            return httpx.Response(404, json={"errors": [{"code": "resource_not_found"}]})
+        if user_id.startswith("broken"):
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={
+            "id": user_id, "first_name": "Mock", "last_name": "User", "image_url": "",
+            "primary_email_address_id": "email", "email_addresses": [{"id": "email", "email_address": f"{user_id}@example.com"}],
+        })
+
+    def user_calls(self) -> int:
+        return sum(1 for path in self.calls if "/users/" in path)
+
+failures = []
+
+def check(label: str, ok: bool, detail: str = ""):
+    print(f"{'✅' if ok else '❌'} {label}{f': {detail}' if detail else ''}", file=sys.__stdout__)
+    if not ok:
+        failures.append(label)
+
+async def check_singleflight():
+    clerk = MockClerk()
+    service = ClerkService(transport=clerk.transport)
+    results = await asyncio.gather(*[service.get_user("user_same") for _ in range(50)])
+    metrics = service.metrics()
+    check("50 concurrent lookups of one user make one call", clerk.user_calls() == 1, f"{clerk.user_calls()} calls")
+    check("every caller gets the shared result", all(result == results[0] for result in results) and results[0]["id"] == "user_same")
+    check("deduplicated counter", metrics["deduplicated"] == 49, str(metrics["deduplicated"]))
+    await service.get_user("user_same")
+    check("finished lookups are not cached", clerk.user_calls() == 2)
+    await service.shutdown()
+
+async def check_connection_limit():
+    clerk = MockClerk()
+    service = ClerkService(transport=clerk.transport)
+    started = time.perf_counter()
+    await asyncio.gather(*[service.get_user(f"user_{n}") for n in range(20)])
+    elapsed = time.perf_counter() - started
+    metrics = service.metrics()
+    check("outbound calls never exceed max_connections", clerk.peak_in_flight <= service.max_connections,
+          f"peak {clerk.peak_in_flight} of {service.max_connections}")
+    check("waits for a free slot are counted as saturation", metrics["saturated"] > 0, str(metrics["saturated"]))
+    check("20 calls through 5 slots take 4 rounds", elapsed >= 4 * clerk.latency, f"{elapsed * 1000:.0f}ms")
+    check("latency metrics", metrics["requests"] == 20 and metrics["latency_max_ms"] >= clerk.latency * 1000
+          and metrics["in_flight"] == 0 and metrics["available_slots"] == service.max_connections)
+    await service.shutdown()
+
+async def check_errors():
+    clerk = MockClerk(latency=0)
+    service = ClerkService(transport=clerk.transport)
+    check("404 from Clerk returns None", await service.get_user("missing_1") is None)
+    check("transport error returns None", await service.get_user("broken_1") is None)
+    check("only the transport error counts as an error", service.metrics()["errors"] == 1, str(service.metrics()["errors"]))
+    await service.shutdown()
+
+async def check_jwks():
+    clerk = MockClerk(latency=0)
+    clerk.add_key("key_1")
+    service = ClerkService(transport=clerk.transport)
+    await service.startup()
+    await asyncio.sleep(0.1)  # The refresh task fetches the JWKS right away
+    check("startup loads the JWKS", "key_1" in service._signing_keys)
+
+    claims = await service.verify_jwt_token(clerk.token("key_1", "user_1", email="user_1@example.com"))
+    check("token with profile claims verifies without a user lookup",
+          claims is not None and claims["email"] == "user_1@example.com" and clerk.user_calls() == 0)
+
+    clerk.add_key("key_2")
+    service._jwks_fetched_at = float("-inf")  # Past the minimum refetch interval
+    claims = await service.verify_jwt_token(clerk.token("key_2", "user_2", email="user_2@example.com"))
+    check("unknown kid re-fetches the JWKS", claims is not None and "key_2" in service._signing_keys)
+
+    forged = jwt.encode({"sub": "user_1", "exp": int(time.time()) + 600},
+                        rsa.generate_private_key(public_exponent=65537, key_size=2048),
+                        algorithm="RS256", headers={"kid": "key_1"})
+    check("token signed with another key is rejected", await service.verify_jwt_token(forged) is None)
+
+    async def known(sub):
+        return {"email": f"{sub}@example.com", "name": "Known User"} if sub == "user_known" else None
+
+    calls = clerk.user_calls()
+    claims = await service.verify_jwt_token(clerk.token("key_1", "user_known"), known)
+    check("claim-less token for a known user skips the Clerk API",
+          claims is not None and claims["name"] == "Known User" and clerk.user_calls() == calls)
+    claims = await service.verify_jwt_token(clerk.token("key_1", "user_new"), known)
+    check("claim-less token for an unknown user asks the Clerk API",
+          claims is not None and claims["email"] == "user_new@example.com" and clerk.user_calls() == calls + 1)
+
+    client = service._get_client()
+    check("one shared client", service._get_client() is client)
+    await service.shutdown()
+    check("shutdown closes the client and stops the refresh task",
+          client.is_closed and service._client is None and service._jwks_refresh_task is None)
+
+async def main():
+    for suite in (check_singleflight, check_connection_limit, check_errors, check_jwks):
+        print(f"🧪 {suite.__name__}")
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):  # Service logs and expected tracebacks
+            await suite()
+    print("✅ All checks passed" if not failures else f"❌ {len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+"""
+Migration script to add the created_at indexes scanned by the activity rollup catch-up job
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+INDEXES = [
+    ("idx_votes_created_at", "CREATE INDEX idx_votes_created_at ON votes(created_at)"),
+    ("idx_users_created_at", "CREATE INDEX idx_users_created_at ON users(created_at)"),
+]
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as conn:
+            for name, statement in INDEXES:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✅ Created index {name}")
+                except Exception as e:
+                    print(f"Index {name} might already exist: {e}")
+
+            conn.commit()
+            print("✅ Database migration completed successfully!")
+            print("   Run backfill_activity_rollups.py to build rollups for existing history")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
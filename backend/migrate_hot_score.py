@@ -0,0 +1,42 @@
+"""
+Migration script to add the hot_score column and its keyset index to questions, and
+score every question (run again whenever the hot formula or its weights change)
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from decouple import config
+
+from app.services.hot_service import hot_scores
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+    column_type = "DOUBLE" if engine.dialect.name == "mysql" else "FLOAT"
+
+    try:
+        with engine.connect() as conn:
+            try:
+                conn.execute(text(f"ALTER TABLE questions ADD COLUMN hot_score {column_type} DEFAULT 0"))
+                print("✅ Added questions.hot_score")
+            except Exception as e:
+                print(f"Column hot_score might already exist: {e}")
+
+            try:
+                conn.execute(text("CREATE INDEX idx_questions_hot_score_id ON questions(hot_score, id)"))
+                print("✅ Created index idx_questions_hot_score_id")
+            except Exception as e:
+                print(f"Index idx_questions_hot_score_id might already exist: {e}")
+
+            conn.commit()
+
+        with Session(engine) as db:
+            print(f"✅ Scored {hot_scores.rescore_all(db)} questions")
+        print("✅ Database migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
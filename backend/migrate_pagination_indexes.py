@@ -0,0 +1,49 @@
+"""
+Migration script to add the composite indexes used by cursor pagination
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+INDEXES = [
+    ("idx_questions_user_created_at", "CREATE INDEX idx_questions_user_created_at ON questions(user_id, created_at, id)"),
+    ("idx_questions_created_at_id", "CREATE INDEX idx_questions_created_at_id ON questions(created_at, id)"),
+    ("idx_questions_vote_count_id", "CREATE INDEX idx_questions_vote_count_id ON questions(vote_count, id)"),
+    ("idx_question_tags_tag_id", "CREATE INDEX idx_question_tags_tag_id ON question_tags(tag_id)"),
+]
+
+# Single-column indexes made redundant by the composite ones above
+DROPPED_INDEXES = ["idx_questions_created_at", "idx_questions_vote_count"]
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as conn:
+            for name, statement in INDEXES:
+                try:
+                    conn.execute(text(statement))
+                    print(f"✅ Created index {name}")
+                except Exception as e:
+                    print(f"Index {name} might already exist: {e}")
+
+            for name in DROPPED_INDEXES:
+                try:
+                    if engine.dialect.name == "mysql":
+                        conn.execute(text(f"DROP INDEX {name} ON questions"))
+                    else:
+                        conn.execute(text(f"DROP INDEX {name}"))
+                    print(f"✅ Dropped index {name}")
+                except Exception as e:
+                    print(f"Index {name} might already be gone: {e}")
+
+            conn.commit()
+            print("✅ Database migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,48 @@
+"""
+Migration script to add the questions.excerpt column and fill it for existing questions
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+from app.services.question_service import make_excerpt
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+BATCH_SIZE = 500
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("ALTER TABLE questions ADD COLUMN excerpt VARCHAR(255)"))
+                conn.commit()
+                print("✅ Added questions.excerpt")
+            except Exception as e:
+                conn.rollback()
+                print(f"Column excerpt might already exist: {e}")
+
+            filled = 0
+            while True:
+                rows = conn.execute(
+                    text("SELECT id, content FROM questions WHERE excerpt IS NULL LIMIT :limit"),
+                    {"limit": BATCH_SIZE}
+                ).all()
+                if not rows:
+                    break
+                conn.execute(
+                    text("UPDATE questions SET excerpt = :excerpt WHERE id = :id"),
+                    [{"id": row.id, "excerpt": make_excerpt(row.content)} for row in rows]
+                )
+                conn.commit()
+                filled += len(rows)
+            print(f"✅ Filled excerpts for {filled} question(s)")
+            print("✅ Database migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,46 @@
+"""
+Migration script to replace the title/content prefix index with FULLTEXT indexes (MySQL)
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+
+    if engine.dialect.name != "mysql":
+        print("Nothing to do: the FULLTEXT index is MySQL only (SQLite builds its FTS5 table at startup)")
+        return
+
+    try:
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("CREATE FULLTEXT INDEX idx_questions_fulltext ON questions(title, content)"))
+                print("✅ Created FULLTEXT index on questions(title, content)")
+            except Exception as e:
+                print(f"FULLTEXT index might already exist: {e}")
+
+            # Boolean-mode MATCH has no column weights; search adds a title-only MATCH
+            try:
+                conn.execute(text("CREATE FULLTEXT INDEX idx_questions_title_fulltext ON questions(title)"))
+                print("✅ Created FULLTEXT index on questions(title)")
+            except Exception as e:
+                print(f"Title FULLTEXT index might already exist: {e}")
+
+            # Leading-wildcard LIKE searches could never use this one
+            try:
+                conn.execute(text("DROP INDEX idx_questions_title_content ON questions"))
+                print("✅ Dropped idx_questions_title_content")
+            except Exception as e:
+                print(f"idx_questions_title_content might already be gone: {e}")
+
+            conn.commit()
+            print("✅ Database migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,42 @@
+"""
+Migration script to add upvotes/downvotes counters to questions and answers and backfill them from votes
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+TARGETS = [("questions", "question_id"), ("answers", "answer_id")]
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        with engine.connect() as conn:
+            for table, vote_column in TARGETS:
+                for column in ("upvotes", "downvotes"):
+                    try:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER DEFAULT 0"))
+                        print(f"✅ Added {table}.{column}")
+                    except Exception as e:
+                        print(f"Column {table}.{column} might already exist: {e}")
+
+                # One set-based pass per table; updated_at is left alone
+                result = conn.execute(text(
+                    f"UPDATE {table} SET "
+                    f"upvotes = (SELECT COUNT(*) FROM votes WHERE votes.{vote_column} = {table}.id AND votes.vote_type = 1), "
+                    f"downvotes = (SELECT COUNT(*) FROM votes WHERE votes.{vote_column} = {table}.id AND votes.vote_type = -1), "
+                    f"updated_at = updated_at"
+                ))
+                conn.execute(text(f"UPDATE {table} SET vote_count = upvotes - downvotes, updated_at = updated_at"))
+                print(f"✅ Backfilled vote counters for {result.rowcount} row(s) in {table}")
+
+            conn.commit()
+            print("✅ Database migration completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,41 @@
+"""
+Migration script to enforce one vote per user per question/answer
+"""
+from sqlalchemy import create_engine, text
+from decouple import config
+
+# Database connection
+DATABASE_URL = config('DATABASE_URL')
+
+def migrate_database():
+    engine = create_engine(DATABASE_URL)
+    on_votes = " ON votes" if engine.dialect.name == "mysql" else ""
+
+    try:
+        with engine.connect() as conn:
+            # Keep one row per (user, target) before the unique indexes go on
+            result = conn.execute(text(
+                "DELETE FROM votes WHERE id NOT IN ("
+                "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM votes "
+                "GROUP BY user_id, question_id, answer_id) AS keep_votes)"
+            ))
+            print(f"✅ Removed {result.rowcount} duplicate vote(s)")
+
+            for name, columns in (("idx_votes_user_question", "user_id, question_id"),
+                                  ("idx_votes_user_answer", "user_id, answer_id")):
+                try:
+                    conn.execute(text(f"DROP INDEX {name}{on_votes}"))
+                except Exception as e:
+                    print(f"Index {name} might not exist yet: {e}")
+                conn.execute(text(f"CREATE UNIQUE INDEX {name} ON votes({columns})"))
+                print(f"✅ Created unique index {name}")
+
+            conn.commit()
+            print("✅ Database migration completed successfully!")
+            print("   Vote counts and reputation may include removed duplicates; recompute them if any were found")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,31 @@
+"""
+Rebuild every user's reputation from votes and accepted answers
+
+Usage: python recompute_reputation.py [--dry-run]
+Run it while writes are paused: votes cast during the scan may be overwritten.
+"""
+import sys
+import time
+
+from app.database.config import SessionLocal
+from app.services.reputation_service import ReputationService
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = ReputationService(db).recompute_all(dry_run=dry_run)
+    finally:
+        db.close()
+
+    print(f"✅ Scanned {result['question_votes']} question vote(s), {result['answer_votes']} answer vote(s) "
+          f"and {result['accepted_answers']} accepted answer(s) for {result['users']} user(s) "
+          f"in {time.perf_counter() - started:.1f}s")
+    if dry_run:
+        print(f"⚠️ {result['changed']} reputation(s) differ; run without --dry-run to rewrite them")
+    else:
+        print(f"🔧 Rewrote {result['changed']} reputation(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Recompute question/answer vote counters from the votes table and report drift
+
+Usage: python reconcile_vote_counters.py [--fix]
+The question detail cache lives in each server process, so running servers keep
+serving their cached copies of fixed questions until they expire (QUESTION_CACHE_TTL).
+"""
+import sys
+
+from app.database.config import SessionLocal
+from app.services.question_service import QUESTION_CACHE_TTL
+from app.services.vote_service import reconcile_vote_counters
+
+def main():
+    fix = "--fix" in sys.argv[1:]
+    db = SessionLocal()
+    try:
+        drift = reconcile_vote_counters(db, fix=fix)
+    finally:
+        db.close()
+
+    for table, count in drift.items():
+        if count:
+            print(f"{'🔧 Fixed' if fix else '⚠️ Found'} {count} drifted row(s) in {table}")
+        else:
+            print(f"✅ {table} counters match votes")
+    if any(drift.values()) and fix:
+        print(f"Running servers show the fixed counters once their cached questions expire (up to {QUESTION_CACHE_TTL}s)")
+    if any(drift.values()) and not fix:
+        print("Run with --fix to rewrite the drifted counters")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.models.models import Base, User, Question, Answer, Vote, Tag
 from app.database.config import engine
+from app.services.question_service import make_excerpt
 
 def create_tables():
     """Create all database tables"""
@@ -117,6 +118,7 @@ def create_sample_data():
         ]
         
         for question in questions:
+            question.excerpt = make_excerpt(question.content)
             db.add(question)
         
         db.commit()
@@ -0,0 +1,94 @@
+"""
+Stress test VoteService under parallel voters and check that every counter stays exact
+
+Usage: python stress_votes.py [voters] [database url]
+Without a URL a temporary SQLite database is used. Each voter double-submits a
+first vote on the question (the double-click race) and races a series of
+changes on the answer; afterwards vote_count/upvotes/downvotes, the vote
+totals and both owners' reputation are compared with the votes table.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import Base, User, Question, Answer, Vote
+from app.schemas.schemas import VoteCreate
+from app.services.reputation_service import vote_reputation
+from app.services.vote_service import VoteService, reconcile_vote_counters
+
+def setup(Session, voters: int):
+    user_ids = [str(uuid.uuid4()) for _ in range(voters + 2)]
+    question_owner, answer_owner, voter_ids = user_ids[0], user_ids[1], user_ids[2:]
+    question_id, answer_id = str(uuid.uuid4()), str(uuid.uuid4())
+    with Session() as db:
+        db.add_all([User(id=user_id, email=f"{user_id}@example.com", username=user_id[:20], reputation=0)
+                    for user_id in user_ids])
+        db.add(Question(id=question_id, user_id=question_owner, title="Stress", content="Stress test question"))
+        db.add(Answer(id=answer_id, question_id=question_id, user_id=answer_owner, content="Stress test answer"))
+        db.commit()
+    return question_owner, answer_owner, voter_ids, question_id, answer_id
+
+def main():
+    voters = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    url = sys.argv[2] if len(sys.argv) > 2 else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}"
+    engine = create_engine(url, pool_size=voters, connect_args={"timeout": 60} if url.startswith("sqlite") else {})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    question_owner, answer_owner, voter_ids, question_id, answer_id = setup(Session, voters)
+
+    outcomes = Counter()
+    start = threading.Barrier(voters)
+
+    def vote(user_id: str, **vote):
+        with Session() as db:
+            try:
+                result = VoteService(db).vote(VoteCreate(**vote), user_id)
+                outcomes["ok" if result["success"] else result["message"]] += 1
+            except Exception as e:
+                outcomes[type(e).__name__] += 1
+
+    def voter(user_id: str):
+        start.wait()
+        # Two identical first votes at once (one records, the other toggles it off or
+        # sees nothing to do), then a burst of changes
+        with ThreadPoolExecutor(2) as pool:
+            for _ in range(2):
+                pool.submit(vote, user_id, question_id=question_id, vote_type=1)
+        for vote_type in random.choices((1, -1), k=5):
+            vote(user_id, answer_id=answer_id, vote_type=vote_type)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(voters) as pool:
+        list(pool.map(voter, voter_ids))
+    elapsed = time.perf_counter() - started
+    print(f"🗳️ {voters} voters, {sum(outcomes.values())} votes in {elapsed:.1f}s: {dict(outcomes)}")
+
+    with Session() as db:
+        drift = reconcile_vote_counters(db)
+        expected = {question_owner: 0, answer_owner: 0}
+        for owner, column, target_id in ((question_owner, Vote.question_id, question_id),
+                                         (answer_owner, Vote.answer_id, answer_id)):
+            for vote_type, count in db.query(Vote.vote_type, func.count()).filter(column == target_id).group_by(Vote.vote_type):
+                expected[owner] += vote_reputation(vote_type) * count
+        actual = dict(db.query(User.id, User.reputation).filter(User.id.in_(expected)))
+        question_votes = db.query(func.count(Vote.id)).filter(Vote.question_id == question_id).scalar()
+        vote_count = db.query(Question.vote_count).filter(Question.id == question_id).scalar()
+
+    print(f"📊 Question: {question_votes} vote rows, vote_count {vote_count}")
+    print(f"📊 Counter drift: {drift}, reputation expected {list(expected.values())} got "
+          f"{[actual[user_id] for user_id in expected]}")
+    exact = not any(drift.values()) and actual == expected and question_votes == vote_count
+    print("✅ Counters exact" if exact else "❌ Counters drifted")
+    sys.exit(0 if exact else 1)
+
+if __name__ == "__main__":
+    main()
@@ -56,7 +56,7 @@ export default function QuestionCard({ question }) {
                 </Link>
               </h3>
               <p className="mt-1 text-sm text-gray-600 line-clamp-2">
-                {question.content ? question.content.substring(0, 150) + '...' : ''}
+                {question.excerpt ?? (question.content ? question.content.substring(0, 150) + '...' : '')}
               </p>
             </div>
             <button
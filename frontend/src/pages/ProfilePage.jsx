@@ -1,4 +1,4 @@
-import React, { useMemo, useState, useEffect } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useApp } from '../context/AppContext';
 import {
@@ -9,7 +9,8 @@ import {
 } from '@heroicons/react/24/outline';
 
 export default function ProfilePage() {
-  const { currentUser, questions, getUserAnswers } = useApp();
+  const { currentUser, getUserQuestions, getUserAnswers } = useApp();
+  const [userQuestions, setUserQuestions] = useState([]);
   const [userAnswers, setUserAnswers] = useState([]);
   const [loading, setLoading] = useState(true);
   
@@ -32,6 +33,23 @@ export default function ProfilePage() {
 
     loadUserAnswers();
   }, [currentUser, getUserAnswers]);
+
+  // Load user questions; the backend matches them to the signed-in user by ID
+  useEffect(() => {
+    const loadUserQuestions = async () => {
+      if (currentUser) {
+        try {
+          const questions = await getUserQuestions(currentUser.id);
+          setUserQuestions(questions || []);
+        } catch (error) {
+          console.error('Failed to load user questions:', error);
+          setUserQuestions([]);
+        }
+      }
+    };
+
+    loadUserQuestions();
+  }, [currentUser, getUserQuestions]);
   
   if (!currentUser) {
     return (
@@ -42,22 +60,6 @@ export default function ProfilePage() {
     );
   }
 
-  // Filter questions by current user with flexible matching
-  const userQuestions = useMemo(() => {
-    return questions.filter(question => {
-      if (!question.author) return false;
-      
-      // Try multiple matching strategies
-      return (
-        question.author.id === currentUser.id ||
-        question.author.clerk_id === currentUser.id ||
-        question.author.display_name === currentUser.name ||
-        question.author.name === currentUser.name ||
-        question.author.email === currentUser.email
-      );
-    });
-  }, [questions, currentUser]);
-
   return (
     <div className="max-w-4xl mx-auto">
       {/* Profile Header */}
@@ -234,8 +234,12 @@ class ApiService {
     });
   }
 
-  async getUserVotes(userId) {
-    return this.get(`/users/${userId}/votes`);
+  // Current user's votes for a page of questions/answers: { questions: {id: 1|-1}, answers: {...} }
+  async getVoteState(questionIds = [], answerIds = []) {
+    return this.post('/votes/state', {
+      question_ids: questionIds,
+      answer_ids: answerIds
+    });
   }
 
   // === TAGS ===